@@ -1,5 +1,19 @@
-from .git_operations import GitOperations
-from .config_manager import ConfigManager
+# GitOperations, AsyncGitOperations and ConfigManager pull in GitPython and PyYAML, so they are
+# only imported on first access.
+_LAZY_ATTRIBUTES = {
+    'GitOperations': '.git_operations',
+    'AsyncGitOperations': '.async_git_operations',
+    'ConfigManager': '.config_manager',
+}
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        import importlib
+        module = importlib.import_module(_LAZY_ATTRIBUTES[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def hello_world():
     """
@@ -7,4 +21,4 @@ def hello_world():
     """
     print("Hello, World!")
 
-__all__ = ['hello_world', 'GitOperations', 'ConfigManager']
\ No newline at end of file
+__all__ = ['hello_world', 'GitOperations', 'AsyncGitOperations', 'ConfigManager']
\ No newline at end of file
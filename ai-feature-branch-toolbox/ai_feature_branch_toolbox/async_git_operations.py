@@ -0,0 +1,583 @@
+import os
+import socket
+import asyncio
+import getpass
+import logging
+import functools
+import weakref
+from git import GitCommandError, Repo
+from . import maintenance, remotes
+from .conflicts import parse_unmerged
+from .logging_setup import truncated
+from .merge_tree import MERGE_TREE_ARGS, parse_merge_tree, parse_worktree_branches
+from .ref_index import RefIndex
+from .repo_status import STATUS_ARGS, StatusSnapshot
+from .session import get_session
+from .tracing import trace_methods
+
+logger = logging.getLogger(__name__)
+
+# Event loop -> {working tree: _RepoLock}. asyncio locks belong to one loop,
+# so every loop gets its own set.
+_repo_locks = weakref.WeakKeyDictionary()
+
+
+class _RepoLock:
+    """
+    An asyncio lock the task holding it can enter again, so serialized
+    methods can call each other.
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._owner = None
+        self._depth = 0
+
+    async def __aenter__(self):
+        task = asyncio.current_task()
+        if self._owner is not task:
+            await self._lock.acquire()
+            self._owner = task
+        self._depth += 1
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self._depth -= 1
+        if not self._depth:
+            self._owner = None
+            self._lock.release()
+
+
+def _repo_lock(path):
+    locks = _repo_locks.setdefault(asyncio.get_running_loop(), {})
+    if path not in locks:
+        locks[path] = _RepoLock()
+    return locks[path]
+
+
+def _record_commit(path, every):
+    # Blocking: counts the commit and starts background maintenance when due
+    with Repo(path) as repo:
+        if maintenance.record_commit(repo, every):
+            maintenance.start_background(repo)
+
+
+def _serialized(method):
+    # Run the method while holding the lock of the connected repository
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        if self.path is None:
+            return await method(self, *args, **kwargs)
+        async with _repo_lock(self.path):
+            return await method(self, *args, **kwargs)
+    return wrapper
+
+
+@trace_methods('async_git_operations', exclude=('is_connected',))
+class AsyncGitOperations:
+    """
+    The asyncio counterpart of GitOperations.
+
+    git runs in subprocesses started with asyncio.create_subprocess_exec, so
+    waiting for it never blocks the event loop; configuration and state
+    writes, which reach the disk, run in worker threads for the same reason.
+    Calls on the same working tree
+    are serialized, because git commands that write the index or HEAD cannot
+    run concurrently; calls on different repositories or worktrees run in
+    parallel. Return values match those of GitOperations.
+    """
+
+    def __init__(self, config_manager=None, track_state=True):
+        """
+        Args:
+            config_manager (ConfigManager): Configuration to use. Defaults to
+                the shared session's configuration for config.yaml.
+            track_state (bool): Record the repository path and current branch
+                in the configuration.
+        """
+        self.path = None
+        self.track_state = track_state
+        self.config_manager = config_manager if config_manager is not None else get_session().config_manager
+        self._ref_index = None
+        self._commit_env = None
+
+    async def _git(self, *args, env=None):
+        """
+        Run git in the working tree.
+
+        Returns:
+            tuple: The exit status, standard output and standard error.
+        """
+        process = await asyncio.create_subprocess_exec(
+            'git', '-C', self.path, *args,
+            stdin=asyncio.subprocess.DEVNULL, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+            env=env)
+        try:
+            stdout, stderr = await process.communicate()
+        except asyncio.CancelledError:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            raise
+        return process.returncode, stdout.decode('utf-8', 'replace'), stderr.decode('utf-8', 'replace')
+
+    async def _run(self, *args, env=None):
+        """
+        Run git in the working tree and return its standard output.
+
+        Raises:
+            GitCommandError: If git exits with a non-zero status.
+        """
+        status, stdout, stderr = await self._git(*args, env=env)
+        if status != 0:
+            raise GitCommandError(['git'] + list(args), status, stderr)
+        return stdout
+
+    async def _identity_env(self):
+        # Like GitPython, fall back to user@hostname when no identity is
+        # configured, so commits work in fresh environments
+        if self._commit_env is None:
+            status, _, _ = await self._git('var', 'GIT_COMMITTER_IDENT')
+            if status == 0:
+                self._commit_env = {}
+            else:
+                user = getpass.getuser()
+                email = f'{user}@{socket.gethostname()}'
+                self._commit_env = {
+                    'GIT_AUTHOR_NAME': user, 'GIT_AUTHOR_EMAIL': email,
+                    'GIT_COMMITTER_NAME': user, 'GIT_COMMITTER_EMAIL': email,
+                }
+        return dict(os.environ, **self._commit_env) if self._commit_env else None
+
+    async def initialize_repo(self, path):
+        """
+        Initialize and connect to a Git repository.
+
+        Args:
+            path (str): The path to the Git repository.
+
+        Returns:
+            bool: True if successful, False otherwise.
+        """
+        try:
+            logger.info("Attempting to initialize repo at path: %s", path)
+            if not os.path.exists(path):
+                logger.error("Path %s does not exist. Failing initialization.", path)
+                return False
+
+            self.path = os.path.realpath(path)
+            async with _repo_lock(self.path):
+                status, toplevel, _ = await self._git('rev-parse', '--show-toplevel')
+                if status == 0 and os.path.realpath(toplevel.strip()) == self.path:
+                    logger.info("Connected to existing repository at %s.", path)
+                else:
+                    await self._run('init', '--quiet')
+                    logger.info("Initialized a new repository in existing directory at %s.", path)
+                    await self._create_initial_commit()
+            self._ref_index = None
+
+            if self.track_state:
+                await asyncio.to_thread(self.config_manager.set_value, 'repository.path', path)
+            return True
+        except Exception as e:
+            logger.exception("An error occurred while initializing the repository: %s", e)
+            self.path = None
+            return False
+
+    async def _create_initial_commit(self):
+        with open(os.path.join(self.path, "README.md"), "w") as f:
+            f.write("# Initial commit\n")
+        await self._run('add', 'README.md')
+        await self._run('commit', '--quiet', '-m', 'Initial commit', env=await self._identity_env())
+        logger.info("Created initial commit")
+
+    def is_connected(self):
+        """
+        Check if connected to a Git repository.
+
+        Returns:
+            bool: True if connected, False otherwise.
+        """
+        connected = self.path is not None
+        logger.info("Repository connected: %s", connected)
+        return connected
+
+    async def ref_index(self):
+        """
+        The branch index of the connected repository. Reading it does not start git.
+
+        Returns:
+            RefIndex: The index, or None if not connected to a repository.
+        """
+        if self.path is None:
+            return None
+        if self._ref_index is None:
+            output = await self._run('rev-parse', '--path-format=absolute', '--git-dir', '--git-common-dir')
+            git_dir, common_dir = output.splitlines()
+            self._ref_index = RefIndex(git_dir, common_dir)
+        return self._ref_index
+
+    @_serialized
+    async def status(self):
+        """
+        Take a snapshot of the working tree, index and branch state.
+
+        Returns:
+            StatusSnapshot: The status, or None if not connected to a repository.
+        """
+        if not self.is_connected():
+            logger.error("Not connected to a repository.")
+            return None
+        return StatusSnapshot.from_porcelain(await self._run('status', *STATUS_ARGS))
+
+    @_serialized
+    async def conflicts(self):
+        """
+        Report the conflicted paths left by a merge, read from the index stages.
+
+        Returns:
+            list: One Conflict per conflicted path, or None if not connected
+            to a repository.
+        """
+        if not self.is_connected():
+            logger.error("Not connected to a repository.")
+            return None
+        return parse_unmerged(await self._run('ls-files', '-u', '-z'))
+
+    async def list_branches(self, prefix=''):
+        """
+        List the branches in the repository.
+
+        Args:
+            prefix (str): Only list branches whose name starts with this.
+
+        Returns:
+            list: A sorted list of branch names, or None if not connected to a repository.
+        """
+        if not self.is_connected():
+            logger.error("Not connected to a repository.")
+            return None
+
+        try:
+            branches = (await self.ref_index()).branches(prefix)
+            logger.info("Branches in the repository: %s", truncated(branches))
+            return branches
+        except Exception as e:
+            logger.exception("An error occurred while listing branches: %s", e)
+            return None
+
+    @_serialized
+    async def create_feature_branch(self, branch_name):
+        """
+        Create a new feature branch with enforced naming convention.
+
+        Args:
+            branch_name (str): The name of the new feature branch.
+
+        Returns:
+            bool: True if successful, False otherwise.
+        """
+        if not self.is_connected():
+            logger.error("Not connected to a repository.")
+            return False
+
+        try:
+            branch_prefix = self.config_manager.get_value('branches.prefix', '')
+            if not branch_name.startswith(branch_prefix):
+                logger.error("Branch name must start with '%s'", branch_prefix)
+                return False
+
+            await self._run('checkout', '--quiet', '-b', branch_name)
+            logger.info("Created and switched to new branch: %s", branch_name)
+            return True
+        except Exception as e:
+            logger.exception("An error occurred while creating the feature branch: %s", e)
+            return False
+
+    @_serialized
+    async def switch_branch(self, branch_name):
+        """
+        Switch to the specified branch.
+
+        Args:
+            branch_name (str): The name of the branch to switch to.
+
+        Returns:
+            bool: True if successful, False otherwise.
+        """
+        if not self.is_connected():
+            logger.error("Not connected to a repository.")
+            return False
+
+        try:
+            if not (await self.ref_index()).branch_exists(branch_name):
+                logger.error("Branch '%s' does not exist.", branch_name)
+                return False
+
+            await self._run('checkout', '--quiet', branch_name)
+            logger.info("Switched to branch: %s", branch_name)
+
+            if self.track_state:
+                await asyncio.to_thread(self.config_manager.set_value, 'current_branch', branch_name)
+            return True
+        except Exception as e:
+            logger.exception("An error occurred while switching branches: %s", e)
+            return False
+
+    def close_repo(self):
+        """
+        Disconnect from the repository.
+        """
+        self.path = None
+        self._ref_index = None
+        logger.info("Repository closed and resources released.")
+
+    @_serialized
+    async def commit_changes(self, message):
+        """
+        Commit changes to the current branch.
+
+        Args:
+            message (str): The commit message.
+
+        Returns:
+            bool: True if successful, False otherwise.
+        """
+        if not self.is_connected():
+            logger.error("Not connected to a repository.")
+            return False
+
+        try:
+            logger.info("Attempting to commit changes with message: %s", message)
+            status = await self.status()
+            if status.clean:
+                logger.warning("No changes to commit.")
+                return False
+
+            await self._run('add', '-A')
+            await self._run('commit', '--quiet', '-m', message, env=await self._identity_env())
+            commit = (await self._run('rev-parse', 'HEAD')).strip()
+            logger.info("Changes committed successfully. Commit hash: %s", commit)
+            await self._schedule_maintenance()
+            return True
+        except Exception as e:
+            logger.exception("An error occurred while committing changes: %s", e)
+            return False
+
+    async def _schedule_maintenance(self):
+        # A failure here must not fail the commit that was just made
+        every = self.config_manager.get_value('maintenance.auto_commits', maintenance.DEFAULT_AUTO_COMMITS)
+        if not every:
+            return
+        try:
+            await asyncio.to_thread(_record_commit, self.path, every)
+        except Exception as e:
+            logger.warning("Could not schedule repository maintenance: %s", e)
+
+    @_serialized
+    async def push_changes(self, remote='origin', branch=None):
+        """
+        Push a branch to a remote repository.
+
+        Args:
+            remote (str): The name of the remote.
+            branch (str): The branch to push. Defaults to the current branch.
+
+        Returns:
+            bool: True if successful, False otherwise.
+        """
+        if not self.is_connected():
+            logger.error("Not connected to a repository.")
+            return False
+
+        try:
+            if branch is None:
+                branch = (await self.ref_index()).current_branch()
+                if branch is None:
+                    raise ValueError("HEAD is detached; name the branch to push")
+            await self._run('push', '--quiet', remote, branch)
+            logger.info("Pushed branch '%s' to remote '%s'", branch, remote)
+            return True
+        except Exception as e:
+            logger.exception("An error occurred while pushing changes: %s", e)
+            return False
+
+    async def can_merge(self, feature_branch, main_branch='main'):
+        """
+        Compute the merge of a feature branch into the main branch without a checkout.
+
+        Only objects are written, so this does not take the repository lock.
+
+        Args:
+            feature_branch (str): The branch to merge.
+            main_branch (str): The branch to merge into.
+
+        Returns:
+            MergePreview: The merged tree and its conflicts, or None if not
+            connected or the branches cannot be merged.
+        """
+        if not self.is_connected():
+            logger.error("Not connected to a repository.")
+            return None
+
+        try:
+            output = await self._run('rev-parse', f'{main_branch}^{{commit}}', f'{feature_branch}^{{commit}}')
+            ours, theirs = output.split()
+            command = list(MERGE_TREE_ARGS) + [ours, theirs]
+            status, output, stderr = await self._git('merge-tree', *command)
+            preview = parse_merge_tree(ours, theirs, status, output)
+            if preview is None:
+                raise GitCommandError(['git', 'merge-tree'] + command, status, stderr)
+            return preview
+        except Exception as e:
+            logger.exception("An error occurred while previewing the merge: %s", e)
+            return None
+
+    @_serialized
+    async def merge_feature_branch(self, feature_branch, main_branch='main', dry_run=False, in_memory=False):
+        """
+        Merge a feature branch into the main branch.
+
+        Args:
+            feature_branch (str): The branch to merge.
+            main_branch (str): The branch to merge into.
+            dry_run (bool): Only check whether the merge would be clean.
+            in_memory (bool): Compute the merge in the object database and,
+                if it is clean, commit it to the main branch without checking
+                it out.
+
+        Returns:
+            True if the merge is (or would be) clean, 'CONFLICT' if it has
+            conflicts, False on errors.
+        """
+        if not self.is_connected():
+            logger.error("Not connected to a repository.")
+            return False
+
+        if dry_run or in_memory:
+            preview = await self.can_merge(feature_branch, main_branch)
+            if preview is None:
+                return False
+            if not preview.clean:
+                logger.warning("Merging '%s' into '%s' would conflict in %s paths.", feature_branch, main_branch, len(preview.conflicts))
+                return 'CONFLICT'
+            if dry_run:
+                return True
+            try:
+                await self._commit_merge(preview, main_branch, f"Merge branch '{feature_branch}' into {main_branch}")
+                return True
+            except Exception as e:
+                logger.exception("An error occurred while committing the merge: %s", e)
+                return False
+
+        try:
+            logger.info("Attempting to merge '%s' into '%s'", feature_branch, main_branch)
+            await self.switch_branch(main_branch)
+
+            status, _, stderr = await self._git('merge', '--no-edit', feature_branch, env=await self._identity_env())
+            if status == 0:
+                logger.info("Successfully merged '%s' into '%s'.", feature_branch, main_branch)
+                return True
+            conflicts = await self.conflicts()
+            if conflicts:
+                logger.warning("Merge conflict detected in %s paths. Please resolve conflicts manually.", len(conflicts))
+                return 'CONFLICT'
+            raise GitCommandError(['git', 'merge', feature_branch], status, stderr)
+        except Exception as e:
+            logger.exception("An error occurred while merging branches: %s", e)
+            return False
+
+    async def _is_ancestor(self, ancestor, descendant):
+        status, _, stderr = await self._git('merge-base', '--is-ancestor', ancestor, descendant)
+        if status not in (0, 1):
+            raise GitCommandError(['git', 'merge-base', '--is-ancestor', ancestor, descendant], status, stderr)
+        return status == 0
+
+    async def _commit_merge(self, preview, branch, message):
+        # Same as merge_tree.commit_merge: nothing to record when already
+        # merged, a fast-forward when possible, and the branch advanced only
+        # if it has not moved since the preview
+        if await self._is_ancestor(preview.theirs, preview.ours):
+            logger.info("'%s' is already up to date with %s", branch, preview.theirs)
+            return preview.ours
+        if await self._is_ancestor(preview.ours, preview.theirs):
+            commit = preview.theirs
+        else:
+            commit = (await self._run('commit-tree', preview.tree, '-p', preview.ours, '-p', preview.theirs, '-m', message,
+                                      env=await self._identity_env())).strip()
+        worktree = parse_worktree_branches(await self._run('worktree', 'list', '--porcelain')).get(branch)
+        if worktree is not None:
+            await self._run('-C', worktree, 'merge', '--quiet', '--ff-only', commit)
+        else:
+            await self._run('update-ref', f'refs/heads/{branch}', commit, preview.ours)
+        if commit == preview.theirs:
+            logger.info("Fast-forwarded '%s' to %s", branch, commit)
+        else:
+            logger.info("Created merge commit %s on '%s'", commit, branch)
+        return commit
+
+    @_serialized
+    async def resolve_conflicts(self):
+        if not self.is_connected():
+            logger.error("Not connected to a repository.")
+            return False
+
+        try:
+            if await self.conflicts():
+                logger.info("Conflicts detected. Please resolve them manually and then commit the changes.")
+                return 'CONFLICT'
+            else:
+                logger.info("No conflicts detected.")
+                return True
+        except Exception as e:
+            logger.exception("An error occurred while checking for conflicts: %s", e)
+            return False
+
+    @_serialized
+    async def add_remote(self, name, url, fetch=False):
+        """
+        Add or update a remote repository and check that it is reachable.
+
+        As GitOperations.add_remote(): a `git ls-remote` check, remembered
+        for repository.remote_verify_ttl seconds, unless fetch is set.
+
+        Args:
+            name (str): The name of the remote (e.g., 'origin').
+            url (str): The URL of the remote repository.
+            fetch (bool): Fetch the remote's branches instead of only
+                checking it.
+
+        Returns:
+            bool: True if successful, False otherwise.
+        """
+        if not self.is_connected():
+            logger.error("Not connected to a repository.")
+            return False
+
+        try:
+            status, old_url, _ = await self._git('remote', 'get-url', name)
+            old_url = old_url.strip()
+            if status == 0:
+                if old_url != url:
+                    await self._run('remote', 'set-url', name, url)
+                    logger.info("Updated remote '%s' URL from %s to %s", name, old_url, url)
+                else:
+                    logger.info("Remote '%s' already exists with the correct URL", name)
+            else:
+                await self._run('remote', 'add', name, url)
+                logger.info("Added new remote '%s' with URL: %s", name, url)
+
+            if fetch:
+                await self._run('remote', 'update', name)
+                logger.info("Fetched remote '%s'", name)
+            elif remotes.recently_verified(self.config_manager, name, url):
+                logger.info("Remote '%s' was verified recently", name)
+                return True
+            else:
+                await self._run('ls-remote', '--quiet', name, 'HEAD', env=dict(os.environ, **remotes.VERIFY_ENV))
+                logger.info("Successfully verified remote '%s'", name)
+            if self.track_state:
+                await asyncio.to_thread(remotes.record_verified, self.config_manager, name, url)
+            return True
+        except Exception as e:
+            logger.exception("An error occurred while managing remote: %s", e)
+            return False
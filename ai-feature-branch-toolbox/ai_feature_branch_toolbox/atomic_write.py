@@ -0,0 +1,79 @@
+import os
+import itertools
+import threading
+from . import tracing
+
+_counter = itertools.count()
+_counter_lock = threading.Lock()
+
+
+def _temp_path(path):
+    with _counter_lock:
+        sequence = next(_counter)
+    directory, name = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, f".{name}.{os.getpid()}.{sequence}.tmp")
+
+
+def write_atomic(path, data, fsync=False):
+    """
+    Replace a file's content atomically.
+
+    The data is written to a temporary file in the same directory, which is
+    then renamed over the target, so readers see either the old or the new
+    content and never a truncated file.
+
+    Args:
+        path (str): The file to write.
+        data (str): The new content.
+        fsync (bool): Flush the data and the directory entry to stable storage
+            before returning, so the new content survives a crash.
+    """
+    temp_path = _temp_path(path)
+    # os.open honours the umask like a plain open() would
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, path)
+        if tracing.is_enabled():
+            tracing.record_bytes_written(len(data.encode('utf-8')))
+        if fsync:
+            _fsync_directory(os.path.dirname(os.path.abspath(path)))
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def _fsync_directory(directory):
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        # Directories cannot be opened on some platforms (Windows)
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_if_changed(path, data):
+    """
+    Atomically write a file unless it already holds exactly this content.
+
+    Returns:
+        bool: True if the file was written, False if it was left untouched.
+    """
+    try:
+        with open(path, 'r') as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    write_atomic(path, data)
+    return True
@@ -0,0 +1,342 @@
+import io
+import logging
+import subprocess
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_BYTES = 32 * 1024 * 1024
+DEFAULT_STREAM_THRESHOLD = 1024 * 1024
+DEFAULT_TREE_CACHE_SIZE = 4096
+
+TREE_MODE = b'40000'
+# Directories and submodules are not files
+NON_BLOB_MODES = (TREE_MODE, b'160000')
+
+
+class BlobCache:
+    """
+    Blob contents by object id, evicting the least recently used once the
+    total size exceeds a limit. Blobs are immutable, so entries never go stale.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._blobs = OrderedDict()
+
+    def get(self, oid):
+        data = self._blobs.get(oid)
+        if data is not None:
+            self._blobs.move_to_end(oid)
+        return data
+
+    def put(self, oid, data):
+        if len(data) > self.max_bytes or oid in self._blobs:
+            return
+        self._blobs[oid] = data
+        self.size += len(data)
+        while self.size > self.max_bytes:
+            _, evicted = self._blobs.popitem(last=False)
+            self.size -= len(evicted)
+
+    def __contains__(self, oid):
+        return oid in self._blobs
+
+    def __len__(self):
+        return len(self._blobs)
+
+
+class BlobStream(io.RawIOBase):
+    """
+    A large blob read straight from the `git cat-file --batch` output.
+
+    Only valid until the next file is requested from the BlobReader.
+
+    Attributes:
+        oid (str): The blob's object id.
+        size (int): The blob's size in bytes.
+    """
+
+    def __init__(self, stream, oid, size):
+        super().__init__()
+        self._stream = stream
+        self.oid = oid
+        self.size = size
+        self._remaining = size
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if not self._remaining:
+            return 0
+        view = memoryview(buffer)[:self._remaining]
+        count = self._stream.readinto(view)
+        if not count:
+            raise EOFError("git cat-file exited while streaming a blob")
+        self._remaining -= count
+        if not self._remaining:
+            self._stream.read(1)  # the newline after the contents
+        return count
+
+    def drain(self):
+        while self._remaining:
+            self.read(min(self._remaining, 65536))
+
+
+def parse_tree(data, oid_size=20):
+    """
+    Parse the contents of a git tree object.
+
+    Args:
+        data (bytes): The raw tree.
+        oid_size (int): Bytes per object id; 32 in SHA-256 repositories.
+
+    Returns:
+        dict: Entry name as bytes to a (mode, oid) tuple, where mode is the
+        octal mode as bytes and oid is hexadecimal.
+    """
+    entries = {}
+    position = 0
+    while position < len(data):
+        space = data.index(b' ', position)
+        nul = data.index(b'\0', space)
+        entries[data[space + 1:nul]] = (data[position:space], data[nul + 1:nul + 1 + oid_size].hex())
+        position = nul + 1 + oid_size
+    return entries
+
+
+class BlobReader:
+    """
+    Reads files at a revision through a long-lived `git cat-file --batch` process.
+
+    Paths are resolved in Python from tree objects, which are parsed once and
+    kept by object id; the first request for a directory costs one round trip
+    per directory level, later ones none. The blobs are then requested all at
+    once. Requests are written from a separate thread, so git never blocks on
+    a full pipe while its output is being read.
+
+    Blobs up to stream_threshold bytes are kept in an LRU cache by object id,
+    which is shared between revisions: a file that is the same on two
+    branches is transferred once. Larger blobs are streamed and not cached.
+    """
+
+    def __init__(self, git_dir, cache_bytes=DEFAULT_CACHE_BYTES, stream_threshold=DEFAULT_STREAM_THRESHOLD,
+                 tree_cache_size=DEFAULT_TREE_CACHE_SIZE):
+        """
+        Args:
+            git_dir (str): The repository's git directory.
+            cache_bytes (int): Total size of the cached blobs.
+            stream_threshold (int): Blobs larger than this are streamed
+                instead of read into memory and cached.
+            tree_cache_size (int): Number of parsed trees to keep.
+        """
+        self.git_dir = git_dir
+        self.cache = BlobCache(cache_bytes)
+        self.stream_threshold = stream_threshold
+        self.tree_cache_size = tree_cache_size
+        self._trees = OrderedDict()
+        self._process = None
+        self._lock = threading.Lock()
+
+    def _batch(self):
+        if self._process is None or self._process.poll() is not None:
+            self._process = subprocess.Popen(
+                ['git', '--git-dir', self.git_dir, 'cat-file', '--batch'],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            logger.debug("Started git cat-file --batch for %s", self.git_dir)
+        return self._process
+
+    def _send(self, requests):
+        # Write from a thread: git stops reading its input while its output
+        # pipe is full, so writing everything before reading could deadlock
+        process = self._batch()
+
+        def write():
+            try:
+                process.stdin.write(b''.join(request + b'\n' for request in requests))
+                process.stdin.flush()
+            except (BrokenPipeError, ValueError):
+                pass
+        writer = threading.Thread(target=write, daemon=True)
+        writer.start()
+        return process.stdout, writer
+
+    @staticmethod
+    def _read_header(stdout):
+        # '<oid> <type> <size>', or '<object> missing' (or 'ambiguous')
+        line = stdout.readline().rstrip(b'\n')
+        if not line:
+            raise EOFError("git cat-file exited unexpectedly")
+        if line.endswith((b' missing', b' ambiguous')):
+            return None
+        oid, kind, size = line.rsplit(b' ', 2)
+        return oid.decode('ascii'), kind.decode('ascii'), int(size)
+
+    def _fetch(self, requests):
+        # Read small objects fully: (oid, type, contents), or None if missing
+        stdout, writer = self._send(requests)
+        objects = []
+        for _ in requests:
+            header = self._read_header(stdout)
+            if header is None:
+                objects.append(None)
+                continue
+            data = stdout.read(header[2])
+            stdout.read(1)
+            objects.append((header[0], header[1], data))
+        writer.join()
+        return objects
+
+    def close(self):
+        """
+        Stop the git process. It is started again when needed.
+        """
+        with self._lock:
+            self._close()
+
+    def _close(self):
+        if self._process is not None:
+            if self._process.poll() is None:
+                self._process.kill()
+            self._process.wait()
+            self._process.stdin.close()
+            self._process.stdout.close()
+            self._process = None
+
+    def _resolve(self, rev):
+        if '\n' not in rev:
+            commit = self._fetch([f'{rev}^{{commit}}'.encode('utf-8')])[0]
+            if commit is not None:
+                # The first line of a commit is 'tree <oid>'
+                return commit[0], commit[2].split(b'\n', 1)[0].split(b' ', 1)[1].decode('ascii')
+        raise ValueError(f"Unknown revision: {rev}")
+
+    def resolve(self, rev):
+        """
+        Args:
+            rev (str): A revision, such as a branch name.
+
+        Returns:
+            str: The commit id it points to.
+
+        Raises:
+            ValueError: If the revision is not a commit.
+        """
+        with self._lock:
+            return self._resolve(rev)[0]
+
+    def _tree(self, oid):
+        tree = self._trees.get(oid)
+        if tree is not None:
+            self._trees.move_to_end(oid)
+        return tree
+
+    def _lookup(self, root, paths):
+        # Resolve every path to its (mode, oid) entry, or None, walking all of
+        # them down one directory level per round trip
+        oid_size = len(root) // 2
+        entries = [None] * len(paths)
+        walks = []
+        for index, path in enumerate(paths):
+            parts = [part.encode('utf-8') for part in path.split('/') if part]
+            if parts and '\n' not in path:
+                walks.append((index, root, parts))
+        while walks:
+            missing = list(dict.fromkeys(tree for _, tree, _ in walks if self._tree(tree) is None))
+            for fetched in self._fetch([tree.encode('ascii') for tree in missing]):
+                if fetched is not None and fetched[1] == 'tree':
+                    self._trees[fetched[0]] = parse_tree(fetched[2], oid_size)
+                    if len(self._trees) > self.tree_cache_size:
+                        self._trees.popitem(last=False)
+            next_walks = []
+            for index, tree, parts in walks:
+                entry = (self._tree(tree) or {}).get(parts[0])
+                if entry is None:
+                    continue
+                if len(parts) == 1:
+                    entries[index] = entry
+                elif entry[0] == TREE_MODE:
+                    next_walks.append((index, entry[1], parts[1:]))
+            walks = next_walks
+        return entries
+
+    def iter_files(self, rev, paths):
+        """
+        Read files at a revision, in order.
+
+        Args:
+            rev (str): The revision to read from. It is resolved once, so
+                every file comes from the same commit.
+            paths (iterable): Paths relative to the repository root.
+
+        Yields:
+            tuple: The path and a binary file object with the contents, or
+            None if the path is not a file at the revision. Streamed blobs
+            are only readable until the next item is requested.
+
+        Raises:
+            ValueError: If the revision is not a commit.
+        """
+        paths = list(paths)
+        with self._lock:
+            complete = False
+            try:
+                _, root = self._resolve(rev)
+                entries = [entry if entry is not None and entry[0] not in NON_BLOB_MODES else None
+                           for entry in self._lookup(root, paths)]
+
+                # Sizes are only known once git answers, so every blob that is
+                # not cached yet is requested, even when it appears twice
+                found = {entry[1]: self.cache.get(entry[1]) for entry in entries if entry is not None}
+                wanted = [entry[1] for entry in entries if entry is not None and found[entry[1]] is None]
+                logger.debug("Reading %s files at %s: %s blobs fetched", len(paths), rev, len(wanted))
+
+                stdout, writer = self._send([oid.encode('ascii') for oid in wanted]) if wanted else (None, None)
+                for path, entry in zip(paths, entries):
+                    if entry is None:
+                        yield path, None
+                        continue
+                    oid = entry[1]
+                    if found[oid] is not None:
+                        yield path, io.BytesIO(found[oid])
+                        continue
+                    header = self._read_header(stdout)
+                    if header is None or header[0] != oid:
+                        raise RuntimeError(f"Unexpected git cat-file output for {path}")
+                    size = header[2]
+                    if size > self.stream_threshold:
+                        stream = BlobStream(stdout, oid, size)
+                        yield path, stream
+                        stream.drain()
+                    else:
+                        data = stdout.read(size)
+                        stdout.read(1)
+                        self.cache.put(oid, data)
+                        yield path, io.BytesIO(data)
+                if writer is not None:
+                    writer.join()
+                complete = True
+            finally:
+                # A request abandoned halfway leaves unread output behind
+                if not complete:
+                    self._close()
+
+    def read_files(self, rev, paths):
+        """
+        Read files at a revision into memory.
+
+        Args:
+            rev (str): The revision to read from.
+            paths (iterable): Paths relative to the repository root.
+
+        Returns:
+            dict: Path to contents as bytes, or None if the path is not a
+            file at the revision.
+
+        Raises:
+            ValueError: If the revision is not a commit.
+        """
+        return {path: None if stream is None else stream.read() for path, stream in self.iter_files(rev, paths)}
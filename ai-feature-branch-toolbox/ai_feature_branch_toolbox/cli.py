@@ -1,23 +1,35 @@
 import argparse
+import json
+import os
 import sys
-from .git_operations import GitOperations
-from .config_manager import ConfigManager
+from . import logging_setup, tracing
+from .daemon import forward_command
+
+# GitOperations, the session and the daemon server are imported inside the
+# commands that use them, so that help output and forwarding to a running
+# daemon never pay for loading GitPython and PyYAML.
 
 def init_command(args):
-    git_ops = GitOperations()
-    config_manager = ConfigManager(args.config_path)
+    from .git_operations import GitOperations
+    from .session import get_session
+
+    config_manager = get_session(args.config_path).config_manager
+    logging_setup.configure_logging_from_config(config_manager)
+    git_ops = GitOperations(config_manager)
 
     try:
-        if git_ops.initialize_repo(args.repo_path):
-            print(f"Successfully initialized repository at {args.repo_path}")
-            config_manager.set_value('repository.path', args.repo_path)
-            if args.remote_url:
-                if git_ops.add_remote('origin', args.remote_url):
-                    print(f"Added remote 'origin' with URL: {args.remote_url}")
-                    config_manager.set_value('repository.remote_url', args.remote_url)
-                else:
-                    print(f"Failed to add remote repository")
-            config_manager._save_config()
+        with config_manager.transaction():
+            initialized = git_ops.initialize_repo(args.repo_path)
+            if initialized:
+                print(f"Successfully initialized repository at {args.repo_path}")
+                config_manager.set_value('repository.path', args.repo_path)
+                if args.remote_url:
+                    if git_ops.add_remote('origin', args.remote_url, fetch=args.fetch):
+                        print(f"Added remote 'origin' with URL: {args.remote_url}")
+                        config_manager.set_value('repository.remote_url', args.remote_url)
+                    else:
+                        print(f"Failed to add remote repository")
+        if initialized:
             print(f"Updated configuration file at {args.config_path}")
         else:
             print(f"Failed to initialize repository at {args.repo_path}")
@@ -50,7 +62,7 @@ def commit_command(args, git_ops):
         sys.exit(1)
 
 def push_command(args, git_ops):
-    config_manager = ConfigManager('config.yaml')
+    config_manager = git_ops.config_manager
     remote_url = config_manager.get_value('repository.remote_url')
     if not remote_url:
         print("Remote URL not set. Please provide a remote URL:")
@@ -58,7 +70,6 @@ def push_command(args, git_ops):
         if git_ops.add_remote('origin', remote_url):
             print(f"Added remote 'origin' with URL: {remote_url}")
             config_manager.set_value('repository.remote_url', remote_url)
-            config_manager._save_config()
         else:
             print("Failed to add remote repository")
             sys.exit(1)
@@ -69,10 +80,44 @@ def push_command(args, git_ops):
         print("Failed to push changes")
         sys.exit(1)
 
+def print_conflict_report(result, git_ops, conflicts=None):
+    if conflicts is None:
+        conflicts = git_ops.conflicts() if result == 'CONFLICT' else []
+    status = {True: 'ok', 'CONFLICT': 'conflict'}.get(result, 'failed')
+    print(json.dumps({'result': status, 'conflicts': [conflict.to_dict() for conflict in conflicts or []]}))
+    if status == 'failed':
+        sys.exit(1)
+
 def merge_branch_command(args, git_ops):
-    result = git_ops.merge_feature_branch(args.feature_branch, args.main_branch)
+    if args.dry_run:
+        preview = git_ops.can_merge(args.feature_branch, args.main_branch)
+        result = False if preview is None else (True if preview.clean else 'CONFLICT')
+        if args.json:
+            print_conflict_report(result, git_ops, preview.conflicts if preview else [])
+        elif result == True:
+            print(f"'{args.feature_branch}' merges cleanly into '{args.main_branch}'")
+        elif result == 'CONFLICT':
+            print(f"Merging '{args.feature_branch}' into '{args.main_branch}' would conflict in:")
+            for conflict in preview.conflicts:
+                print(f"  {conflict.path} ({conflict.type})")
+        else:
+            print(f"Failed to check the merge of '{args.feature_branch}' into '{args.main_branch}'")
+            sys.exit(1)
+        return
+
+    result = git_ops.merge_feature_branch(args.feature_branch, args.main_branch, in_memory=args.in_memory)
+    if args.json:
+        conflicts = None
+        if args.in_memory and result == 'CONFLICT':
+            # Nothing reached the index; recompute the conflicts in memory
+            preview = git_ops.can_merge(args.feature_branch, args.main_branch)
+            conflicts = preview.conflicts if preview is not None else []
+        print_conflict_report(result, git_ops, conflicts)
+        return
     if result == True:
         print(f"Successfully merged '{args.feature_branch}' into '{args.main_branch}'")
+    elif result == 'CONFLICT' and args.in_memory:
+        print("Merge conflict detected. Nothing was committed; merge without --in-memory to resolve the conflicts.")
     elif result == 'CONFLICT':
         print("Merge conflict detected. Please resolve conflicts manually and then commit the changes.")
         print("After resolving conflicts, run the 'resolve-conflicts' command.")
@@ -82,6 +127,9 @@ def merge_branch_command(args, git_ops):
 
 def resolve_conflicts_command(args, git_ops):
     result = git_ops.resolve_conflicts()
+    if args.json:
+        print_conflict_report(result, git_ops)
+        return
     if result == True:
         print("No conflicts detected.")
     elif result == 'CONFLICT':
@@ -94,6 +142,171 @@ def resolve_conflicts_command(args, git_ops):
         print("Failed to check for conflicts")
         sys.exit(1)
 
+def merge_matrix_command(args, git_ops):
+    report = git_ops.merge_matrix(pairs=not args.no_pairs, workers=args.workers)
+    if report is None:
+        print("Failed to compute the merge matrix")
+        sys.exit(1)
+    if args.json:
+        print(json.dumps(report.to_dict()))
+        return
+    if not report.branches:
+        print("No feature branches found.")
+        return
+    print(report.format_table())
+    print(f"'.' merges cleanly, 'X' conflicts, '!' failed ({report.computed} merged, {report.cached} cached)")
+
+def maintain_command(args, git_ops):
+    report = git_ops.maintain_repo(measure=not args.no_timings)
+    if report is None:
+        print("Failed to maintain the repository")
+        sys.exit(1)
+    if args.json:
+        print(json.dumps(report.to_dict()))
+    else:
+        print(report.format_table())
+    if not report.ok:
+        sys.exit(1)
+
+def worktree_command(args, git_ops):
+    pool = git_ops.worktree_pool(args.pool_size)
+    if args.worktree_action == 'lease':
+        lease = pool.lease(args.branch, start_point=args.start_point, hold=True)
+        print(lease.path)
+    elif args.worktree_action == 'release':
+        if not pool.release(args.branch):
+            print(f"No leased worktree for branch: {args.branch}")
+            sys.exit(1)
+        print(f"Released worktree for branch: {args.branch}")
+    elif args.worktree_action == 'prune':
+        removed = pool.prune(args.keep)
+        print(f"Removed {removed} idle worktrees")
+    else:
+        worktrees = pool.worktrees()
+        if args.json:
+            print(json.dumps(worktrees))
+            return
+        for entry in worktrees:
+            print(f"{'leased' if entry['leased'] else 'idle':7} {entry['branch']:30} {entry['path']}")
+
+def fsmonitor_command(args, git_ops):
+    if args.fsmonitor_action == 'start':
+        if not git_ops.enable_fsmonitor():
+            print("Filesystem monitor could not be started")
+            sys.exit(1)
+        print("Filesystem monitor started")
+    elif args.fsmonitor_action == 'stop':
+        if not git_ops.disable_fsmonitor():
+            sys.exit(1)
+        print("Filesystem monitor stopped")
+    else:
+        state = git_ops.fsmonitor_status()
+        if args.json:
+            print(json.dumps(state))
+            return
+        if state['mode'] is None:
+            print("Filesystem monitor: off")
+        elif state['mode'] == 'builtin':
+            print("Filesystem monitor: git fsmonitor--daemon")
+        elif state['daemon'] is None:
+            print("Filesystem monitor: hook configured, daemon not running (git scans the working tree)")
+        else:
+            daemon = state['daemon']
+            print(f"Filesystem monitor: inotify daemon (pid {daemon['pid']}), "
+                  f"{daemon['watched_directories']} directories watched, {daemon['queries']} queries answered")
+
+def worktree_git_operations(git_ops, branch):
+    """
+    Operations on the pooled worktree leased for a branch.
+
+    Args:
+        git_ops (GitOperations): Operations on the main repository.
+        branch (str): The branch whose worktree to use.
+
+    Returns:
+        GitOperations: Operations bound to the worktree.
+
+    Raises:
+        ValueError: If no pooled worktree has the branch checked out.
+    """
+    from .git_operations import GitOperations
+
+    path = git_ops.worktree_pool().path_for(branch)
+    if path is None:
+        raise ValueError(f"No pooled worktree for branch '{branch}'. Run 'worktree lease {branch}' first.")
+    return GitOperations.for_worktree(path, git_ops.config_manager)
+
+def batch_command(args, git_ops):
+    stream = open(args.file, 'r') if args.file else sys.stdin
+    failed = False
+    try:
+        for result in git_ops.run_batch(stream, stop_on_error=args.stop_on_error):
+            failed = failed or not result['ok']
+            print(json.dumps(result), flush=True)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    if failed:
+        sys.exit(1)
+
+def iter_fleet_repos(args):
+    for path in args.repo or []:
+        yield path
+    if args.repos_file:
+        stream = sys.stdin if args.repos_file == '-' else open(args.repos_file, 'r')
+        try:
+            for line in stream:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    yield line
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+def fleet_command(args):
+    from .fleet import FleetExecutor
+    from .git_operations import BATCH_COMMANDS
+
+    if not args.repo and not args.repos_file:
+        print("No repositories given; use --repo or --repos-file")
+        sys.exit(1)
+
+    command = {'command': args.fleet_command}
+    for key in BATCH_COMMANDS[args.fleet_command][1]:
+        if getattr(args, key, None) is not None:
+            command[key] = getattr(args, key)
+
+    executor = FleetExecutor(args.workers, processes=args.processes)
+    for result in executor.run(iter_fleet_repos(args), command):
+        if args.json:
+            print(json.dumps(result), flush=True)
+        else:
+            detail = '' if result['ok'] else f"  {result.get('error') or result.get('result')}"
+            print(f"{'ok' if result['ok'] else 'FAILED':6} {result['elapsed_ms']:10.1f} ms  {result['repo']}{detail}", flush=True)
+
+    summary = executor.summary(args.slowest)
+    if args.json:
+        print(json.dumps({'summary': summary.to_dict()}))
+    else:
+        print(summary.format())
+    if summary.failed:
+        sys.exit(1)
+
+def print_tracing(args, root):
+    """
+    Print the span tree and metrics requested with --trace and --metrics to stderr.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments.
+        root (Span): The span around the command, or None.
+    """
+    if args.trace and root is not None:
+        print(root.format_tree(), file=sys.stderr)
+    if args.metrics == 'json':
+        print(tracing.METRICS.to_json(), file=sys.stderr)
+    elif args.metrics == 'prometheus':
+        print(tracing.METRICS.to_prometheus(), end='', file=sys.stderr)
+
 def help_command(args):
     print("AI Feature Branch Toolbox CLI Help")
     print("Available commands:")
@@ -104,13 +317,75 @@ def help_command(args):
     print("  push             Push changes to the remote repository")
     print("  merge            Merge a feature branch into the main branch")
     print("  resolve-conflicts Check and resolve merge conflicts")
+    print("  merge-matrix     Check which feature branches merge cleanly")
+    print("  worktree         Lease, release and list pooled worktrees")
+    print("  fsmonitor        Track working tree changes with a filesystem monitor")
+    print("  maintain         Pack objects and write commit-graphs (alias: tune)")
+    print("  batch            Run JSON line commands against one open repository")
+    print("  fleet            Run a command across many repositories")
+    print("  serve            Run a daemon that keeps repositories open")
     print("Use 'ai-feature-branch-toolbox <command> --help' for more information on a command.")
 
-def main():
+REPO_COMMANDS = {
+    'create-branch': create_branch_command,
+    'switch-branch': switch_branch_command,
+    'commit': commit_command,
+    'push': push_command,
+    'merge': merge_branch_command,
+    'resolve-conflicts': resolve_conflicts_command,
+    'merge-matrix': merge_matrix_command,
+    'worktree': worktree_command,
+    'fsmonitor': fsmonitor_command,
+    'maintain': maintain_command,
+    'tune': maintain_command,
+}
+
+def run_repo_command(args, git_ops):
+    """
+    Dispatch a repository command to its handler. Commands given --worktree
+    run in the pooled worktree leased for that branch.
+
+    Args:
+        args (argparse.Namespace): Parsed command line arguments.
+        git_ops (GitOperations): Operations object connected to the repository.
+    """
+    if getattr(args, 'worktree', None):
+        worktree_ops = worktree_git_operations(git_ops, args.worktree)
+        try:
+            REPO_COMMANDS[args.command](args, worktree_ops)
+        finally:
+            worktree_ops.close_repo()
+        return
+    REPO_COMMANDS[args.command](args, git_ops)
+
+def serve_command(args):
+    from .daemon import ToolboxDaemon, stop_daemon
+
+    if args.stop:
+        if stop_daemon(args.socket):
+            print("Daemon stopped")
+        else:
+            print("No running daemon found")
+            sys.exit(1)
+        return
+
+    if os.path.exists('config.yaml'):
+        from .session import get_session
+        logging_setup.configure_logging_from_config(get_session('config.yaml').config_manager)
+
+    daemon = ToolboxDaemon(args.socket)
+    print(f"Serving on {daemon.socket_path}")
+    sys.stdout.flush()
+    daemon.serve_forever()
+
+def build_parser():
     parser = argparse.ArgumentParser(
+        prog='ai-feature-branch-toolbox',
         description="AI Feature Branch Toolbox CLI",
         epilog="For more information on each command, use: ai-feature-branch-toolbox <command> --help"
     )
+    parser.add_argument('--trace', action='store_true', help='Print a tree of timed spans for the command to stderr')
+    parser.add_argument('--metrics', choices=('json', 'prometheus'), help='Print the collected metrics to stderr')
     subparsers = parser.add_subparsers(dest='command', help='Command to execute')
 
     # Init command
@@ -118,6 +393,7 @@ def main():
     init_parser.add_argument('--repo-path', required=True, help='Path to the Git repository')
     init_parser.add_argument('--config-path', default='config.yaml', help='Path to the configuration file')
     init_parser.add_argument('--remote-url', help='URL of the remote repository')
+    init_parser.add_argument('--fetch', action='store_true', help='Fetch the remote instead of only checking that it is reachable')
 
     # Create branch command
     create_branch_parser = subparsers.add_parser('create-branch', help='Create a new feature branch')
@@ -130,65 +406,153 @@ def main():
     # Commit changes command
     commit_parser = subparsers.add_parser('commit', help='Commit changes to the current branch')
     commit_parser.add_argument('message', help='Commit message')
+    commit_parser.add_argument('--worktree', metavar='BRANCH', help='Run in the pooled worktree leased for this branch')
 
     # Push changes command
     push_parser = subparsers.add_parser('push', help='Push changes to the remote repository')
     push_parser.add_argument('--remote', default='origin', help='Name of the remote repository')
     push_parser.add_argument('--branch', help='Name of the branch to push')
+    push_parser.add_argument('--worktree', metavar='BRANCH', help='Run in the pooled worktree leased for this branch')
 
     # Add merge command
     merge_parser = subparsers.add_parser('merge', help='Merge a feature branch into the main branch')
     merge_parser.add_argument('feature_branch', help='Name of the feature branch to merge')
     merge_parser.add_argument('--main-branch', default='main', help='Name of the main branch (default: main)')
+    merge_parser.add_argument('--json', action='store_true', help='Print the result and any conflicts as JSON')
+    merge_mode = merge_parser.add_mutually_exclusive_group()
+    merge_mode.add_argument('--dry-run', action='store_true', help='Only check whether the merge is clean, without a checkout')
+    merge_mode.add_argument('--in-memory', action='store_true', help='Commit a clean merge without checking out the main branch')
 
     # Add resolve-conflicts command
     resolve_conflicts_parser = subparsers.add_parser('resolve-conflicts', help='Check and resolve merge conflicts')
+    resolve_conflicts_parser.add_argument('--json', action='store_true', help='Print the conflicts as JSON')
+    resolve_conflicts_parser.add_argument('--worktree', metavar='BRANCH', help='Run in the pooled worktree leased for this branch')
+
+    # Add merge-matrix command
+    merge_matrix_parser = subparsers.add_parser('merge-matrix', help='Check which feature branches merge cleanly')
+    merge_matrix_parser.add_argument('--no-pairs', action='store_true', help='Only check feature branches against the main branch')
+    merge_matrix_parser.add_argument('--workers', type=int, help='Worker processes (default: CPU count)')
+    merge_matrix_parser.add_argument('--json', action='store_true', help='Print the matrix as JSON')
+
+    # Add worktree command
+    worktree_parser = subparsers.add_parser('worktree', help='Lease, release and list pooled worktrees')
+    worktree_parser.add_argument('--pool-size', type=int, help='Maximum number of worktrees (default: worktrees.pool_size or 4)')
+    worktree_actions = worktree_parser.add_subparsers(dest='worktree_action', required=True)
+    worktree_lease_parser = worktree_actions.add_parser('lease', help='Lease a worktree for a branch and print its path')
+    worktree_lease_parser.add_argument('branch', help='Branch to check out in the worktree')
+    worktree_lease_parser.add_argument('--from', dest='start_point', help='Create the branch from this revision if it does not exist')
+    worktree_release_parser = worktree_actions.add_parser('release', help='Return the worktree of a branch to the pool')
+    worktree_release_parser.add_argument('branch', help='Branch whose worktree to release')
+    worktree_list_parser = worktree_actions.add_parser('list', help='List pooled worktrees')
+    worktree_list_parser.add_argument('--json', action='store_true', help='Print the worktrees as JSON')
+    worktree_prune_parser = worktree_actions.add_parser('prune', help='Remove least recently used idle worktrees')
+    worktree_prune_parser.add_argument('--keep', type=int, help='Worktrees to keep (default: the pool size)')
+
+    # Add fsmonitor command
+    fsmonitor_parser = subparsers.add_parser('fsmonitor', help='Track working tree changes with a filesystem monitor')
+    fsmonitor_actions = fsmonitor_parser.add_subparsers(dest='fsmonitor_action', required=True)
+    fsmonitor_actions.add_parser('start', help='Start the monitor and configure git to query it')
+    fsmonitor_actions.add_parser('stop', help='Stop the monitor and go back to scanning the working tree')
+    fsmonitor_status_parser = fsmonitor_actions.add_parser('status', help='Show whether a monitor is active')
+    fsmonitor_status_parser.add_argument('--json', action='store_true', help='Print the state as JSON')
+
+    # Add maintain command
+    maintain_parser = subparsers.add_parser('maintain', aliases=['tune'], help='Pack objects and write commit-graphs')
+    maintain_parser.add_argument('--no-timings', action='store_true', help='Skip timing key operations before and after')
+    maintain_parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    # Add batch command
+    batch_parser = subparsers.add_parser('batch', help='Run JSON line commands against one open repository')
+    batch_parser.add_argument('--file', help='File with one JSON command per line (default: stdin)')
+    batch_parser.add_argument('--stop-on-error', action='store_true', help='Stop after the first failing command')
+
+    # Add fleet command
+    fleet_parser = subparsers.add_parser('fleet', help='Run a command across many repositories')
+    fleet_parser.add_argument('--repo', action='append', metavar='PATH', help='Repository to run in (repeatable)')
+    fleet_parser.add_argument('--repos-file', metavar='FILE', help="File with one repository path per line ('-' for stdin)")
+    fleet_parser.add_argument('--workers', type=int, default=8, help='Repositories processed at the same time (default: 8)')
+    fleet_parser.add_argument('--processes', action='store_true', help='Use worker processes instead of threads')
+    fleet_parser.add_argument('--slowest', type=int, default=5, help='Slowest repositories listed in the summary (default: 5)')
+    fleet_parser.add_argument('--json', action='store_true', help='Print one JSON result per repository and a JSON summary')
+    fleet_commands = fleet_parser.add_subparsers(dest='fleet_command', required=True)
+    fleet_create_parser = fleet_commands.add_parser('create-branch', help='Create and switch to a feature branch')
+    fleet_create_parser.add_argument('branch_name', help='Name of the new branch')
+    fleet_commit_parser = fleet_commands.add_parser('commit', help='Commit all changes')
+    fleet_commit_parser.add_argument('message', help='Commit message')
+    fleet_merge_parser = fleet_commands.add_parser('merge', help='Merge a feature branch into the main branch')
+    fleet_merge_parser.add_argument('feature_branch', help='Name of the feature branch to merge')
+    fleet_merge_parser.add_argument('--main-branch', default='main', help='Name of the main branch (default: main)')
+    fleet_merge_mode = fleet_merge_parser.add_mutually_exclusive_group()
+    fleet_merge_mode.add_argument('--dry-run', action='store_true', help='Only check whether the merge is clean')
+    fleet_merge_mode.add_argument('--in-memory', action='store_true', help='Commit a clean merge without checking out the main branch')
+    fleet_push_parser = fleet_commands.add_parser('push', help='Push a branch')
+    fleet_push_parser.add_argument('--remote', default='origin', help='Name of the remote repository')
+    fleet_push_parser.add_argument('--branch', help='Name of the branch to push (default: the current branch)')
+
+    # Add serve command
+    serve_parser = subparsers.add_parser('serve', help='Run a daemon that keeps repositories open')
+    serve_parser.add_argument('--socket', help='Path of the Unix socket to listen on')
+    serve_parser.add_argument('--stop', action='store_true', help='Stop the running daemon')
 
     # Add help command
     help_parser = subparsers.add_parser('help', help='Show help message')
 
-    args = parser.parse_args()
+    return parser
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+
+    # Hand repository commands to a running daemon, if there is one
+    if argv and argv[0] in REPO_COMMANDS:
+        exit_code = forward_command(argv)
+        if exit_code is not None:
+            sys.exit(exit_code)
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
 
     if not args.command:
         parser.print_help()
         sys.exit(1)
 
+    # Only warnings until a command applies the logging section of its
+    # configuration, which loading the configuration itself precedes
+    logging_setup.configure_logging('WARNING')
+    if args.trace or args.metrics:
+        tracing.enable()
+
+    root = None
     try:
-        git_ops = GitOperations()
-        config_manager = ConfigManager('config.yaml')
+        with tracing.span(f'cli.{args.command}') as root:
+            if args.command == 'init':
+                init_command(args)
+            elif args.command == 'help':
+                help_command(args)
+            elif args.command == 'serve':
+                serve_command(args)
+            elif args.command == 'fleet':
+                fleet_command(args)
+            else:
+                from .session import get_session
 
-        if args.command == 'init':
-            init_command(args)
-        elif args.command == 'help':
-            help_command(args)
-        else:
-            repo_path = config_manager.get_value('repository.path')
-
-            if not repo_path:
-                raise ValueError("Repository path not set. Please run 'init' command first.")
-
-            if not git_ops.initialize_repo(repo_path):
-                raise RuntimeError(f"Failed to initialize repository at {repo_path}")
-
-            try:
-                if args.command == 'create-branch':
-                    create_branch_command(args, git_ops)
-                elif args.command == 'switch-branch':
-                    switch_branch_command(args, git_ops)
-                elif args.command == 'commit':
-                    commit_command(args, git_ops)
-                elif args.command == 'push':
-                    push_command(args, git_ops)  # This line is added as per instructions
-                elif args.command == 'merge':
-                    merge_branch_command(args, git_ops)
-                elif args.command == 'resolve-conflicts':
-                    resolve_conflicts_command(args, git_ops)
-            finally:
-                git_ops.close_repo()
+                session = get_session('config.yaml')
+                logging_setup.configure_logging_from_config(session.config_manager)
+                git_ops = session.git_operations
+
+                try:
+                    if args.command == 'batch':
+                        batch_command(args, git_ops)
+                    else:
+                        run_repo_command(args, git_ops)
+                finally:
+                    session.close()
 
     except Exception as e:
         print(f"Error: {str(e)}")
         sys.exit(1)
+    finally:
+        print_tracing(args, root)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
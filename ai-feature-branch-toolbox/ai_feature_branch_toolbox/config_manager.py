@@ -1,17 +1,152 @@
 import yaml
+import copy
+import hashlib
+import json
 import logging
 import os
+from contextlib import contextmanager
+from . import tracing
+from .atomic_write import write_atomic, write_if_changed
 from .config_validator import ConfigValidator
 from .config_template import DEFAULT_CONFIG
-from .persistent_config import PersistentConfig
+from .logging_setup import truncated
+from .persistent_config import PersistentConfig, STATE_ONLY_KEYS, create_persistent_config, parse_flush_policy
+
+logger = logging.getLogger(__name__)
+
+# The C implementations are several times faster than the pure-Python ones
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+
+# Bump when the cached representation or the validation rules change
+CACHE_FORMAT_VERSION = 3
+
+_MISSING = object()
+
+
+def _index_subtree(index, path, value):
+    index[path] = value
+    if isinstance(value, dict):
+        for key, child in value.items():
+            _index_subtree(index, f'{path}.{key}', child)
+
+
+def _unindex_subtree(index, path, value):
+    index.pop(path, None)
+    if isinstance(value, dict):
+        for key, child in value.items():
+            _unindex_subtree(index, f'{path}.{key}', child)
+
+
+def _normalize_dotted_keys(config):
+    # Earlier versions stored set_value('a.b', ...) as a literal top-level
+    # 'a.b' key; fold those into the nested tree they were meant for
+    for key in [key for key in config if isinstance(key, str) and '.' in key]:
+        value = config.pop(key)
+        node = config
+        parts = key.split('.')
+        for part in parts[:-1]:
+            if not isinstance(node.get(part), dict):
+                node[part] = {}
+            node = node[part]
+        node[parts[-1]] = value
+        logger.info("Moved top-level key '%s' into the nested configuration", key)
+    return config
+
 
 class ConfigManager:
-    def __init__(self, config_path='config.yaml'):
+    def __init__(self, config_path='config.yaml', use_cache=True):
+        """
+        Args:
+            config_path (str): Path to the configuration file.
+            use_cache (bool): Reuse the parsed, merged and validated
+                configuration cached by an earlier process when neither
+                config.yaml nor the persistent config changed since.
+        """
         self.config_path = config_path
-        logging.info(f"Initializing ConfigManager with config path: {self.config_path}")
-        logging.info(f"Current working directory: {os.getcwd()}")
+        self.use_cache = use_cache
+        logger.info("Initializing ConfigManager with config path: %s", self.config_path)
+        logger.info("Current working directory: %s", os.getcwd())
         self.persistent_config = PersistentConfig()
+        self._transaction_depth = 0
+        # Top-level key -> its value before the transaction, taken the first
+        # time the transaction changes it
+        self._transaction_snapshot = None
+        self._dirty = False
+        # Top-level keys changed since the last save, written to the
+        # persistent config one by one instead of as a whole
+        self._changed_keys = set()
+        self._persistence_settings = {}
+        self._persistence_options = ('json', self.persistent_config.flush_policy, None)
+        self._config = None
+        self._index = {}
+        self.config = self._load_or_create_config()
+        self._stamp = self._file_stamp()
+
+    @property
+    def config(self):
+        return self._config
+
+    @config.setter
+    def config(self, config):
+        # Every path, nested dicts included, maps to its value so that dotted
+        # lookups are a single dict access
+        index = {}
+        for key, value in config.items():
+            _index_subtree(index, key, value)
+        self._config = config
+        self._index = index
+        # Top-level key -> its YAML and JSON text, kept until set_value()
+        # changes it, so saving re-renders only the changed sections
+        self._yaml_sections = {}
+        self._json_sections = {}
+        self._section_order = None
+
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self.config_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def is_stale(self):
+        """
+        Check whether the config files changed since they were last loaded or saved here.
+        """
+        return self._file_stamp() != self._stamp or self.persistent_config.is_stale()
+
+    def reload(self):
+        """
+        Re-read the configuration in place, keeping this object shared.
+        """
+        logger.info("Reloading configuration from %s", self.config_path)
         self.config = self._load_or_create_config()
+        self._stamp = self._file_stamp()
+
+    def flush(self):
+        """
+        Write persistent state still held back by its flush policy.
+        """
+        self.persistent_config.flush()
+
+    def _configure_persistence(self, settings):
+        # Taken from config.yaml itself, since it decides where persistent
+        # state is read from before the two can be merged
+        if not isinstance(settings, dict):
+            raise ValueError("Persistence settings must be a mapping in 'persistence'")
+        options = (
+            settings.get('backend', 'json'),
+            parse_flush_policy(settings.get('flush_policy')),
+            settings.get('journal_max_bytes'),
+        )
+        if options != self._persistence_options:
+            persistent_config = create_persistent_config(self.persistent_config.config_dir, *options)
+            self.persistent_config.close()
+            self.persistent_config = persistent_config
+            self._persistence_options = options
+        self._persistence_settings = settings
 
     def _load_or_create_config(self):
         try:
@@ -19,67 +154,340 @@ class ConfigManager:
         except FileNotFoundError:
             return self._create_default_config()
 
+    @tracing.traced('config.load')
     def _load_config(self):
         try:
-            logging.info(f"Attempting to load config from: {self.config_path}")
-            with open(self.config_path, 'r') as config_file:
-                config = yaml.safe_load(config_file)
-            logging.info(f"Successfully loaded config: {config}")
+            logger.info("Attempting to load config from: %s", self.config_path)
+            with open(self.config_path, 'rb') as config_file:
+                raw_config = config_file.read()
+            config_digest = hashlib.sha256(raw_config).hexdigest()
+
+            cached = self._read_cache()
+            config = None
+            if cached.get('config_digest') == config_digest:
+                persistence = cached.get('persistence', {})
+            else:
+                config = self._parse_config(raw_config)
+                persistence = config.get('persistence', {}) if isinstance(config, dict) else {}
+            self._configure_persistence(persistence)
+
+            cache_key = self._cache_key(config_digest)
+            if cached.get('key') == cache_key:
+                logger.info("Loaded configuration from cache")
+                return cached['config']
+
+            if config is None:
+                config = self._parse_config(raw_config)
 
             # Merge with persistent config
             persistent_config = self.persistent_config.load()
+            for key in STATE_ONLY_KEYS:
+                persistent_config.pop(key, None)
             config.update(persistent_config)
+            _normalize_dotted_keys(config)
 
             # Validate the loaded configuration
-            logging.info("Validating configuration")
+            logger.info("Validating configuration")
             ConfigValidator.validate_config(config)
-            logging.info("Configuration validation completed successfully")
+            logger.info("Configuration validation completed successfully")
 
+            self._write_cache(cache_key, config_digest, config, self._persistence_settings)
             return config
         except FileNotFoundError as e:
-            logging.error(f"Configuration file not found at {self.config_path}. Error: {e}")
+            logger.error("Configuration file not found at %s. Error: %s", self.config_path, e)
             raise FileNotFoundError(f"Configuration file not found at {self.config_path}")
         except yaml.YAMLError as e:
-            logging.error(f"Error parsing YAML configuration: {e}")
+            logger.error("Error parsing YAML configuration: %s", e)
             raise ValueError(f"Error parsing YAML configuration: {e}")
         except ValueError as e:
-            logging.error(f"Invalid configuration: {e}")
+            logger.error("Invalid configuration: %s", e)
             raise
 
+    def _parse_config(self, raw_config):
+        config = yaml.load(raw_config, Loader=SafeLoader)
+        logger.info("Successfully loaded config")
+        logger.debug("Loaded config: %s", truncated(config))
+        return config
+
+    def _cache_path(self):
+        # One cache file per config file sharing the state directory
+        digest = hashlib.sha1(os.path.abspath(self.config_path).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.persistent_config.config_dir, f'config_cache_{digest}.json')
+
+    def _cache_key(self, config_digest):
+        key = hashlib.sha256()
+        key.update(f"{CACHE_FORMAT_VERSION}\0{config_digest}\0".encode('utf-8'))
+        key.update(self.persistent_config.fingerprint().encode('utf-8'))
+        return key.hexdigest()
+
+    def _read_cache(self):
+        if not self.use_cache:
+            return {}
+        try:
+            with open(self._cache_path(), 'r') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return cached if isinstance(cached, dict) else {}
+
+    def _write_cache(self, cache_key, config_digest, config, persistence, config_json=None):
+        # config_json, when given, is the config already rendered as JSON
+        # and known to survive the round trip
+        if not self.use_cache:
+            return
+        try:
+            if config_json is not None:
+                header = json.dumps({'key': cache_key, 'config_digest': config_digest, 'persistence': persistence})
+                data = f'{header[:-1]}, "config": {config_json}}}'
+            else:
+                data = json.dumps({
+                    'key': cache_key,
+                    'config_digest': config_digest,
+                    'persistence': persistence,
+                    'config': config,
+                })
+                # Only cache configs that survive the JSON round trip unchanged
+                if json.loads(data)['config'] != config:
+                    return
+            write_atomic(self._cache_path(), data)
+        except (TypeError, ValueError, OSError) as e:
+            logger.debug("Not caching configuration: %s", e)
+
     def _create_default_config(self):
-        logging.info(f"Creating default configuration at {self.config_path}")
-        config = DEFAULT_CONFIG.copy()
+        logger.info("Creating default configuration at %s", self.config_path)
+        config = copy.deepcopy(DEFAULT_CONFIG)
         self._save_config(config)
         return config
 
+    @tracing.traced('config.save')
     def _save_config(self, config=None):
         if config is None:
             config = self.config
+        if self._transaction_depth and config is self.config:
+            # Written once when the outermost transaction exits
+            self._dirty = True
+            return
         try:
-            with open(self.config_path, 'w') as config_file:
-                yaml.dump(config, config_file, default_flow_style=False)
-            logging.info(f"Configuration saved successfully to {self.config_path}")
+            if config is self.config:
+                config_text = self._dump_yaml()
+            else:
+                config_text = yaml.dump(config, Dumper=SafeDumper, default_flow_style=False)
+            if write_if_changed(self.config_path, config_text):
+                logger.info("Configuration saved successfully to %s", self.config_path)
+            else:
+                logger.debug("Configuration unchanged, skipped writing %s", self.config_path)
 
-            # Save to persistent config
-            self.persistent_config.save(config)
+            self._save_persistent(config)
+            self._stamp = self._file_stamp()
+            self._refresh_cache(config_text, config)
         except Exception as e:
-            logging.error(f"Error saving configuration: {e}")
+            logger.error("Error saving configuration: %s", e)
+            raise
+
+    def _forget_section(self, section):
+        self._yaml_sections.pop(section, None)
+        self._json_sections.pop(section, None)
+        if section not in self._config:
+            self._section_order = None
+
+    def _dump_yaml(self):
+        # The same text as dumping the whole config, which sorts its keys
+        config = self._config
+        if not config:
+            return yaml.dump(config, Dumper=SafeDumper, default_flow_style=False)
+        if self._section_order is None:
+            try:
+                self._section_order = sorted(config)
+            except TypeError:
+                self._section_order = list(config)
+        sections = self._yaml_sections
+        parts = []
+        for key in self._section_order:
+            text = sections.get(key)
+            if text is None:
+                text = sections[key] = yaml.dump({key: config[key]}, Dumper=SafeDumper, default_flow_style=False)
+            parts.append(text)
+        return ''.join(parts)
+
+    def _config_json(self):
+        # The same text as json.dumps() of the whole config, or None if a
+        # section does not survive the JSON round trip unchanged
+        sections = self._json_sections
+        parts = []
+        for key, value in self._config.items():
+            text = sections.get(key)
+            if text is None:
+                if not isinstance(key, str):
+                    return None
+                try:
+                    text = json.dumps({key: value})[1:-1]
+                except (TypeError, ValueError):
+                    return None
+                if json.loads('{' + text + '}')[key] != value:
+                    return None
+                sections[key] = text
+            parts.append(text)
+        return '{' + ', '.join(parts) + '}'
+
+    def _save_persistent(self, config):
+        changed_keys, self._changed_keys = self._changed_keys, set()
+        if config is self.config:
+            # Only what set_value() touched, so a journal backend appends
+            # records the size of the change
+            for key in sorted(changed_keys):
+                if key in config:
+                    self.persistent_config.update(key, config[key])
+            return
+        # Keep the runtime state stored alongside the configuration
+        persistent = dict(config)
+        for key in STATE_ONLY_KEYS:
+            value = self.persistent_config.get(key)
+            if value is not None:
+                persistent[key] = value
+        self.persistent_config.save(persistent)
+
+    def _refresh_cache(self, config_text, config):
+        # Loading the files just written yields this config again, so the
+        # next process can skip parsing them as long as the config is valid
+        if not self.use_cache:
+            return
+        try:
+            ConfigValidator.validate_config(config)
+        except ValueError:
+            return
+        config_json = None
+        if config is self.config:
+            config_json = self._config_json()
+            if config_json is None:
+                return
+        config_digest = hashlib.sha256(config_text.encode('utf-8')).hexdigest()
+        self._write_cache(self._cache_key(config_digest), config_digest, config, config.get('persistence', {}),
+                          config_json)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group configuration changes into a single write.
+
+        Inside the block set_value() and set_many() only change the in-memory
+        configuration. When the outermost block exits normally, config.yaml and
+        the persistent config are written once, atomically, and only if their
+        content changed. If the block raises, the in-memory configuration is
+        rolled back and nothing is written.
+
+        Yields:
+            ConfigManager: This config manager.
+        """
+        if self._transaction_depth == 0:
+            self._transaction_snapshot = {}
+            self._dirty = False
+        self._transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0:
+                self._rollback(self._transaction_snapshot)
+                self._transaction_snapshot = None
+                self._dirty = False
+                self._changed_keys = set()
             raise
+        self._transaction_depth -= 1
+        if self._transaction_depth == 0:
+            self._transaction_snapshot = None
+            if self._dirty:
+                self._dirty = False
+                self._save_config()
+
+    def _rollback(self, snapshot):
+        config = self._config
+        for key, value in snapshot.items():
+            if value is _MISSING:
+                config.pop(key, None)
+            else:
+                config[key] = value
+        # Rebuilds the index and drops the cached YAML
+        self.config = config
 
     def get_config(self):
         return self.config
 
     def get_value(self, key, default=None):
-        keys = key.split('.')
-        value = self.config
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                return default
-        return value
+        """
+        Look up a value by its dotted path, such as 'repository.path'.
+
+        Args:
+            key (str): The dotted path.
+            default: Returned when the path does not exist.
+
+        Returns:
+            The value, or default.
+        """
+        return self._index.get(key, default)
+
+    def get_many(self, keys, default=None):
+        """
+        Look up several values by their dotted paths.
+
+        Args:
+            keys (iterable): The dotted paths.
+            default: Used for paths that do not exist.
+
+        Returns:
+            dict: Mapping of each path to its value.
+        """
+        index = self._index
+        return {key: index.get(key, default) for key in keys}
 
     def set_value(self, key, value):
-        self.config[key] = value
-        self.persistent_config.update(key, value)
-        self._save_config()
\ No newline at end of file
+        """
+        Set a value by its dotted path, creating intermediate sections as needed.
+
+        Args:
+            key (str): The dotted path, such as 'repository.path'.
+            value: The new value.
+        """
+        current = self._index.get(key, _MISSING)
+        if current == value and type(current) is type(value):
+            return
+        with self.transaction():
+            section = key.split('.', 1)[0]
+            if section not in self._transaction_snapshot:
+                before = self._config.get(section, _MISSING)
+                self._transaction_snapshot[section] = before if before is _MISSING else copy.deepcopy(before)
+            self._forget_section(section)
+            self._set_path(key, value)
+            self._changed_keys.add(section)
+            self._dirty = True
+
+    def set_many(self, values):
+        """
+        Set several configuration values with a single write.
+
+        Args:
+            values (dict): Mapping of dotted paths to their new values.
+        """
+        with self.transaction():
+            for key, value in values.items():
+                self.set_value(key, value)
+
+    def _set_path(self, key, value):
+        if isinstance(value, (dict, list)):
+            # Later changes to the caller's object must not bypass the index
+            value = copy.deepcopy(value)
+        parts = key.split('.')
+        node = self._config
+        for depth, part in enumerate(parts[:-1]):
+            child = node.get(part, _MISSING)
+            if not isinstance(child, dict):
+                path = '.'.join(parts[:depth + 1])
+                if child is not _MISSING:
+                    _unindex_subtree(self._index, path, child)
+                child = {}
+                node[part] = child
+                self._index[path] = child
+            node = child
+        if parts[-1] in node:
+            _unindex_subtree(self._index, key, node[parts[-1]])
+        node[parts[-1]] = value
+        _index_subtree(self._index, key, value)
@@ -26,5 +26,9 @@ DEFAULT_CONFIG = {
     'ai_agent': {
         'model': 'default',
         'temperature': 0.7
+    },
+    'persistence': {
+        'backend': 'json',  # json or journal
+        'flush_policy': 'immediate'  # immediate, on_exit, or an interval in milliseconds
     }
 }
\ No newline at end of file
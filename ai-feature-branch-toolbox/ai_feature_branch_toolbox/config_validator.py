@@ -1,70 +1,257 @@
 import re
+import json
+import hashlib
 import logging
-from typing import Dict, Any
+import threading
+from typing import Dict, Any, List
+from . import tracing
+from .persistent_config import PERSISTENCE_BACKENDS, parse_flush_policy
+
+logger = logging.getLogger(__name__)
+
+
+def _is_flush_policy(value):
+    try:
+        parse_flush_policy(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _is_temperature(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and 0 <= value <= 1
+
+
+def _is_positive_int(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+
+def _is_non_negative_int(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+
+# Each field may set:
+#   required: message used when the field is missing
+#   choices / pattern / type / check: constraints on the value
+#   invalid: message used when a constraint fails
+# Optional fields that are missing or None are not checked. Every message
+# gets " in '<section>'" appended.
+CONFIG_SCHEMA = {
+    'repository': {
+        'path': {'required': "Repository path is required"},
+        'remote': {'required': "Repository remote is required"},
+        'remote_verify_ttl': {
+            'check': _is_non_negative_int,
+            'invalid': "Repository remote_verify_ttl must be a non-negative integer",
+        },
+    },
+    'branches': {
+        'main': {'required': "Main branch name is required"},
+        'prefix': {'required': "Branch prefix is required"},
+    },
+    'commit': {
+        'author_name': {'required': "Commit author_name is required"},
+        'author_email': {
+            'required': "Commit author_email is required",
+            'pattern': r"[^@]+@[^@]+\.[^@]+",
+            'invalid': "Invalid email format for commit author_email",
+        },
+        'message_template': {'required': "Commit message_template is required"},
+    },
+    'merge': {
+        'strategy': {
+            'required': "Merge strategy is required",
+            'choices': ('merge', 'rebase'),
+            'invalid': "Invalid merge strategy. Must be 'merge' or 'rebase'",
+        },
+        'squash': {
+            'required': "Merge squash must be a boolean value",
+            'type': bool,
+            'invalid': "Merge squash must be a boolean value",
+        },
+    },
+    'logging': {
+        'level': {
+            'required': "Logging level is required",
+            'choices': ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'),
+            'invalid': "Invalid logging level",
+        },
+        'file': {'required': "Logging file is required"},
+    },
+    'ai_agent': {
+        'model': {'required': "AI agent model is required"},
+        'temperature': {
+            'required': "AI agent temperature is required",
+            'check': _is_temperature,
+            'invalid': "AI agent temperature must be a float between 0 and 1",
+        },
+    },
+    'persistence': {
+        'backend': {
+            'choices': PERSISTENCE_BACKENDS,
+            'invalid': f"Invalid persistence backend. Must be one of: {', '.join(PERSISTENCE_BACKENDS)}",
+        },
+        'flush_policy': {
+            'check': _is_flush_policy,
+            'invalid': "Invalid flush policy. Use 'immediate', 'on_exit' or an interval in milliseconds",
+        },
+        'journal_max_bytes': {
+            'check': _is_positive_int,
+            'invalid': "Persistence journal_max_bytes must be a positive integer",
+        },
+    },
+    'fsmonitor': {
+        'enabled': {
+            'type': bool,
+            'invalid': "Fsmonitor enabled must be a boolean value",
+        },
+    },
+    'maintenance': {
+        'auto_commits': {
+            'check': _is_non_negative_int,
+            'invalid': "Maintenance auto_commits must be a non-negative integer",
+        },
+    },
+}
+
+# Sections that may be left out of the configuration entirely
+OPTIONAL_SECTIONS = ('persistence', 'fsmonitor', 'maintenance')
+
+
+class ConfigValidationError(ValueError):
+    """
+    Raised when a configuration fails validation.
+
+    Attributes:
+        errors (list): Every problem found, one message per failed check.
+    """
+
+    def __init__(self, errors: List[str]):
+        super().__init__('; '.join(errors))
+        self.errors = errors
+
+
+def _compile_field(section, name, spec):
+    required = spec.get('required')
+    invalid = f"{spec.get('invalid', f'Invalid {name}')} in '{section}'"
+    missing = f"{required} in '{section}'" if required else None
+
+    constraints = []
+    if 'type' in spec:
+        expected = spec['type']
+        constraints.append(lambda value: isinstance(value, expected))
+    if 'choices' in spec:
+        choices = frozenset(spec['choices'])
+        constraints.append(lambda value: isinstance(value, str) and value in choices)
+    if 'pattern' in spec:
+        pattern = re.compile(spec['pattern'])
+        constraints.append(lambda value: isinstance(value, str) and pattern.match(value) is not None)
+    if 'check' in spec:
+        constraints.append(spec['check'])
+
+    def check(values, errors):
+        if name not in values or (missing is None and values[name] is None):
+            if missing is not None:
+                errors.append(missing)
+            return
+        value = values[name]
+        for constraint in constraints:
+            if not constraint(value):
+                errors.append(invalid)
+                return
+
+    return check
+
+
+def _compile_section(section, fields):
+    checks = [_compile_field(section, name, spec) for name, spec in fields.items()]
+    optional = section in OPTIONAL_SECTIONS
+
+    def check(values):
+        errors = []
+        if values is None:
+            if optional:
+                return errors
+            # A missing section reports each of its missing required fields
+            values = {}
+        if not isinstance(values, dict):
+            errors.append(f"Configuration section '{section}' must be a mapping")
+            return errors
+        for field_check in checks:
+            field_check(values, errors)
+        return errors
+
+    return check
+
+
+def compile_schema(schema: Dict[str, Dict[str, Dict[str, Any]]]):
+    """
+    Turn a schema such as CONFIG_SCHEMA into one check function per section.
+
+    Args:
+        schema (dict): Section name -> field name -> field spec.
+
+    Returns:
+        dict: Section name -> function taking the section's values and
+        returning the list of error messages.
+    """
+    return {section: _compile_section(section, fields) for section, fields in schema.items()}
+
+
+def _section_digest(values):
+    text = json.dumps(values, sort_keys=True, default=repr)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
 
 class ConfigValidator:
+    _checks = compile_schema(CONFIG_SCHEMA)
+    # Section name -> digest of its content when it last passed validation
+    _validated = {}
+    _lock = threading.Lock()
+
     @staticmethod
+    @tracing.traced('config.validate')
     def validate_config(config: Dict[str, Any]) -> None:
-        ConfigValidator._validate_repository(config.get('repository', {}))
-        ConfigValidator._validate_branches(config.get('branches', {}))
-        ConfigValidator._validate_commit(config.get('commit', {}))
-        ConfigValidator._validate_merge(config.get('merge', {}))
-        ConfigValidator._validate_logging(config.get('logging', {}))
-        ConfigValidator._validate_ai_agent(config.get('ai_agent', {}))
+        """
+        Validate a configuration against CONFIG_SCHEMA.
 
-    @staticmethod
-    def _validate_repository(repo: Dict[str, str]) -> None:
-        logging.info("Validating repository configuration")
-        if 'path' not in repo:
-            raise ValueError("Repository path is required in 'repository'")
-        if 'remote' not in repo:
-            raise ValueError("Repository remote is required in 'repository'")
+        Sections whose content is unchanged since they last passed are
+        skipped, so repeated validation of the same configuration, or of one
+        that only changed outside the schema, costs one hash per section.
 
-    @staticmethod
-    def _validate_branches(branches: Dict[str, str]) -> None:
-        logging.info("Validating branches configuration")
-        if 'main' not in branches:
-            raise ValueError("Main branch name is required in 'branches'")
-        if 'prefix' not in branches:
-            raise ValueError("Branch prefix is required in 'branches'")
+        Args:
+            config (dict): The configuration to validate.
 
-    @staticmethod
-    def _validate_commit(commit: Dict[str, str]) -> None:
-        logging.info("Validating commit configuration")
-        required_fields = ['author_name', 'author_email', 'message_template']
-        for field in required_fields:
-            if field not in commit:
-                raise ValueError(f"Commit {field} is required in 'commit'")
-
-        if not re.match(r"[^@]+@[^@]+\.[^@]+", commit['author_email']):
-            raise ValueError("Invalid email format for commit author_email in 'commit'")
+        Raises:
+            ConfigValidationError: Listing every error found.
+        """
+        if not isinstance(config, dict):
+            raise ConfigValidationError(["Configuration must be a mapping"])
 
-    @staticmethod
-    def _validate_merge(merge: Dict[str, Any]) -> None:
-        logging.info("Validating merge configuration")
-        if 'strategy' not in merge:
-            raise ValueError("Merge strategy is required in 'merge'")
-        if merge['strategy'] not in ['merge', 'rebase']:
-            raise ValueError("Invalid merge strategy in 'merge'. Must be 'merge' or 'rebase'")
-        if 'squash' not in merge or not isinstance(merge['squash'], bool):
-            raise ValueError("Merge squash must be a boolean value in 'merge'")
+        errors = []
+        checked = 0
+        for section, check in ConfigValidator._checks.items():
+            values = config.get(section)
+            digest = _section_digest(values)
+            with ConfigValidator._lock:
+                if ConfigValidator._validated.get(section) == digest:
+                    continue
+            checked += 1
+            section_errors = check(values)
+            if section_errors:
+                errors.extend(section_errors)
+            else:
+                with ConfigValidator._lock:
+                    ConfigValidator._validated[section] = digest
 
-    @staticmethod
-    def _validate_logging(logging_config: Dict[str, str]) -> None:
-        logging.info("Validating logging configuration")
-        if 'level' not in logging_config:
-            raise ValueError("Logging level is required in 'logging'")
-        if logging_config['level'] not in ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL']:
-            raise ValueError("Invalid logging level in 'logging'")
-        if 'file' not in logging_config:
-            raise ValueError("Logging file is required in 'logging'")
+        logger.debug("Validated %s of %s configuration sections", checked, len(ConfigValidator._checks))
+        if errors:
+            raise ConfigValidationError(errors)
 
     @staticmethod
-    def _validate_ai_agent(ai_agent: Dict[str, Any]) -> None:
-        logging.info("Validating AI agent configuration")
-        if 'model' not in ai_agent:
-            raise ValueError("AI agent model is required in 'ai_agent'")
-        if 'temperature' not in ai_agent:
-            raise ValueError("AI agent temperature is required in 'ai_agent'")
-        if not isinstance(ai_agent['temperature'], (int, float)) or not 0 <= ai_agent['temperature'] <= 1:
-            raise ValueError("AI agent temperature must be a float between 0 and 1 in 'ai_agent'")
\ No newline at end of file
+    def reset() -> None:
+        """
+        Forget which sections passed, so the next validation checks them all.
+        """
+        with ConfigValidator._lock:
+            ConfigValidator._validated.clear()
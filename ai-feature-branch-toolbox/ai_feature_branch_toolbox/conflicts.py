@@ -0,0 +1,99 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Which of the base (1), ours (2) and theirs (3) stages are present -> conflict type
+CONFLICT_TYPES = {
+    (1, 2, 3): 'both_modified',
+    (2, 3): 'both_added',
+    (1, 2): 'deleted_by_them',
+    (1, 3): 'deleted_by_us',
+    (1,): 'both_deleted',
+    (2,): 'added_by_us',
+    (3,): 'added_by_them',
+}
+
+
+class Conflict:
+    """
+    One conflicted path, as recorded in the index stages.
+
+    Attributes:
+        path (str): The conflicted path.
+        base (str): Blob id of the common ancestor's version, or None.
+        ours (str): Blob id of the version on the branch being merged into, or None.
+        theirs (str): Blob id of the version on the branch being merged, or None.
+        modes (dict): File mode per present side ('base', 'ours', 'theirs').
+        type (str): One of the CONFLICT_TYPES values, such as 'both_modified'.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.base = None
+        self.ours = None
+        self.theirs = None
+        self.modes = {}
+        self.type = None
+
+    def to_dict(self):
+        return {
+            'path': self.path,
+            'type': self.type,
+            'base': self.base,
+            'ours': self.ours,
+            'theirs': self.theirs,
+            'modes': self.modes,
+        }
+
+
+_STAGE_SIDES = {1: 'base', 2: 'ours', 3: 'theirs'}
+
+
+def parse_unmerged(output):
+    """
+    Parse the output of `git ls-files -u -z`.
+
+    Args:
+        output (str): NUL separated '<mode> <blob> <stage>\\t<path>' records.
+
+    Returns:
+        list: One Conflict per path, in index order.
+    """
+    conflicts = {}
+    stages = {}
+    for record in output.split('\0'):
+        if not record:
+            continue
+        info, path = record.split('\t', 1)
+        mode, blob, stage = info.split(' ')
+        stage = int(stage)
+        conflict = conflicts.get(path)
+        if conflict is None:
+            conflict = conflicts[path] = Conflict(path)
+            stages[path] = []
+        side = _STAGE_SIDES[stage]
+        setattr(conflict, side, blob)
+        conflict.modes[side] = mode
+        stages[path].append(stage)
+
+    for path, conflict in conflicts.items():
+        conflict.type = CONFLICT_TYPES[tuple(sorted(stages[path]))]
+    return list(conflicts.values())
+
+
+def read_conflicts(repo):
+    """
+    List the conflicted paths of a repository from its unmerged index stages.
+
+    Only the index is read, the working tree is not scanned.
+
+    Args:
+        repo (git.Repo): The repository.
+
+    Returns:
+        list: One Conflict per conflicted path; empty when there are none.
+    """
+    output = repo.git.ls_files('-u', '-z', strip_newline_in_stdout=False)
+    conflicts = parse_unmerged(output)
+    logger.debug("Found %s conflicted paths in %s", len(conflicts), repo.working_tree_dir)
+    return conflicts
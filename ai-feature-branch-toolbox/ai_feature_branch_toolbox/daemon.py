@@ -0,0 +1,278 @@
+import io
+import json
+import logging
+import os
+import socket
+import socketserver
+import sys
+import threading
+from contextlib import redirect_stdout, redirect_stderr
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET_PATH = os.path.join('.ai_feature_branch_toolbox', 'daemon.sock')
+SOCKET_ENV_VAR = 'AI_FEATURE_BRANCH_TOOLBOX_SOCKET'
+DISABLE_ENV_VAR = 'AI_FEATURE_BRANCH_TOOLBOX_NO_DAEMON'
+
+
+def get_socket_path(socket_path=None):
+    """
+    Resolve the daemon socket path.
+
+    Args:
+        socket_path (str): Explicit socket path. Falls back to the
+            AI_FEATURE_BRANCH_TOOLBOX_SOCKET environment variable and then to
+            the default path inside the toolbox state directory.
+
+    Returns:
+        str: The absolute socket path.
+    """
+    if not socket_path:
+        socket_path = os.environ.get(SOCKET_ENV_VAR) or DEFAULT_SOCKET_PATH
+    return os.path.abspath(socket_path)
+
+
+def _write_message(stream, message):
+    stream.write((json.dumps(message) + '\n').encode('utf-8'))
+    stream.flush()
+
+
+def _read_message(stream):
+    line = stream.readline()
+    if not line:
+        return None
+    return json.loads(line.decode('utf-8'))
+
+
+def _connect(socket_path, timeout=None):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def send_request(request, socket_path=None, timeout=None):
+    """
+    Send a single request to the daemon.
+
+    Args:
+        request (dict): The request message.
+        socket_path (str): Path of the daemon socket.
+        timeout (float): Socket timeout in seconds, None to block.
+
+    Returns:
+        dict: The daemon response, or None if no daemon is listening.
+    """
+    if not hasattr(socket, 'AF_UNIX'):
+        return None
+
+    socket_path = get_socket_path(socket_path)
+    if not os.path.exists(socket_path):
+        return None
+
+    try:
+        sock = _connect(socket_path, timeout)
+    except OSError:
+        logger.debug("No daemon listening on %s", socket_path)
+        return None
+
+    with sock, sock.makefile('rwb') as stream:
+        _write_message(stream, request)
+        response = _read_message(stream)
+    if response is None:
+        raise ConnectionError(f"Daemon at {socket_path} closed the connection without replying")
+    return response
+
+
+def forward_command(argv, socket_path=None, cwd=None):
+    """
+    Run a CLI command in the daemon and replay its output locally.
+
+    Args:
+        argv (list): Command line arguments, without the program name.
+        socket_path (str): Path of the daemon socket.
+        cwd (str): Working directory the command runs in. Defaults to the
+            current directory.
+
+    Returns:
+        int: The command's exit code, or None if no daemon is running and the
+            command should be run in-process.
+    """
+    if os.environ.get(DISABLE_ENV_VAR):
+        return None
+
+    response = send_request({'argv': list(argv), 'cwd': cwd or os.getcwd()}, socket_path)
+    if response is None:
+        return None
+
+    sys.stdout.write(response.get('stdout', ''))
+    sys.stderr.write(response.get('stderr', ''))
+    return response.get('exit_code', 1)
+
+
+def stop_daemon(socket_path=None):
+    """
+    Ask a running daemon to shut down.
+
+    Returns:
+        bool: True if a daemon acknowledged the request, False otherwise.
+    """
+    return send_request({'op': 'shutdown'}, socket_path) is not None
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        toolbox_daemon = self.server.toolbox_daemon
+        while True:
+            try:
+                request = _read_message(self.rfile)
+            except ValueError as e:
+                _write_message(self.wfile, {'exit_code': 2, 'stdout': '', 'stderr': f"Invalid request: {e}\n"})
+                return
+            if request is None:
+                return
+
+            if request.get('op') == 'shutdown':
+                _write_message(self.wfile, {'exit_code': 0, 'stdout': '', 'stderr': ''})
+                threading.Thread(target=toolbox_daemon.shutdown, daemon=True).start()
+                return
+
+            response = toolbox_daemon.execute(request.get('argv', []), request.get('cwd'))
+            _write_message(self.wfile, response)
+
+
+if hasattr(socketserver, 'ThreadingUnixStreamServer'):
+    class _DaemonServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+else:
+    _DaemonServer = None
+
+
+class ToolboxDaemon:
+    """
+    Long-lived process that executes repository commands on behalf of the CLI.
+
+    The shared session of each client's config file keeps the parsed
+    configuration and the open repository between requests, so a forwarded
+    command skips interpreter start-up, imports, config validation and
+    repository discovery. Commands run one at a time because they change the
+    working directory and redirect stdout.
+    """
+
+    def __init__(self, socket_path=None):
+        self.socket_path = get_socket_path(socket_path)
+        self._sessions = set()
+        self._lock = threading.Lock()
+        self._parser = None
+        self._server = None
+
+    def bind(self):
+        """
+        Create the listening socket, replacing a stale socket file if needed.
+        """
+        if _DaemonServer is None:
+            raise RuntimeError("Daemon mode requires Unix domain socket support")
+        if self._server is not None:
+            return
+
+        if os.path.exists(self.socket_path):
+            try:
+                _connect(self.socket_path, timeout=1).close()
+            except OSError:
+                logger.info("Removing stale daemon socket %s", self.socket_path)
+                os.unlink(self.socket_path)
+            else:
+                raise RuntimeError(f"A daemon is already listening on {self.socket_path}")
+
+        socket_dir = os.path.dirname(self.socket_path)
+        if socket_dir:
+            os.makedirs(socket_dir, exist_ok=True)
+
+        self._server = _DaemonServer(self.socket_path, _RequestHandler)
+        self._server.toolbox_daemon = self
+        logger.info("Daemon listening on %s", self.socket_path)
+
+    def serve_forever(self):
+        """
+        Serve requests until shutdown() is called.
+        """
+        self.bind()
+        try:
+            self._server.serve_forever()
+        finally:
+            self.close()
+
+    def shutdown(self):
+        if self._server is not None:
+            self._server.shutdown()
+
+    def close(self):
+        """
+        Close the socket and every repository kept open by the daemon.
+        """
+        if self._server is not None:
+            self._server.server_close()
+            self._server = None
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+        with self._lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions.clear()
+        logger.info("Daemon stopped")
+
+    def execute(self, argv, cwd=None):
+        """
+        Run a repository command as the CLI would.
+
+        Args:
+            argv (list): Command line arguments, without the program name.
+            cwd (str): Working directory of the calling client.
+
+        Returns:
+            dict: The exit code and the captured stdout and stderr.
+        """
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        with self._lock:
+            previous_cwd = os.getcwd()
+            previous_stdin = sys.stdin
+            try:
+                if cwd:
+                    os.chdir(cwd)
+                # Prompts cannot reach the client; make them fail instead of blocking
+                sys.stdin = io.StringIO()
+                with redirect_stdout(stdout), redirect_stderr(stderr):
+                    exit_code = self._run(argv)
+            finally:
+                sys.stdin = previous_stdin
+                os.chdir(previous_cwd)
+        return {'exit_code': exit_code, 'stdout': stdout.getvalue(), 'stderr': stderr.getvalue()}
+
+    def _run(self, argv):
+        from .cli import REPO_COMMANDS, build_parser, run_repo_command
+        from .session import get_session
+
+        try:
+            if self._parser is None:
+                self._parser = build_parser()
+            args = self._parser.parse_args(argv)
+            if args.command not in REPO_COMMANDS:
+                print(f"Error: '{args.command}' cannot be run by the daemon", file=sys.stderr)
+                return 2
+
+            session = get_session('config.yaml')
+            self._sessions.add(session)
+            run_repo_command(args, session.git_operations)
+            return 0
+        except SystemExit as e:
+            if e.code is None:
+                return 0
+            return e.code if isinstance(e.code, int) else 1
+        except Exception as e:
+            print(f"Error: {str(e)}")
+            return 1
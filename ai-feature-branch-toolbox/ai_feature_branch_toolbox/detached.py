@@ -0,0 +1,28 @@
+import os
+import sys
+import subprocess
+
+
+def spawn_module(module, args, cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL):
+    """
+    Run `python -m module args` in a new session, so the process outlives
+    the caller and does not receive its terminal's signals.
+
+    The package's parent directory is put on PYTHONPATH, so the child
+    imports this copy of the package even when it is not installed.
+
+    Args:
+        module (str): The module to run, such as __name__.
+        args (list): Its command line arguments.
+        cwd (str): The working directory.
+        stdout: File or subprocess constant for the standard output.
+        stderr: File or subprocess constant for the standard error.
+
+    Returns:
+        subprocess.Popen: The started process.
+    """
+    package_parent = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [package_parent, env.get('PYTHONPATH')]))
+    return subprocess.Popen([sys.executable, '-m', module, *args], stdin=subprocess.DEVNULL, stdout=stdout,
+                            stderr=stderr, cwd=cwd, env=env, start_new_session=True)
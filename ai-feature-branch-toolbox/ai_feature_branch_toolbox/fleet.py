@@ -0,0 +1,192 @@
+import os
+import time
+import contextvars
+import logging
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from .git_operations import BATCH_COMMANDS, GitOperations
+from .session import get_session
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 8
+
+
+def run_fleet_command(path, command, config_manager=None, config_path='config.yaml'):
+    """
+    Run one batch command in one repository.
+
+    Args:
+        path (str): The repository.
+        command (dict): A batch command, such as {'command': 'commit', 'message': '...'}.
+        config_manager (ConfigManager): Configuration to use. Defaults to the
+            session for config_path, which is how worker processes get theirs.
+        config_path (str): The configuration file used without a config_manager.
+
+    Returns:
+        dict: The repository, the command, 'ok', and 'result' or 'error', and
+        'elapsed_ms' including the time to open the repository.
+    """
+    start = time.perf_counter()
+    result = {'repo': path, 'command': command.get('command')}
+    git_ops = None
+    try:
+        if config_manager is None:
+            config_manager = get_session(config_path).config_manager
+        # Operations on fleet repositories must not change repository.path
+        git_ops = GitOperations.for_worktree(path, config_manager)
+        outcome = next(git_ops.run_batch([command]))
+        result['ok'] = outcome['ok']
+        for key in ('result', 'error'):
+            if key in outcome:
+                result[key] = outcome[key]
+    except Exception as e:
+        logger.error("Fleet command failed in %s: %s", path, e)
+        result['ok'] = False
+        result['error'] = str(e)
+    finally:
+        if git_ops is not None:
+            git_ops.close_repo()
+    result['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 3)
+    return result
+
+
+class FleetSummary:
+    """
+    Totals over the results of a fleet run.
+
+    Attributes:
+        total (int): Repositories the command ran in.
+        failed (list): Results of the repositories where it failed, in
+            the order they finished.
+        slowest (list): Results of the slowest repositories, slowest first.
+        elapsed_ms (float): Wall-clock time of the whole run.
+    """
+
+    def __init__(self, results, elapsed_ms, slowest=5):
+        self.total = len(results)
+        self.failed = [result for result in results if not result['ok']]
+        self.slowest = sorted(results, key=lambda result: result['elapsed_ms'], reverse=True)[:slowest]
+        self.elapsed_ms = elapsed_ms
+
+    @property
+    def succeeded(self):
+        return self.total - len(self.failed)
+
+    def to_dict(self):
+        return {
+            'total': self.total,
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+            'slowest': self.slowest,
+            'elapsed_ms': self.elapsed_ms,
+        }
+
+    def format(self):
+        """
+        Returns:
+            str: A human readable summary.
+        """
+        lines = [f"{self.succeeded}/{self.total} repositories succeeded in {self.elapsed_ms / 1000:.2f}s"]
+        if self.failed:
+            lines.append("Failed:")
+            for result in self.failed:
+                lines.append(f"  {result['repo']}: {result.get('error') or result.get('result')}")
+        if self.slowest:
+            lines.append("Slowest:")
+            for result in self.slowest:
+                lines.append(f"  {result['elapsed_ms']:10.1f} ms  {result['repo']}")
+        return '\n'.join(lines)
+
+
+class FleetExecutor:
+    """
+    Runs the same command across many repositories with bounded concurrency.
+
+    Each repository is opened, the command is run as a batch command, and the
+    repository is closed again, so memory use stays flat however many
+    repositories there are. At most twice as many repositories as workers are
+    queued at a time, which lets the repository list be a stream.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, processes=False, config_manager=None, config_path='config.yaml'):
+        """
+        Args:
+            workers (int): Repositories processed at the same time.
+            processes (bool): Use worker processes instead of threads. Threads
+                suit most commands, which mostly wait on git; processes help
+                when many repositories do Python-heavy work.
+            config_manager (ConfigManager): Configuration shared by the
+                worker threads. Defaults to the session for config_path.
+                Worker processes always load config_path.
+            config_path (str): The configuration file.
+        """
+        if workers < 1:
+            raise ValueError("Fleet needs at least one worker")
+        self.workers = workers
+        self.processes = processes
+        self.config_manager = config_manager
+        self.config_path = config_path
+        self.results = []
+        self.elapsed_ms = 0.0
+
+    def run(self, repos, command):
+        """
+        Run a command in every repository.
+
+        Args:
+            repos (iterable): Repository paths. Consumed lazily.
+            command (dict): A batch command; see BATCH_COMMANDS.
+
+        Yields:
+            dict: One result per repository, as soon as it finishes.
+
+        Raises:
+            ValueError: If the command is not a batch command.
+        """
+        if command.get('command') not in BATCH_COMMANDS:
+            raise ValueError(f"Unknown fleet command: {command.get('command')}")
+
+        config_manager = None
+        if not self.processes:
+            config_manager = self.config_manager or get_session(self.config_path).config_manager
+        pool_class = ProcessPoolExecutor if self.processes else ThreadPoolExecutor
+
+        self.results = []
+        start = time.perf_counter()
+        with pool_class(max_workers=self.workers) as executor:
+            pending = set()
+            for path in repos:
+                path = path.strip() if isinstance(path, str) else path
+                if not path:
+                    continue
+                arguments = (os.fspath(path), command, config_manager, self.config_path)
+                if self.processes:
+                    pending.add(executor.submit(run_fleet_command, *arguments))
+                else:
+                    # Threads run in a copy of the caller's context, so their
+                    # spans nest under the caller's current span
+                    pending.add(executor.submit(contextvars.copy_context().run, run_fleet_command, *arguments))
+                if len(pending) >= 2 * self.workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    yield from self._collect(done)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                yield from self._collect(done)
+        self.elapsed_ms = round((time.perf_counter() - start) * 1000, 3)
+        logger.info("Ran '%s' in %s repositories in %s ms", command['command'], len(self.results), self.elapsed_ms)
+
+    def _collect(self, futures):
+        for future in futures:
+            result = future.result()
+            self.results.append(result)
+            yield result
+
+    def summary(self, slowest=5):
+        """
+        Args:
+            slowest (int): How many of the slowest repositories to list.
+
+        Returns:
+            FleetSummary: Totals over the last run.
+        """
+        return FleetSummary(self.results, self.elapsed_ms, slowest)
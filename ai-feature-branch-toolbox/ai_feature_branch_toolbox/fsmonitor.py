@@ -0,0 +1,620 @@
+import os
+import sys
+import json
+import time
+import stat
+import errno
+import shlex
+import socket
+import struct
+import hashlib
+import logging
+import selectors
+import tempfile
+import ctypes
+import uuid
+from .detached import spawn_module
+
+logger = logging.getLogger(__name__)
+
+HOOK_VERSION = 2
+HOOK_NAME = 'toolbox-fsmonitor-hook'
+SOCKET_NAME = 'toolbox-fsmonitor.sock'
+LOG_NAME = 'toolbox-fsmonitor.log'
+# sockaddr_un.sun_path is 108 bytes on Linux
+MAX_SOCKET_PATH = 100
+# Past this many changed paths the journal is dropped and the next query
+# answers "everything changed", which is cheaper for git than a huge list
+MAX_JOURNAL_PATHS = 100000
+START_TIMEOUT = 30.0
+REQUEST_TIMEOUT = 10.0
+
+# inotify(7)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_EXCL_UNLINK = 0x04000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW | IN_EXCL_UNLINK)
+_EVENT = struct.Struct('iIII')
+
+# Written to the git directory with the daemon's socket path filled in. It is
+# run for every index refresh, so it imports as little as possible. Exiting
+# non-zero makes git fall back to scanning the whole working tree.
+HOOK_SCRIPT = '''#!{python} -IS
+# fsmonitor hook (protocol version {version}) answered by the
+# ai_feature_branch_toolbox fsmonitor daemon.
+import os
+import socket
+import sys
+
+if len(sys.argv) < 3 or sys.argv[1] != '{version}':
+    sys.exit(1)
+try:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout({timeout})
+    sock.connect({socket_path!r})
+    sock.sendall(b'query\\0' + os.fsencode(sys.argv[2]) + b'\\0' + os.fsencode(os.getcwd()))
+    sock.shutdown(socket.SHUT_WR)
+    answered = False
+    while True:
+        data = sock.recv(65536)
+        if not data:
+            break
+        sys.stdout.buffer.write(data)
+        answered = True
+except OSError:
+    sys.exit(1)
+sys.exit(0 if answered else 1)
+'''
+
+
+def _load_libc():
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+    except OSError:
+        return None
+    if not hasattr(libc, 'inotify_init1'):
+        return None
+    libc.inotify_add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+    libc.inotify_rm_watch.argtypes = (ctypes.c_int, ctypes.c_int)
+    return libc
+
+
+_libc = _load_libc()
+
+
+def inotify_supported():
+    """
+    Returns:
+        bool: Whether the bundled inotify monitor can run on this system.
+    """
+    return _libc is not None
+
+
+def builtin_supported(repo):
+    """
+    Check whether git was built with its own fsmonitor daemon, which is the
+    case on macOS and Windows.
+
+    Args:
+        repo (Repo): Any repository, used to run git.
+
+    Returns:
+        bool: True if 'git fsmonitor--daemon' is available.
+    """
+    return 'fsmonitor--daemon' in repo.git.version('--build-options')
+
+
+def get_socket_path(git_dir):
+    """
+    The socket the daemon for a working tree listens on: inside its git
+    directory, or under the temporary directory if that path is too long for
+    a Unix socket.
+
+    Args:
+        git_dir (str): The working tree's git directory.
+
+    Returns:
+        str: The socket path.
+    """
+    git_dir = os.path.realpath(git_dir)
+    socket_path = os.path.join(git_dir, SOCKET_NAME)
+    if len(os.fsencode(socket_path)) <= MAX_SOCKET_PATH:
+        return socket_path
+    digest = hashlib.sha1(os.fsencode(git_dir)).hexdigest()[:16]
+    return os.path.join(tempfile.gettempdir(), f'toolbox-fsmonitor-{digest}.sock')
+
+
+class InotifyWatcher:
+    """
+    Recursive inotify watch on a working tree that reports changed paths
+    relative to its root, the way git's fsmonitor protocol expects them:
+    directories end with '/' and .git directories are skipped.
+    """
+
+    def __init__(self, root):
+        if _libc is None:
+            raise RuntimeError("inotify is not available on this system")
+        self.root = os.fsencode(os.path.realpath(root))
+        self.root_gone = False
+        self._dirs = {}
+        self._wds = {}
+        self.fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            code = ctypes.get_errno()
+            raise OSError(code, f"inotify_init1 failed: {os.strerror(code)}")
+        self.watch_tree(b'')
+
+    @property
+    def watched_directories(self):
+        return len(self._dirs)
+
+    def _add_watch(self, directory):
+        path = os.path.join(self.root, directory) if directory else self.root
+        wd = _libc.inotify_add_watch(self.fd, path, WATCH_MASK)
+        if wd < 0:
+            code = ctypes.get_errno()
+            if code in (errno.ENOENT, errno.ENOTDIR, errno.EACCES):
+                return False
+            if code == errno.ENOSPC:
+                raise OSError(code, "Out of inotify watches; raise fs.inotify.max_user_watches")
+            raise OSError(code, f"inotify_add_watch failed for {os.fsdecode(path)}: {os.strerror(code)}")
+        # Watches belong to inodes, so a moved directory keeps its descriptor
+        previous = self._dirs.get(wd)
+        if previous is not None and previous != directory:
+            self._wds.pop(previous, None)
+        self._dirs[wd] = directory
+        self._wds[directory] = wd
+        return True
+
+    def watch_tree(self, directory):
+        """
+        Watch a directory and everything below it.
+
+        Args:
+            directory (bytes): Path relative to the root, '' or ending in '/'.
+
+        Raises:
+            OSError: If the inotify watch limit is reached.
+        """
+        pending = [directory]
+        while pending:
+            directory = pending.pop()
+            if not self._add_watch(directory):
+                continue
+            try:
+                with os.scandir(os.path.join(self.root, directory) if directory else self.root) as entries:
+                    for entry in entries:
+                        if entry.name != b'.git' and entry.is_dir(follow_symlinks=False):
+                            pending.append(directory + entry.name + b'/')
+            except (FileNotFoundError, NotADirectoryError, PermissionError):
+                continue
+
+    def _forget_tree(self, directory):
+        for path in [path for path in self._wds if path.startswith(directory)]:
+            wd = self._wds.pop(path)
+            self._dirs.pop(wd, None)
+            _libc.inotify_rm_watch(self.fd, wd)
+
+    def read_events(self):
+        """
+        Read the events queued by the kernel without blocking.
+
+        Returns:
+            tuple: (changed paths as a list of bytes, whether events were
+                lost because the kernel queue overflowed)
+        """
+        paths = []
+        overflow = False
+        while True:
+            try:
+                data = os.read(self.fd, 1 << 20)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, length = _EVENT.unpack_from(data, offset)
+                name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b'\0')
+                offset += _EVENT.size + length
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                directory = self._dirs.get(wd)
+                if directory is None:
+                    continue
+                if mask & IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                    if self._wds.get(directory) == wd:
+                        del self._wds[directory]
+                    if not directory:
+                        self.root_gone = True
+                    continue
+                if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                    # The parent directory reports the same change by name
+                    if not directory:
+                        self.root_gone = True
+                    continue
+                if name == b'.git':
+                    continue
+                path = directory + name
+                if mask & IN_ISDIR:
+                    path += b'/'
+                    if mask & (IN_DELETE | IN_MOVED_FROM):
+                        self._forget_tree(path)
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        self.watch_tree(path)
+                paths.append(path)
+        return paths, overflow
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class FsmonitorDaemon:
+    """
+    Answers git's fsmonitor queries for one working tree from an inotify
+    watch.
+
+    Every change gets a sequence number and the token handed to git is
+    '<instance>:<sequence>', so a query returns the paths changed after the
+    sequence in its token. Tokens from another instance of the daemon, or
+    from before the journal was dropped, are answered with '/', which tells
+    git to scan everything.
+    """
+
+    def __init__(self, worktree, socket_path):
+        self.root = os.path.realpath(worktree)
+        self.socket_path = socket_path
+        self.instance = uuid.uuid4().hex[:12]
+        self.sequence = 0
+        self.floor = 0
+        self.queries = 0
+        self.journal = {}
+        self.watcher = InotifyWatcher(self.root)
+        self._server = None
+        self._stopping = False
+
+    @property
+    def token(self):
+        return f'{self.instance}:{self.sequence}'
+
+    def drain(self):
+        """
+        Move the events queued by the kernel into the journal.
+        """
+        paths, overflow = self.watcher.read_events()
+        for path in paths:
+            self.sequence += 1
+            self.journal[path] = self.sequence
+        if overflow or len(self.journal) > MAX_JOURNAL_PATHS:
+            logger.warning("Dropping the fsmonitor journal for %s", self.root)
+            self.journal.clear()
+            self.floor = self.sequence
+
+    def query(self, token, cwd=None):
+        """
+        Answer a query from the hook.
+
+        Args:
+            token (str): The token git received with its last answer.
+            cwd (str): The working tree the hook ran in.
+
+        Returns:
+            tuple: (new token, changed paths as bytes, or None if git must
+                assume everything changed)
+        """
+        self.drain()
+        self.queries += 1
+        since = None
+        instance, _, sequence = token.partition(':')
+        if instance == self.instance and sequence.isdigit() and (cwd is None or os.path.realpath(cwd) == self.root):
+            since = int(sequence)
+        if since is None or since < self.floor:
+            return self.token, None
+        return self.token, sorted(path for path, changed in self.journal.items() if changed > since)
+
+    def status(self):
+        return {
+            'pid': os.getpid(),
+            'root': self.root,
+            'token': self.token,
+            'journal_paths': len(self.journal),
+            'watched_directories': self.watcher.watched_directories,
+            'queries': self.queries,
+        }
+
+    def _respond(self, request):
+        command, _, arguments = request.partition(b'\0')
+        if command == b'query':
+            token, _, cwd = arguments.partition(b'\0')
+            new_token, paths = self.query(os.fsdecode(token), os.fsdecode(cwd) if cwd else None)
+            if paths is None:
+                paths = [b'/']
+            return b''.join([new_token.encode('ascii'), b'\0'] + [path + b'\0' for path in paths])
+        if command == b'status':
+            self.drain()
+            return json.dumps(self.status()).encode('utf-8')
+        if command == b'stop':
+            self._stopping = True
+            return b'stopping'
+        return b''
+
+    def _handle(self, connection):
+        with connection:
+            connection.settimeout(REQUEST_TIMEOUT)
+            try:
+                chunks = []
+                while True:
+                    data = connection.recv(65536)
+                    if not data:
+                        break
+                    chunks.append(data)
+                connection.sendall(self._respond(b''.join(chunks)))
+            except OSError as e:
+                logger.warning("fsmonitor request failed: %s", e)
+
+    def bind(self):
+        """
+        Create the listening socket, replacing a stale socket file if needed.
+        """
+        if os.path.exists(self.socket_path):
+            if _request(self.socket_path, b'status', timeout=1) is not None:
+                raise RuntimeError(f"An fsmonitor daemon is already listening on {self.socket_path}")
+            os.unlink(self.socket_path)
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(self.socket_path)
+        self._server.listen(16)
+        logger.info("fsmonitor daemon for %s listening on %s", self.root, self.socket_path)
+
+    def serve_forever(self):
+        """
+        Serve queries until a stop request arrives or the working tree is
+        removed. Queries are answered one at a time, after the pending
+        inotify events have been read.
+        """
+        self.bind()
+        try:
+            with selectors.DefaultSelector() as selector:
+                selector.register(self.watcher.fd, selectors.EVENT_READ, 'events')
+                selector.register(self._server, selectors.EVENT_READ, 'request')
+                while not self._stopping and not self.watcher.root_gone:
+                    for key, _ in selector.select(timeout=1.0):
+                        if key.data == 'events':
+                            self.drain()
+                        else:
+                            connection, _ = self._server.accept()
+                            self._handle(connection)
+        finally:
+            self.close()
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+        self.watcher.close()
+        logger.info("fsmonitor daemon for %s stopped", self.root)
+
+
+def _request(socket_path, request, timeout=REQUEST_TIMEOUT):
+    try:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    except (AttributeError, OSError):
+        return None
+    with sock:
+        sock.settimeout(timeout)
+        try:
+            sock.connect(socket_path)
+            sock.sendall(request)
+            sock.shutdown(socket.SHUT_WR)
+            chunks = []
+            while True:
+                data = sock.recv(65536)
+                if not data:
+                    break
+                chunks.append(data)
+        except OSError:
+            return None
+    return b''.join(chunks)
+
+
+def daemon_status(socket_path):
+    """
+    Args:
+        socket_path (str): The daemon socket.
+
+    Returns:
+        dict: The running daemon's state, or None if none is listening.
+    """
+    response = _request(socket_path, b'status')
+    return json.loads(response.decode('utf-8')) if response else None
+
+
+def start_daemon(worktree, socket_path, log_path=os.devnull, timeout=START_TIMEOUT):
+    """
+    Start a detached fsmonitor daemon for a working tree unless one is
+    already running, and wait until it has set up its watches.
+
+    Args:
+        worktree (str): The working tree to watch.
+        socket_path (str): The socket to listen on.
+        log_path (str): File the daemon's warnings are appended to.
+        timeout (float): Seconds to wait for the daemon.
+
+    Returns:
+        bool: True if a daemon is listening, False otherwise.
+    """
+    if daemon_status(socket_path) is not None:
+        return True
+    with open(log_path, 'ab') as log:
+        process = spawn_module(__name__, ['serve', worktree, socket_path], worktree, stderr=log)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            logger.error("fsmonitor daemon for %s exited with code %s; see %s", worktree, process.returncode, log_path)
+            return False
+        if daemon_status(socket_path) is not None:
+            return True
+        time.sleep(0.02)
+    logger.error("fsmonitor daemon for %s did not start within %s seconds", worktree, timeout)
+    process.kill()
+    return False
+
+
+def stop_daemon(socket_path):
+    """
+    Returns:
+        bool: True if a daemon acknowledged the stop request.
+    """
+    return _request(socket_path, b'stop') is not None
+
+
+def write_hook(git_dir, socket_path):
+    """
+    Write the hook git runs to query the daemon.
+
+    Returns:
+        str: The hook path.
+    """
+    hook_path = os.path.join(git_dir, HOOK_NAME)
+    with open(hook_path, 'w', encoding='utf-8') as f:
+        f.write(HOOK_SCRIPT.format(python=sys.executable, version=HOOK_VERSION,
+                                   timeout=REQUEST_TIMEOUT, socket_path=socket_path))
+    os.chmod(hook_path, os.stat(hook_path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return hook_path
+
+
+def _config(repo, key):
+    try:
+        return repo.git.config('--get', key)
+    except Exception:
+        return None
+
+
+def _unset_config(repo, key):
+    if _config(repo, key) is not None:
+        repo.git.config('--unset-all', key)
+
+
+def enable_untracked_cache(repo):
+    """
+    Let git cache which directories hold untracked files.
+
+    Args:
+        repo (Repo): The repository.
+    """
+    repo.git.config('core.untrackedCache', 'true')
+    # git only uses the cache for the --untracked-files mode configured here,
+    # and repository status is always read with 'all'
+    if _config(repo, 'status.showUntrackedFiles') is None:
+        repo.git.config('status.showUntrackedFiles', 'all')
+
+
+def enable(repo):
+    """
+    Make git ask a filesystem monitor which paths changed instead of
+    checking every file in the working tree, and cache untracked directories.
+
+    git's own fsmonitor daemon is used where it exists; otherwise a bundled
+    inotify daemon is started and answers through a hook.
+
+    Args:
+        repo (Repo): A repository with a working tree.
+
+    Returns:
+        str: 'builtin' or 'hook', or None if no monitor is available.
+    """
+    if builtin_supported(repo):
+        repo.git.config('core.fsmonitor', 'true')
+        enable_untracked_cache(repo)
+        repo.git.fsmonitor__daemon('start')
+        return 'builtin'
+    if not inotify_supported():
+        logger.warning("No filesystem monitor is available on this system")
+        return None
+
+    socket_path = get_socket_path(repo.git_dir)
+    if not start_daemon(repo.working_tree_dir, socket_path, os.path.join(repo.git_dir, LOG_NAME)):
+        return None
+    hook_path = write_hook(repo.git_dir, socket_path)
+    repo.git.config('core.fsmonitor', shlex.quote(hook_path))
+    repo.git.config('core.fsmonitorHookVersion', str(HOOK_VERSION))
+    enable_untracked_cache(repo)
+    return 'hook'
+
+
+def disable(repo):
+    """
+    Stop the monitor and remove its configuration. The untracked cache
+    settings are kept; they are valid without a monitor.
+
+    Args:
+        repo (Repo): The repository.
+    """
+    if _config(repo, 'core.fsmonitor') == 'true':
+        try:
+            repo.git.fsmonitor__daemon('stop')
+        except Exception as e:
+            logger.debug("git fsmonitor--daemon stop: %s", e)
+    stop_daemon(get_socket_path(repo.git_dir))
+    _unset_config(repo, 'core.fsmonitor')
+    _unset_config(repo, 'core.fsmonitorHookVersion')
+    hook_path = os.path.join(repo.git_dir, HOOK_NAME)
+    if os.path.exists(hook_path):
+        os.unlink(hook_path)
+
+
+def status(repo):
+    """
+    Args:
+        repo (Repo): The repository.
+
+    Returns:
+        dict: 'mode' ('builtin', 'hook' or None) and, for the bundled
+            monitor, the daemon's state under 'daemon'.
+    """
+    setting = _config(repo, 'core.fsmonitor')
+    if setting is None or setting == 'false':
+        return {'mode': None, 'daemon': None}
+    if setting == 'true':
+        return {'mode': 'builtin', 'daemon': None}
+    return {'mode': 'hook', 'daemon': daemon_status(get_socket_path(repo.git_dir))}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 3 or argv[0] != 'serve':
+        print("usage: python -m ai_feature_branch_toolbox.fsmonitor serve WORKTREE SOCKET", file=sys.stderr)
+        return 2
+    logging.basicConfig(level=logging.WARNING)
+    try:
+        daemon = FsmonitorDaemon(argv[1], argv[2])
+    except (OSError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    daemon.serve_forever()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,16 +1,65 @@
 import os
+import json
+import time
 import logging
-from git import Repo, InvalidGitRepositoryError, GitCommandError
-from .config_manager import ConfigManager
+import tempfile
+from git import Commit, Repo, InvalidGitRepositoryError, GitCommandError
+from git.index.fun import run_commit_hook
+from . import fsmonitor, maintenance, remotes
+from .conflicts import read_conflicts
+from .logging_setup import truncated
+from .merge_tree import commit_merge, preview_merge
+from .ref_index import RefIndex
+from .repo_status import read_status
+from .session import get_session
+from .tracing import trace_methods
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Batch command name -> (GitOperations method, accepted arguments)
+BATCH_COMMANDS = {
+    'create-branch': ('create_feature_branch', ('branch_name',)),
+    'switch-branch': ('switch_branch', ('branch_name',)),
+    'commit': ('commit_changes', ('message',)),
+    'push': ('push_changes', ('remote', 'branch')),
+    'merge': ('merge_feature_branch', ('feature_branch', 'main_branch', 'dry_run', 'in_memory')),
+    'resolve-conflicts': ('resolve_conflicts', ()),
+    'add-remote': ('add_remote', ('name', 'url', 'fetch')),
+    'list-branches': ('list_branches', ('prefix',)),
+}
+
+@trace_methods('git_operations', exclude=('is_connected',))
 class GitOperations:
-    def __init__(self):
+    def __init__(self, config_manager=None, track_state=True):
+        """
+        Args:
+            config_manager (ConfigManager): Configuration to use. Defaults to
+                the shared session's configuration for config.yaml.
+            track_state (bool): Record the repository path and current branch
+                in the configuration. Disabled for operations on pooled
+                worktrees, which must not change the shared configuration.
+        """
         self.repo = None
-        self.config_manager = ConfigManager()
+        self.track_state = track_state
+        self._ref_index = None
+        self._blob_reader = None
+        self.config_manager = config_manager if config_manager is not None else get_session().config_manager
+
+    @classmethod
+    def for_worktree(cls, path, config_manager=None):
+        """
+        Create operations bound to a worktree, such as one leased from a WorktreePool.
+
+        Args:
+            path (str): The worktree directory.
+            config_manager (ConfigManager): Configuration to use.
+
+        Returns:
+            GitOperations: Operations on the worktree.
+        """
+        git_ops = cls(config_manager, track_state=False)
+        git_ops.repo = Repo(path)
+        return git_ops
 
     def initialize_repo(self, path):
         """
@@ -23,24 +72,28 @@ class GitOperations:
             bool: True if successful, False otherwise.
         """
         try:
-            logger.info(f"Attempting to initialize repo at path: {path}")
+            logger.info("Attempting to initialize repo at path: %s", path)
             if os.path.exists(path):
                 try:
                     self.repo = Repo(path)
-                    logger.info(f"Connected to existing repository at {path}.")
+                    logger.info("Connected to existing repository at %s.", path)
                 except InvalidGitRepositoryError:
                     self.repo = Repo.init(path)
-                    logger.info(f"Initialized a new repository in existing directory at {path}.")
+                    logger.info("Initialized a new repository in existing directory at %s.", path)
                     self._create_initial_commit()
             else:
-                logger.error(f"Path {path} does not exist. Failing initialization.")
+                logger.error("Path %s does not exist. Failing initialization.", path)
                 return False
 
+            if self.config_manager.get_value('fsmonitor.enabled', False):
+                self.enable_fsmonitor()
+
             # Update persistent config with repo path
-            self.config_manager.set_value('repository.path', path)
+            if self.track_state:
+                self.config_manager.set_value('repository.path', path)
             return True
         except Exception as e:
-            logger.exception(f"An error occurred while initializing the repository: {str(e)}")
+            logger.exception("An error occurred while initializing the repository: %s", e)
             return False
 
     def _create_initial_commit(self):
@@ -64,26 +117,169 @@ class GitOperations:
             bool: True if connected, False otherwise.
         """
         connected = self.repo is not None
-        logger.info(f"Repository connected: {connected}")
+        logger.info("Repository connected: %s", connected)
         return connected
 
-    def list_branches(self):
+    def status(self):
+        """
+        Take a snapshot of the working tree, index and branch state.
+
+        Runs a single `git status`, so callers should take one snapshot per
+        operation and read everything they need from it.
+
+        Returns:
+            StatusSnapshot: The status, or None if not connected to a repository.
+        """
+        if not self.is_connected():
+            logger.error("Not connected to a repository.")
+            return None
+        return read_status(self.repo)
+
+    def enable_fsmonitor(self):
+        """
+        Track working tree changes with a filesystem monitor, so status checks
+        and staging only look at the paths that changed since the last check
+        instead of every file. Uses git's built-in fsmonitor daemon where git
+        has one and a bundled inotify daemon otherwise.
+
+        Returns:
+            bool: True if a monitor is active, False otherwise.
+        """
+        if not self.is_connected():
+            logger.error("Not connected to a repository.")
+            return False
+
+        try:
+            mode = fsmonitor.enable(self.repo)
+            if mode is None:
+                return False
+            logger.info("Filesystem monitor enabled (%s) for %s", mode, self.repo.working_tree_dir)
+            return True
+        except Exception as e:
+            logger.exception("An error occurred while enabling the filesystem monitor: %s", e)
+            return False
+
+    def disable_fsmonitor(self):
+        """
+        Stop the filesystem monitor and go back to scanning the working tree.
+
+        Returns:
+            bool: True if successful, False otherwise.
+        """
+        if not self.is_connected():
+            logger.error("Not connected to a repository.")
+            return False
+
+        try:
+            fsmonitor.disable(self.repo)
+            logger.info("Filesystem monitor disabled for %s", self.repo.working_tree_dir)
+            return True
+        except Exception as e:
+            logger.exception("An error occurred while disabling the filesystem monitor: %s", e)
+            return False
+
+    def fsmonitor_status(self):
         """
-        List all branches in the repository.
+        Returns:
+            dict: The monitor 'mode' ('builtin', 'hook' or None) and the
+            bundled daemon's state under 'daemon', or None if not connected
+            to a repository.
+        """
+        if not self.is_connected():
+            logger.error("Not connected to a repository.")
+            return None
+        return fsmonitor.status(self.repo)
+
+    def conflicts(self):
+        """
+        Report the conflicted paths left by a merge, read from the index stages.
+
+        Returns:
+            list: One Conflict per conflicted path, or None if not connected
+            to a repository.
+        """
+        if not self.is_connected():
+            logger.error("Not connected to a repository.")
+            return None
+        return read_conflicts(self.repo)
+
+    def ref_index(self):
+        """
+        The branch index of the connected repository, read without starting git.
+
+        Returns:
+            RefIndex: The index, or None if not connected to a repository.
+        """
+        if self.repo is None:
+            return None
+        if self._ref_index is None or self._ref_index.git_dir != os.path.abspath(self.repo.git_dir):
+            self._ref_index = RefIndex.for_repo(self.repo)
+        return self._ref_index
+
+    def blob_reader(self):
+        """
+        The reader for file contents at revisions, backed by long-lived
+        `git cat-file` processes.
+
+        Returns:
+            BlobReader: The reader, or None if not connected to a repository.
+        """
+        if self.repo is None:
+            return None
+        if self._blob_reader is None or self._blob_reader.git_dir != self.repo.git_dir:
+            from .blob_reader import BlobReader
+            if self._blob_reader is not None:
+                self._blob_reader.close()
+            self._blob_reader = BlobReader(self.repo.git_dir)
+        return self._blob_reader
+
+    def read_files(self, ref, paths):
+        """
+        Read files as they are at a revision, without a checkout.
+
+        All paths are looked up in one round trip to a persistent
+        `git cat-file` process, and recently read blobs are cached. Use
+        blob_reader().iter_files() to stream large files instead.
+
+        Args:
+            ref (str): The revision to read from, such as a branch name.
+            paths (list): Paths relative to the repository root.
+
+        Returns:
+            dict: Path to contents as bytes, or None for paths that are not
+            files at the revision. None if not connected or the revision does
+            not exist.
+        """
+        if not self.is_connected():
+            logger.error("Not connected to a repository.")
+            return None
+
+        try:
+            return self.blob_reader().read_files(ref, paths)
+        except Exception as e:
+            logger.exception("An error occurred while reading files at %s: %s", ref, e)
+            return None
+
+    def list_branches(self, prefix=''):
+        """
+        List the branches in the repository.
+
+        Args:
+            prefix (str): Only list branches whose name starts with this.
 
         Returns:
-            list: A list of branch names, or None if not connected to a repository.
+            list: A sorted list of branch names, or None if not connected to a repository.
         """
         if not self.is_connected():
             logger.error("Not connected to a repository.")
             return None
 
         try:
-            branches = [branch.name for branch in self.repo.branches]
-            logger.info(f"Branches in the repository: {', '.join(branches)}")
+            branches = self.ref_index().branches(prefix)
+            logger.info("Branches in the repository: %s", truncated(branches))
             return branches
         except Exception as e:
-            logger.exception(f"An error occurred while listing branches: {str(e)}")
+            logger.exception("An error occurred while listing branches: %s", e)
             return None
 
     def create_feature_branch(self, branch_name):
@@ -103,18 +299,17 @@ class GitOperations:
         try:
             # Get branch prefix from config
             branch_prefix = self.config_manager.get_value('branches.prefix', '')
-            print("dbg:", branch_prefix)
             # Check if the branch name starts with the required prefix
             if not branch_name.startswith(branch_prefix):
-                logger.error(f"Branch name must start with '{branch_prefix}'")
+                logger.error("Branch name must start with '%s'", branch_prefix)
                 return False
 
             new_branch = self.repo.create_head(branch_name)
             new_branch.checkout()
-            logger.info(f"Created and switched to new branch: {branch_name}")
+            logger.info("Created and switched to new branch: %s", branch_name)
             return True
         except Exception as e:
-            logger.exception(f"An error occurred while creating the feature branch: {str(e)}")
+            logger.exception("An error occurred while creating the feature branch: %s", e)
             return False
 
     def switch_branch(self, branch_name):
@@ -132,24 +327,28 @@ class GitOperations:
             return False
 
         try:
-            if branch_name not in [branch.name for branch in self.repo.branches]:
-                logger.error(f"Branch '{branch_name}' does not exist.")
+            if not self.ref_index().branch_exists(branch_name):
+                logger.error("Branch '%s' does not exist.", branch_name)
                 return False
 
             self.repo.git.checkout(branch_name)
-            logger.info(f"Switched to branch: {branch_name}")
+            logger.info("Switched to branch: %s", branch_name)
 
             # Update persistent config with current branch
-            self.config_manager.set_value('current_branch', branch_name)
+            if self.track_state:
+                self.config_manager.set_value('current_branch', branch_name)
             return True
         except Exception as e:
-            logger.exception(f"An error occurred while switching branches: {str(e)}")
+            logger.exception("An error occurred while switching branches: %s", e)
             return False
 
     def close_repo(self):
         """
         Close the repository and release resources.
         """
+        if self._blob_reader is not None:
+            self._blob_reader.close()
+            self._blob_reader = None
         if self.repo:
             self.repo.close()
             self.repo = None
@@ -170,49 +369,253 @@ class GitOperations:
             return False
 
         try:
-            logger.info(f"Attempting to commit changes with message: {message}")
-            logger.info(f"Repository dirty status: {self.repo.is_dirty()}")
-            logger.info(f"Untracked files: {self.repo.untracked_files}")
+            logger.info("Attempting to commit changes with message: %s", message)
+            status = self.status()
+            logger.info("Repository dirty status: %s", status.dirty)
+            logger.info("Untracked files: %s", truncated(status.untracked))
 
             # Check if there are any changes to commit
-            if not self.repo.is_dirty() and len(self.repo.untracked_files) == 0:
+            if status.clean:
                 logger.warning("No changes to commit.")
                 return False
 
-            # Stage all changes
             logger.info("Staging all changes")
-            self.repo.git.add(A=True)
+            self._stage_paths(status.modified | status.untracked | status.unmerged)
 
             # Commit the changes
             logger.info("Committing changes")
-            commit = self.repo.index.commit(message)
-            logger.info(f"Changes committed successfully. Commit hash: {commit.hexsha}")
+            commit = self._commit_index(message)
+            logger.info("Changes committed successfully. Commit hash: %s", commit.hexsha)
+            self._schedule_maintenance()
             return True
         except Exception as e:
-            logger.exception(f"An error occurred while committing changes: {str(e)}")
+            logger.exception("An error occurred while committing changes: %s", e)
             return False
 
-    def merge_feature_branch(self, feature_branch, main_branch='main'):
+    def _stage_paths(self, paths):
+        # Only the paths the status snapshot reported, so `git add` does not
+        # walk the working tree a second time
+        if not paths:
+            return
+        with tempfile.TemporaryFile() as pathspec:
+            pathspec.write(b'\0'.join(os.fsencode(path) for path in sorted(paths)))
+            pathspec.seek(0)
+            self.repo.git.add('--all', '--pathspec-from-file=-', '--pathspec-file-nul',
+                              istream=pathspec, env={'GIT_LITERAL_PATHSPECS': '1'})
+
+    def _commit_index(self, message):
+        # Like IndexFile.commit(), hooks included, but the tree is written by
+        # `git write-tree`, which reuses the index's cached trees instead of
+        # reading every index entry into Python
+        index = self.repo.index
+        run_commit_hook('pre-commit', index)
+        message_path = os.path.join(self.repo.git_dir, 'COMMIT_EDITMSG')
+        with open(message_path, 'w', encoding='utf-8') as f:
+            f.write(message)
+        try:
+            run_commit_hook('commit-msg', index, message_path)
+            with open(message_path, encoding='utf-8') as f:
+                message = f.read()
+        finally:
+            os.remove(message_path)
+        tree = self.repo.tree(self.repo.git.write_tree())
+        commit = Commit.create_from_tree(self.repo, tree, message, head=True)
+        run_commit_hook('post-commit', index)
+        return commit
+
+    def _schedule_maintenance(self):
+        # A failure here must not fail the commit that was just made
+        every = self.config_manager.get_value('maintenance.auto_commits', maintenance.DEFAULT_AUTO_COMMITS)
+        if not every:
+            return
+        try:
+            if maintenance.record_commit(self.repo, every):
+                maintenance.start_background(self.repo)
+        except Exception as e:
+            logger.warning("Could not schedule repository maintenance: %s", e)
+
+    def maintain_repo(self, measure=True):
+        """
+        Tune the repository: enable the untracked cache, pack refs and loose
+        objects, build a multi-pack-index with an incremental repack, and
+        write a commit-graph with changed-path Bloom filters.
+
+        Also runs in the background after every maintenance.auto_commits
+        commits made by commit_changes().
+
+        Args:
+            measure (bool): Time status, branch listing, merge-base and
+                history walks before and after.
+
+        Returns:
+            MaintenanceReport: The steps and timings, or None if not
+            connected, another maintenance run holds the lock, or
+            maintenance could not run.
+        """
+        if not self.is_connected():
+            logger.error("Not connected to a repository.")
+            return None
+
+        try:
+            main_branch = self.config_manager.get_value('branches.main', 'main')
+            with maintenance.maintenance_lock(self.repo) as locked:
+                if not locked:
+                    logger.error("Maintenance is already running for %s.", self.repo.common_dir)
+                    return None
+                return maintenance.maintain(self.repo, main_branch, measure)
+        except Exception as e:
+            logger.exception("An error occurred while maintaining the repository: %s", e)
+            return None
+
+    def push_changes(self, remote='origin', branch=None):
+        """
+        Push a branch to a remote repository.
+
+        Args:
+            remote (str): The name of the remote.
+            branch (str): The branch to push. Defaults to the current branch.
+
+        Returns:
+            bool: True if successful, False otherwise.
+        """
         if not self.is_connected():
             logger.error("Not connected to a repository.")
             return False
 
         try:
-            logger.info(f"Attempting to merge '{feature_branch}' into '{main_branch}'")
+            if branch is None:
+                branch = self.repo.active_branch.name
+            self.repo.git.push(remote, branch)
+            logger.info("Pushed branch '%s' to remote '%s'", branch, remote)
+            return True
+        except Exception as e:
+            logger.exception("An error occurred while pushing changes: %s", e)
+            return False
+
+    def can_merge(self, feature_branch, main_branch='main'):
+        """
+        Compute the merge of a feature branch into the main branch without a checkout.
+
+        Args:
+            feature_branch (str): The branch to merge.
+            main_branch (str): The branch to merge into.
+
+        Returns:
+            MergePreview: The merged tree and its conflicts, or None if not
+            connected or the branches cannot be merged.
+        """
+        if not self.is_connected():
+            logger.error("Not connected to a repository.")
+            return None
+
+        try:
+            return preview_merge(self.repo, main_branch, feature_branch)
+        except Exception as e:
+            logger.exception("An error occurred while previewing the merge: %s", e)
+            return None
+
+    def worktree_pool(self, max_size=None):
+        """
+        The pool of worktrees for working on several branches at once.
+
+        Args:
+            max_size (int): Maximum number of worktrees. Defaults to
+                worktrees.pool_size from the configuration, or 4.
+
+        Returns:
+            WorktreePool: The pool, or None if not connected to a repository.
+        """
+        if not self.is_connected():
+            logger.error("Not connected to a repository.")
+            return None
+
+        from .worktree_pool import DEFAULT_POOL_SIZE, WorktreePool
+        if max_size is None:
+            max_size = self.config_manager.get_value('worktrees.pool_size', DEFAULT_POOL_SIZE)
+        return WorktreePool(self.repo, max_size)
+
+    def merge_matrix(self, pairs=True, workers=None):
+        """
+        Check which feature branches merge cleanly into the main branch and
+        with each other, without touching the working tree.
+
+        Feature branches are the local branches starting with branches.prefix;
+        the main branch is branches.main.
+
+        Args:
+            pairs (bool): Also check every pair of feature branches.
+            workers (int): Worker processes. Defaults to the CPU count.
+
+        Returns:
+            MergeMatrixReport: The matrix, or None on errors.
+        """
+        if not self.is_connected():
+            logger.error("Not connected to a repository.")
+            return None
+
+        try:
+            from .merge_matrix import MergeMatrix
+            main_branch = self.config_manager.get_value('branches.main', 'main')
+            prefix = self.config_manager.get_value('branches.prefix', 'feature/')
+            return MergeMatrix(self.repo, workers=workers).compute(main_branch, prefix, pairs)
+        except Exception as e:
+            logger.exception("An error occurred while computing the merge matrix: %s", e)
+            return None
+
+    def merge_feature_branch(self, feature_branch, main_branch='main', dry_run=False, in_memory=False):
+        """
+        Merge a feature branch into the main branch.
+
+        Args:
+            feature_branch (str): The branch to merge.
+            main_branch (str): The branch to merge into.
+            dry_run (bool): Only check whether the merge would be clean. The
+                merge is computed in the object database; HEAD, the index and
+                the working tree are left alone.
+            in_memory (bool): Compute the merge the same way and, if it is
+                clean, commit it to the main branch without checking it out.
+
+        Returns:
+            True if the merge is (or would be) clean, 'CONFLICT' if it has
+            conflicts, False on errors.
+        """
+        if not self.is_connected():
+            logger.error("Not connected to a repository.")
+            return False
+
+        if dry_run or in_memory:
+            preview = self.can_merge(feature_branch, main_branch)
+            if preview is None:
+                return False
+            if not preview.clean:
+                logger.warning("Merging '%s' into '%s' would conflict in %s paths.", feature_branch, main_branch, len(preview.conflicts))
+                return 'CONFLICT'
+            if dry_run:
+                return True
+            try:
+                commit_merge(self.repo, preview, main_branch, f"Merge branch '{feature_branch}' into {main_branch}")
+                return True
+            except Exception as e:
+                logger.exception("An error occurred while committing the merge: %s", e)
+                return False
+
+        try:
+            logger.info("Attempting to merge '%s' into '%s'", feature_branch, main_branch)
             self.switch_branch(main_branch)
 
             try:
                 self.repo.git.merge(feature_branch)
-                logger.info(f"Successfully merged '{feature_branch}' into '{main_branch}'.")
+                logger.info("Successfully merged '%s' into '%s'.", feature_branch, main_branch)
                 return True
-            except GitCommandError as e:
-                if 'conflict' in str(e).lower():
-                    logger.warning("Merge conflict detected. Please resolve conflicts manually.")
+            except GitCommandError:
+                conflicts = self.conflicts()
+                if conflicts:
+                    logger.warning("Merge conflict detected in %s paths. Please resolve conflicts manually.", len(conflicts))
                     return 'CONFLICT'
                 else:
                     raise
         except Exception as e:
-            logger.exception(f"An error occurred while merging branches: {str(e)}")
+            logger.exception("An error occurred while merging branches: %s", e)
             return False
 
     def resolve_conflicts(self):
@@ -221,24 +624,30 @@ class GitOperations:
             return False
 
         try:
-            status = self.repo.git.status()
-            if 'You have unmerged paths.' in status:
+            if self.conflicts():
                 logger.info("Conflicts detected. Please resolve them manually and then commit the changes.")
                 return 'CONFLICT'
             else:
                 logger.info("No conflicts detected.")
                 return True
         except Exception as e:
-            logger.exception(f"An error occurred while checking for conflicts: {str(e)}")
+            logger.exception("An error occurred while checking for conflicts: %s", e)
             return False
 
-    def add_remote(self, name, url):
+    def add_remote(self, name, url, fetch=False):
         """
-        Add or update a remote repository.
+        Add or update a remote repository and check that it is reachable.
+
+        The check asks the remote for its HEAD only (`git ls-remote`), and a
+        successful check is remembered in the persistent state for
+        repository.remote_verify_ttl seconds. Nothing is downloaded unless
+        fetch is set.
 
         Args:
             name (str): The name of the remote (e.g., 'origin').
             url (str): The URL of the remote repository.
+            fetch (bool): Fetch the remote's branches instead of only
+                checking it.
 
         Returns:
             bool: True if successful, False otherwise.
@@ -253,17 +662,85 @@ class GitOperations:
                 old_url = remote.url
                 if old_url != url:
                     remote.set_url(url)
-                    logger.info(f"Updated remote '{name}' URL from {old_url} to {url}")
+                    logger.info("Updated remote '%s' URL from %s to %s", name, old_url, url)
                 else:
-                    logger.info(f"Remote '{name}' already exists with the correct URL")
+                    logger.info("Remote '%s' already exists with the correct URL", name)
             else:
                 self.repo.create_remote(name, url)
-                logger.info(f"Added new remote '{name}' with URL: {url}")
+                logger.info("Added new remote '%s' with URL: %s", name, url)
 
-            # Verify the remote
-            self.repo.git.remote('update', name)
-            logger.info(f"Successfully verified remote '{name}'")
+            if fetch:
+                self.repo.git.remote('update', name)
+                logger.info("Fetched remote '%s'", name)
+            elif remotes.recently_verified(self.config_manager, name, url):
+                logger.info("Remote '%s' was verified recently", name)
+                return True
+            else:
+                self.repo.git.ls_remote('--quiet', name, 'HEAD', env=remotes.VERIFY_ENV)
+                logger.info("Successfully verified remote '%s'", name)
+            if self.track_state:
+                remotes.record_verified(self.config_manager, name, url)
             return True
         except Exception as e:
-            logger.exception(f"An error occurred while managing remote: {str(e)}")
-            return False
\ No newline at end of file
+            logger.exception("An error occurred while managing remote: %s", e)
+            return False
+
+    def run_batch(self, commands, stop_on_error=False):
+        """
+        Run a sequence of commands against the open repository.
+
+        Each command is a dict (or a JSON string encoding one) with a "command"
+        key naming one of BATCH_COMMANDS, the command's arguments as further
+        keys and an optional "id" that is echoed back in the result.
+
+        Args:
+            commands (iterable): The commands to run. Consumed lazily, so a
+                stream such as an open file can be passed directly.
+            stop_on_error (bool): Stop after the first command that fails.
+
+        Yields:
+            dict: One result per command, as soon as the command finishes.
+        """
+        for index, command in enumerate(self._iter_batch_commands(commands)):
+            start = time.perf_counter()
+            result = {'index': index}
+            try:
+                if isinstance(command, str):
+                    command = json.loads(command)
+                if not isinstance(command, dict):
+                    raise ValueError("Batch command must be a JSON object")
+                if 'id' in command:
+                    result['id'] = command['id']
+                result['command'] = command.get('command')
+                value = self._run_batch_command(command)
+                result['ok'] = value not in (False, None, 'CONFLICT')
+                result['result'] = value
+            except Exception as e:
+                logger.error("Batch command %s failed: %s", index, e)
+                result['ok'] = False
+                result['error'] = str(e)
+            result['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 3)
+            yield result
+
+            if stop_on_error and not result['ok']:
+                break
+
+    @staticmethod
+    def _iter_batch_commands(commands):
+        for command in commands:
+            if isinstance(command, str) and not command.strip():
+                continue
+            yield command
+
+    def _run_batch_command(self, command):
+        name = command.get('command')
+        if name not in BATCH_COMMANDS:
+            raise ValueError(f"Unknown batch command: {name}")
+
+        method_name, accepted = BATCH_COMMANDS[name]
+        unexpected = set(command) - set(accepted) - {'command', 'id'}
+        if unexpected:
+            raise ValueError(f"Unexpected arguments for '{name}': {', '.join(sorted(unexpected))}")
+
+        kwargs = {key: command[key] for key in accepted if key in command}
+        return getattr(self, method_name)(**kwargs)
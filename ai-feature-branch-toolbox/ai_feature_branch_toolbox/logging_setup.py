@@ -0,0 +1,182 @@
+import sys
+import atexit
+import logging
+import threading
+import itertools
+import logging.handlers
+from queue import SimpleQueue
+
+logger = logging.getLogger(__name__)
+
+PACKAGE_LOGGER = 'ai_feature_branch_toolbox'
+DEFAULT_LEVEL = 'INFO'
+FILE_FORMAT = '%(asctime)s %(levelname)s %(name)s [%(threadName)s]: %(message)s'
+# The format logging.basicConfig uses, which the CLI printed before
+CONSOLE_FORMAT = '%(levelname)s:%(name)s:%(message)s'
+MAX_LOGGED_ITEMS = 20
+
+_lock = threading.Lock()
+_pipeline = None
+_atexit_registered = False
+
+
+class _Truncated:
+    """
+    A collection that is only summarized when a log record is formatted.
+    """
+
+    __slots__ = ('items', 'limit')
+
+    def __init__(self, items, limit):
+        self.items = items
+        self.limit = limit
+
+    def __str__(self):
+        items = self.items
+        if isinstance(items, dict):
+            entries = (f'{key!r}: {value!r}' for key, value in items.items())
+        else:
+            if isinstance(items, (set, frozenset)):
+                items = sorted(items, key=str)
+            entries = (str(item) for item in items)
+        shown = list(itertools.islice(entries, self.limit))
+        try:
+            hidden = len(self.items) - len(shown)
+        except TypeError:
+            hidden = 0
+        text = ', '.join(shown)
+        if hidden > 0:
+            text += f', ... ({hidden} more)'
+        return '{' + text + '}' if isinstance(self.items, dict) else text
+
+    __repr__ = __str__
+
+
+def truncated(items, limit=MAX_LOGGED_ITEMS):
+    """
+    Wrap a possibly large collection, such as a list of paths or a
+    configuration dict, for use as a log message argument.
+
+    Nothing is done unless the record is emitted; then the first limit items
+    are shown followed by how many were left out.
+
+    Args:
+        items: A sized iterable or a dict.
+        limit (int): Items to show.
+
+    Returns:
+        object: An argument for a '%s' placeholder.
+    """
+    return _Truncated(items, limit)
+
+
+class _Pipeline:
+    def __init__(self, level, file, console_level):
+        self.settings = (level, file, console_level)
+        handlers = []
+        if file:
+            file_handler = logging.FileHandler(file, encoding='utf-8', delay=True)
+            file_handler.setFormatter(logging.Formatter(FILE_FORMAT))
+            handlers.append(file_handler)
+        console_handler = logging.StreamHandler(sys.stderr)
+        console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+        console_handler.setLevel(console_level)
+        handlers.append(console_handler)
+        self.handlers = handlers
+
+        self.queue_handler = logging.handlers.QueueHandler(SimpleQueue())
+        self.listener = logging.handlers.QueueListener(self.queue_handler.queue, *handlers, respect_handler_level=True)
+        self.package_logger = logging.getLogger(PACKAGE_LOGGER)
+        self.saved = (self.package_logger.level, self.package_logger.propagate)
+
+    def start(self, level):
+        self.listener.start()
+        self.package_logger.addHandler(self.queue_handler)
+        self.package_logger.setLevel(level)
+        # Records go through the queue only, not also through root handlers
+        self.package_logger.propagate = False
+
+    def stop(self):
+        self.package_logger.removeHandler(self.queue_handler)
+        self.package_logger.setLevel(self.saved[0])
+        self.package_logger.propagate = self.saved[1]
+        # Writes out whatever is still queued
+        self.listener.stop()
+        for handler in self.handlers:
+            handler.close()
+
+
+def _parse_level(level):
+    if isinstance(level, int):
+        return level
+    value = logging.getLevelName(str(level).upper())
+    if not isinstance(value, int):
+        raise ValueError(f"Invalid logging level: {level}")
+    return value
+
+
+def configure_logging(level=DEFAULT_LEVEL, file=None, console_level=None):
+    """
+    Send the package's log records through a queue to a background thread
+    that writes them to the console and, optionally, a file.
+
+    Callers only pay for the level check and for putting records on the
+    queue; formatting of the handlers and all file and console I/O happen in
+    the listener thread. Calling it again with other settings replaces the
+    pipeline; with the same settings it does nothing.
+
+    Args:
+        level (str): Records below this level are dropped before they are
+            created, e.g. 'INFO' or 'WARNING'.
+        file (str): Log file to append to, if any.
+        console_level (str): Minimum level printed on stderr. Defaults to
+            WARNING when logging to a file and to level otherwise.
+
+    Raises:
+        ValueError: If a level is not a logging level name.
+    """
+    global _pipeline, _atexit_registered
+    level = _parse_level(level)
+    if console_level is None:
+        console_level = logging.WARNING if file else logging.NOTSET
+    console_level = _parse_level(console_level)
+
+    with _lock:
+        if _pipeline is not None and _pipeline.settings == (level, file, console_level):
+            return
+        if _pipeline is not None:
+            _pipeline.stop()
+            _pipeline = None
+        pipeline = _Pipeline(level, file, console_level)
+        pipeline.start(level)
+        _pipeline = pipeline
+        if not _atexit_registered:
+            atexit.register(shutdown_logging)
+            _atexit_registered = True
+    logger.debug("Logging at %s to %s", logging.getLevelName(level), file or 'the console')
+
+
+def configure_logging_from_config(config_manager):
+    """
+    Apply the 'logging' section of the configuration: logging.level and
+    logging.file.
+
+    Args:
+        config_manager (ConfigManager): The configuration.
+    """
+    configure_logging(
+        config_manager.get_value('logging.level', DEFAULT_LEVEL),
+        config_manager.get_value('logging.file'),
+    )
+
+
+def shutdown_logging():
+    """
+    Write out queued records and restore the package logger. Registered to
+    run at exit by configure_logging.
+    """
+    global _pipeline
+    with _lock:
+        if _pipeline is not None:
+            _pipeline.stop()
+            _pipeline = None
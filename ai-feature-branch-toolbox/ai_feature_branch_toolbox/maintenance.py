@@ -0,0 +1,346 @@
+import os
+import sys
+import time
+import errno
+import logging
+import statistics
+import subprocess
+from contextlib import contextmanager
+from git import Repo
+from .atomic_write import write_atomic
+from .detached import spawn_module
+from .fsmonitor import enable_untracked_cache
+from .repo_status import read_status
+
+logger = logging.getLogger(__name__)
+
+# Run maintenance in the background after this many commit_changes() calls;
+# maintenance.auto_commits overrides it and 0 turns it off
+DEFAULT_AUTO_COMMITS = 250
+COUNTER_NAME = 'toolbox-maintenance-commits'
+LOCK_NAME = 'toolbox-maintenance.lock'
+LOG_NAME = 'toolbox-maintenance.log'
+# A lock older than this was left by a maintenance run that died
+STALE_LOCK_SECONDS = 3600
+# How long record_commit() waits for another process to update the count
+COUNTER_LOCK_SECONDS = 2.0
+LOCK_POLL_SECONDS = 0.01
+PROBE_RUNS = 3
+
+# Settings that keep later commands fast without any maintenance run
+TUNING_CONFIG = {
+    'core.commitGraph': 'true',
+    'core.multiPackIndex': 'true',
+    'fetch.writeCommitGraph': 'true',
+}
+
+
+class MaintenanceReport:
+    """
+    What a maintenance run did and how long the key operations took before
+    and after it.
+
+    Attributes:
+        steps (list): One dict per step with 'name', 'ok', 'duration_ms'
+            and, for failed steps, 'error'.
+        before (dict): Probe name -> median milliseconds before the run.
+        after (dict): Probe name -> median milliseconds after the run.
+        objects_before (dict): `git count-objects -v` before the run.
+        objects_after (dict): `git count-objects -v` after the run.
+    """
+
+    def __init__(self):
+        self.steps = []
+        self.before = {}
+        self.after = {}
+        self.objects_before = {}
+        self.objects_after = {}
+
+    @property
+    def ok(self):
+        return all(step['ok'] for step in self.steps)
+
+    def to_dict(self):
+        return {
+            'ok': self.ok,
+            'steps': self.steps,
+            'before': self.before,
+            'after': self.after,
+            'objects_before': self.objects_before,
+            'objects_after': self.objects_after,
+        }
+
+    def format_table(self):
+        """
+        Render the steps and the before/after timings as text.
+
+        Returns:
+            str: One line per step, then one line per timed operation.
+        """
+        lines = []
+        for step in self.steps:
+            status = 'ok' if step['ok'] else f"failed: {step['error']}"
+            lines.append(f"{step['name']:20} {step['duration_ms']:9.1f} ms  {status}")
+        if self.objects_before:
+            lines.append(f"{'loose objects':20} {self.objects_before.get('count', 0):>9} -> {self.objects_after.get('count', 0)}")
+            lines.append(f"{'packs':20} {self.objects_before.get('packs', 0):>9} -> {self.objects_after.get('packs', 0)}")
+        if self.before:
+            lines.append('')
+            lines.append(f"{'operation':20} {'before':>12} {'after':>12}")
+            for name, before in self.before.items():
+                after = self.after.get(name)
+                after_text = f"{after:9.2f} ms" if after is not None else ''
+                lines.append(f"{name:20} {before:9.2f} ms {after_text:>12}")
+        return '\n'.join(lines)
+
+
+def _git(repo, *args):
+    process = subprocess.run(['git', *args], cwd=repo.working_tree_dir or repo.git_dir,
+                             capture_output=True, text=True)
+    if process.returncode != 0:
+        raise RuntimeError(process.stderr.strip() or f"git {args[0]} exited with {process.returncode}")
+    return process.stdout
+
+
+def count_objects(repo):
+    """
+    Returns:
+        dict: The fields of `git count-objects -v`, such as 'count' (loose
+        objects) and 'packs', as integers.
+    """
+    counts = {}
+    for line in _git(repo, 'count-objects', '-v').splitlines():
+        key, _, value = line.partition(':')
+        if value.strip().isdigit():
+            counts[key.strip().replace('-', '_')] = int(value)
+    return counts
+
+
+def _probes(repo, main_branch):
+    branches = _git(repo, 'for-each-ref', '--format=%(refname:short)', 'refs/heads/').split()
+    probes = [
+        ('status', lambda: read_status(repo)),
+        ('list_branches', lambda: _git(repo, 'for-each-ref', '--format=%(refname)', 'refs/heads/')),
+        ('count_commits', lambda: _git(repo, 'rev-list', '--count', 'HEAD')),
+    ]
+    others = [branch for branch in branches if branch != main_branch]
+    if main_branch in branches and others:
+        probes.append(('merge_base', lambda: _git(repo, 'merge-base', main_branch, others[-1])))
+    paths = _git(repo, 'ls-tree', '--name-only', 'HEAD').split('\n')
+    if paths and paths[0]:
+        probes.append(('path_history', lambda: _git(repo, 'log', '-1', '--format=%H', '--', paths[0])))
+    return probes
+
+
+def measure_operations(repo, main_branch='main', runs=PROBE_RUNS):
+    """
+    Time the operations that slow down as a repository accumulates commits,
+    refs and loose objects.
+
+    Args:
+        repo (Repo): The repository.
+        main_branch (str): Branch used for the merge-base probe.
+        runs (int): Runs per operation; the median is reported.
+
+    Returns:
+        dict: Operation name -> median milliseconds.
+    """
+    if not repo.head.is_valid():
+        return {}
+    timings = {}
+    for name, probe in _probes(repo, main_branch):
+        samples = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            probe()
+            samples.append((time.perf_counter() - start) * 1000)
+        timings[name] = statistics.median(samples)
+    return timings
+
+
+def _configure(repo):
+    for key, value in TUNING_CONFIG.items():
+        _git(repo, 'config', key, value)
+    enable_untracked_cache(repo)
+
+
+def _pack_loose_objects(repo):
+    _git(repo, 'maintenance', 'run', '--task=loose-objects', '--quiet')
+    # The task only deletes loose objects that were packed by an earlier run
+    _git(repo, 'prune-packed', '--quiet')
+
+
+def _incremental_repack(repo):
+    if count_objects(repo).get('packs', 0):
+        _git(repo, 'maintenance', 'run', '--task=incremental-repack', '--quiet')
+
+
+def _write_commit_graph(repo):
+    if repo.head.is_valid():
+        _git(repo, 'commit-graph', 'write', '--reachable', '--changed-paths', '--split', '--no-progress')
+
+
+# In order: packing loose objects first gives the multi-pack-index and the
+# incremental repack something to work on
+STEPS = (
+    ('configure', _configure),
+    ('pack_refs', lambda repo: _git(repo, 'pack-refs', '--all')),
+    ('loose_objects', _pack_loose_objects),
+    ('incremental_repack', _incremental_repack),
+    ('commit_graph', _write_commit_graph),
+)
+
+
+def maintain(repo, main_branch='main', measure=True):
+    """
+    Tune a repository for the access patterns of agent loops: enable the
+    untracked cache and commit-graph reads, pack refs, pack loose objects,
+    build a multi-pack-index with an incremental repack, and write a split
+    commit-graph with changed-path Bloom filters.
+
+    Every step runs even if an earlier one failed.
+
+    Args:
+        repo (Repo): The repository.
+        main_branch (str): Branch used for the merge-base timing.
+        measure (bool): Time the key operations before and after.
+
+    Returns:
+        MaintenanceReport: The steps and timings.
+    """
+    report = MaintenanceReport()
+    if measure:
+        report.objects_before = count_objects(repo)
+        report.before = measure_operations(repo, main_branch)
+    for name, step in STEPS:
+        start = time.perf_counter()
+        entry = {'name': name, 'ok': True}
+        try:
+            step(repo)
+        except Exception as e:
+            logger.warning("Maintenance step %s failed: %s", name, e)
+            entry['ok'] = False
+            entry['error'] = str(e)
+        entry['duration_ms'] = (time.perf_counter() - start) * 1000
+        report.steps.append(entry)
+    if measure:
+        report.objects_after = count_objects(repo)
+        report.after = measure_operations(repo, main_branch)
+    logger.info("Maintained %s in %.1f ms", repo.working_tree_dir or repo.git_dir,
+                sum(step['duration_ms'] for step in report.steps))
+    return report
+
+
+def record_commit(repo, every):
+    """
+    Count a commit towards the next automatic maintenance run. The count is
+    kept in the repository's common git directory, so it is shared by its
+    worktrees, and updated under the maintenance lock.
+
+    Commits made while a maintenance run holds the lock are not counted;
+    that run already covers them.
+
+    Args:
+        repo (Repo): The repository.
+        every (int): Commits between maintenance runs.
+
+    Returns:
+        bool: True if maintenance is due; the count then starts over.
+    """
+    path = os.path.join(repo.common_dir, COUNTER_NAME)
+    with maintenance_lock(repo, COUNTER_LOCK_SECONDS) as locked:
+        if not locked:
+            logger.info("Maintenance is running for %s; commit not counted", repo.common_dir)
+            return False
+        try:
+            with open(path, encoding='utf-8') as f:
+                count = int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            count = 0
+        count += 1
+        due = count >= every
+        write_atomic(path, '0' if due else str(count))
+    return due
+
+
+def start_background(repo):
+    """
+    Run maintenance in a detached process, which outlives the caller, unless
+    a run is already in progress. Output goes to a log in the git directory.
+
+    Args:
+        repo (Repo): The repository.
+
+    Returns:
+        bool: True if a run was started.
+    """
+    if _lock_is_held(os.path.join(repo.common_dir, LOCK_NAME)):
+        logger.info("Maintenance is already running for %s", repo.common_dir)
+        return False
+    path = repo.working_tree_dir or repo.git_dir
+    with open(os.path.join(repo.common_dir, LOG_NAME), 'ab') as log:
+        spawn_module(__name__, [path], path, stdout=log, stderr=log)
+    logger.info("Started background maintenance for %s", path)
+    return True
+
+
+def _lock_is_held(lock_path):
+    try:
+        return time.time() - os.path.getmtime(lock_path) < STALE_LOCK_SECONDS
+    except FileNotFoundError:
+        return False
+
+
+def _acquire_lock(lock_path):
+    if os.path.exists(lock_path) and not _lock_is_held(lock_path):
+        os.unlink(lock_path)
+    try:
+        os.close(os.open(lock_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666))
+    except OSError as e:
+        if e.errno == errno.EEXIST:
+            return False
+        raise
+    return True
+
+
+@contextmanager
+def maintenance_lock(repo, timeout=0):
+    """
+    Hold the repository's maintenance lock, which is shared by its worktrees.
+
+    Args:
+        repo (Repo): The repository.
+        timeout (float): Seconds to wait while another process holds it.
+
+    Yields:
+        bool: True if the lock is held, False if another process kept it.
+    """
+    lock_path = os.path.join(repo.common_dir, LOCK_NAME)
+    deadline = time.monotonic() + timeout
+    while not _acquire_lock(lock_path):
+        if time.monotonic() >= deadline:
+            yield False
+            return
+        time.sleep(LOCK_POLL_SECONDS)
+    try:
+        yield True
+    finally:
+        os.unlink(lock_path)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print("usage: python -m ai_feature_branch_toolbox.maintenance REPOSITORY", file=sys.stderr)
+        return 2
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    repo = Repo(argv[0])
+    with maintenance_lock(repo) as locked:
+        if not locked:
+            return 0
+        report = maintain(repo, measure=False)
+    return 0 if report.ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
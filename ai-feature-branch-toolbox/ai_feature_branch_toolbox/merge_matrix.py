@@ -0,0 +1,221 @@
+import os
+import json
+import logging
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from .atomic_write import write_atomic
+from .merge_tree import MERGE_TREE_ARGS, parse_merge_tree
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR_NAME = 'ai_feature_branch_toolbox'
+CACHE_FILE_NAME = 'merge_matrix.json'
+
+
+def merge_cell(task):
+    """
+    Merge two commits in the object database and report whether they conflict.
+
+    Runs in a worker process, so it takes and returns plain data only.
+
+    Args:
+        task (tuple): (git_dir, ours, theirs) with commit ids.
+
+    Returns:
+        dict: {'clean': bool, 'conflicts': [paths]}, plus 'error' when git
+        could not merge the commits at all.
+    """
+    git_dir, ours, theirs = task
+    process = subprocess.run(['git', '--git-dir', git_dir, 'merge-tree', *MERGE_TREE_ARGS, ours, theirs],
+                             capture_output=True)
+    preview = parse_merge_tree(ours, theirs, process.returncode,
+                               process.stdout.decode('utf-8', 'surrogateescape'))
+    if preview is None:
+        return {'clean': False, 'conflicts': [], 'error': process.stderr.decode('utf-8', 'replace').strip()}
+    return {'clean': preview.clean, 'conflicts': [conflict.path for conflict in preview.conflicts]}
+
+
+def _cell_key(ours, theirs):
+    return f'{ours}:{theirs}'
+
+
+class MergeMatrixReport:
+    """
+    Mergeability of feature branches into the main branch and with each other.
+
+    Attributes:
+        main (str): The main branch.
+        branches (dict): Feature branch name -> commit id.
+        against_main (dict): Feature branch name -> cell.
+        pairs (dict): (branch, branch) -> cell, for every unordered pair.
+        computed (int): Cells merged in this run.
+        cached (int): Cells taken from the cache.
+
+    A cell is a dict with 'clean' and the list of conflicted paths under
+    'conflicts', plus 'error' when the commits could not be merged.
+    """
+
+    def __init__(self, main, branches):
+        self.main = main
+        self.branches = branches
+        self.against_main = {}
+        self.pairs = {}
+        self.computed = 0
+        self.cached = 0
+
+    def to_dict(self):
+        return {
+            'main': self.main,
+            'branches': self.branches,
+            'against_main': self.against_main,
+            'pairs': [dict(cell, branches=list(pair)) for pair, cell in self.pairs.items()],
+            'computed': self.computed,
+            'cached': self.cached,
+        }
+
+    def format_table(self):
+        """
+        Render the matrix as text: '.' merges cleanly, 'X' conflicts, '!' failed.
+
+        Returns:
+            str: One row per feature branch, numbered, with a column for the
+            main branch and one per feature branch.
+        """
+        names = sorted(self.branches)
+
+        def mark(cell):
+            if cell is None:
+                return ' '
+            if 'error' in cell:
+                return '!'
+            return '.' if cell['clean'] else 'X'
+
+        width = len(str(len(names)))
+        header = ' ' * (width + 2) + 'main ' + ' '.join(str(i + 1).rjust(width) for i in range(len(names)))
+        lines = [header]
+        for i, name in enumerate(names):
+            cells = []
+            for j, other in enumerate(names):
+                if i == j:
+                    cells.append('-'.rjust(width))
+                else:
+                    cells.append(mark(self.pairs.get((name, other)) or self.pairs.get((other, name))).rjust(width))
+            lines.append(f"{str(i + 1).rjust(width)}  {mark(self.against_main.get(name)).rjust(4)} {' '.join(cells)}  {name}")
+        return '\n'.join(lines)
+
+
+class MergeMatrix:
+    """
+    Computes MergeMatrixReports with merges run in a process pool.
+
+    Results are cached on disk keyed by the pair of commit ids, so after a
+    branch moves only the cells involving it are merged again.
+    """
+
+    def __init__(self, repo, cache_path=None, workers=None):
+        """
+        Args:
+            repo (git.Repo): The repository.
+            cache_path (str): Cache file. Defaults to a file in the
+                repository's git directory, since the results depend only on
+                its objects.
+            workers (int): Worker processes. Defaults to the CPU count.
+        """
+        self.repo = repo
+        self.git_dir = os.path.abspath(repo.common_dir)
+        self.cache_path = cache_path or os.path.join(self.git_dir, CACHE_DIR_NAME, CACHE_FILE_NAME)
+        self.workers = workers
+
+    def _read_cache(self):
+        try:
+            with open(self.cache_path, 'r') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return cache if isinstance(cache, dict) else {}
+
+    def _write_cache(self, cache):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            write_atomic(self.cache_path, json.dumps(cache))
+        except OSError as e:
+            logger.warning("Could not write merge matrix cache %s: %s", self.cache_path, e)
+
+    def branch_heads(self, prefix):
+        """
+        Args:
+            prefix (str): Branch name prefix, such as 'feature/'.
+
+        Returns:
+            dict: Branch name -> commit id for every local branch with the prefix.
+        """
+        output = self.repo.git.for_each_ref('--format=%(refname:short)%00%(objectname)', 'refs/heads/')
+        heads = {}
+        for line in output.splitlines():
+            name, oid = line.split('\0')
+            if name.startswith(prefix):
+                heads[name] = oid
+        return heads
+
+    def compute(self, main='main', prefix='feature/', pairs=True):
+        """
+        Check every feature branch against the main branch and, optionally,
+        every pair of feature branches against each other.
+
+        Args:
+            main (str): The main branch.
+            prefix (str): Prefix selecting the feature branches.
+            pairs (bool): Also check the feature branches pairwise.
+
+        Returns:
+            MergeMatrixReport: The matrix.
+        """
+        main_oid = self.repo.rev_parse(f'{main}^{{commit}}').hexsha
+        branches = {name: oid for name, oid in self.branch_heads(prefix).items() if name != main}
+        report = MergeMatrixReport(main, branches)
+
+        # Cell -> (ours, theirs); pairs use a canonical order since whether
+        # two commits merge cleanly does not depend on the direction
+        cells = {}
+        for name, oid in branches.items():
+            cells[('main', name)] = (main_oid, oid)
+        if pairs:
+            names = sorted(branches)
+            for i, name in enumerate(names):
+                for other in names[i + 1:]:
+                    cells[('pair', name, other)] = tuple(sorted((branches[name], branches[other])))
+
+        cache = self._read_cache()
+        results = {}
+        missing = {}
+        for cell, (ours, theirs) in cells.items():
+            key = _cell_key(ours, theirs)
+            if key in cache:
+                results[key] = cache[key]
+            elif ours == theirs:
+                results[key] = {'clean': True, 'conflicts': []}
+            else:
+                missing[key] = (self.git_dir, ours, theirs)
+
+        if missing:
+            logger.info("Merging %s of %s branch pairs", len(missing), len(cells))
+            workers = min(self.workers or os.cpu_count() or 1, len(missing))
+            # A few chunks per worker keeps them busy without a round trip per cell
+            chunksize = max(1, len(missing) // (4 * workers))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for key, result in zip(missing, executor.map(merge_cell, missing.values(), chunksize=chunksize)):
+                    results[key] = result
+        report.computed = len(missing)
+        report.cached = len(cells) - len(missing)
+
+        for cell, (ours, theirs) in cells.items():
+            result = results[_cell_key(ours, theirs)]
+            if cell[0] == 'main':
+                report.against_main[cell[1]] = result
+            else:
+                report.pairs[(cell[1], cell[2])] = result
+
+        # Keep only the cells of the current branch heads; failed merges are retried next time
+        if missing or len(cache) != len(results):
+            self._write_cache({key: result for key, result in results.items() if 'error' not in result})
+        return report
@@ -0,0 +1,156 @@
+import logging
+from git import GitCommandError
+from .conflicts import parse_unmerged
+
+logger = logging.getLogger(__name__)
+
+MERGE_TREE_ARGS = ('--write-tree', '-z', '--no-messages')
+
+
+class MergePreview:
+    """
+    The outcome of merging two commits, computed in the object database.
+
+    Attributes:
+        ours (str): Commit id of the branch being merged into.
+        theirs (str): Commit id of the branch being merged.
+        tree (str): Id of the merged tree. When there are conflicts it holds
+            the files with conflict markers.
+        conflicts (list): One Conflict per conflicted path.
+        clean (bool): True if the merge has no conflicts.
+    """
+
+    def __init__(self, ours, theirs, tree, conflicts, clean):
+        self.ours = ours
+        self.theirs = theirs
+        self.tree = tree
+        self.conflicts = conflicts
+        self.clean = clean
+
+    def to_dict(self):
+        return {
+            'ours': self.ours,
+            'theirs': self.theirs,
+            'tree': self.tree,
+            'clean': self.clean,
+            'conflicts': [conflict.to_dict() for conflict in self.conflicts],
+        }
+
+
+def preview_merge(repo, ours, theirs):
+    """
+    Merge two revisions with `git merge-tree --write-tree`.
+
+    Only objects are written; HEAD, the index and the working tree are not
+    touched, so this is safe to run while other work uses the checkout.
+
+    Args:
+        repo (git.Repo): The repository.
+        ours (str): The revision being merged into, such as 'main'.
+        theirs (str): The revision being merged, such as a feature branch.
+
+    Returns:
+        MergePreview: The merged tree and its conflicts.
+
+    Raises:
+        GitCommandError: If git cannot merge the revisions at all, for
+            example because they share no history.
+    """
+    ours_oid = repo.rev_parse(f'{ours}^{{commit}}').hexsha
+    theirs_oid = repo.rev_parse(f'{theirs}^{{commit}}').hexsha
+    command = list(MERGE_TREE_ARGS) + [ours_oid, theirs_oid]
+    status, output, stderr = repo.git.merge_tree(
+        *command, with_exceptions=False, with_extended_output=True, strip_newline_in_stdout=False)
+    preview = parse_merge_tree(ours_oid, theirs_oid, status, output)
+    if preview is None:
+        raise GitCommandError(['git', 'merge-tree'] + command, status, stderr)
+    logger.info("Merge of %s into %s has %s conflicted paths", theirs, ours, len(preview.conflicts))
+    return preview
+
+
+def parse_merge_tree(ours, theirs, status, output):
+    """
+    Build a MergePreview from the result of `git merge-tree` run with MERGE_TREE_ARGS.
+
+    Args:
+        ours (str): Commit id of the branch being merged into.
+        theirs (str): Commit id of the branch being merged.
+        status (int): The exit status of git.
+        output (str): Its standard output.
+
+    Returns:
+        MergePreview: The merged tree and its conflicts, or None if git failed.
+    """
+    # 0 is a clean merge and 1 a merge with conflicts; anything else failed.
+    # Some failures also exit with 1, but never print a tree
+    if status not in (0, 1) or not output:
+        return None
+    tree, _, conflict_info = output.partition('\0')
+    return MergePreview(ours, theirs, tree, parse_unmerged(conflict_info), status == 0)
+
+
+def parse_worktree_branches(output):
+    """
+    Map branches to the worktrees that have them checked out.
+
+    Args:
+        output (str): The output of `git worktree list --porcelain`.
+
+    Returns:
+        dict: Branch name -> worktree path.
+    """
+    branches = {}
+    path = None
+    for line in output.splitlines():
+        if line.startswith('worktree '):
+            path = line[len('worktree '):]
+        elif line.startswith('branch refs/heads/') and path is not None:
+            branches[line[len('branch refs/heads/'):]] = path
+    return branches
+
+
+def commit_merge(repo, preview, branch, message):
+    """
+    Record a clean MergePreview on a branch the way `git merge` would.
+
+    If the other commit is already part of the branch, nothing is recorded.
+    If the branch is part of the other commit's history, the branch is
+    fast-forwarded to it. Otherwise a merge commit is created from the
+    preview's tree. The branch is moved only if it still points at the commit
+    the preview was computed from. If the branch is checked out, here or in
+    a linked worktree, it is fast-forwarded in that worktree so its index and
+    files follow; otherwise no working tree is touched.
+
+    Args:
+        repo (git.Repo): The repository.
+        preview (MergePreview): A clean merge of the branch with another commit.
+        branch (str): The branch to advance.
+        message (str): The commit message.
+
+    Returns:
+        str: The id the branch points at afterwards.
+
+    Raises:
+        ValueError: If the preview has conflicts.
+        GitCommandError: If the branch moved since the preview was computed,
+            or the worktree it is checked out in cannot be fast-forwarded.
+    """
+    if not preview.clean:
+        raise ValueError("Cannot commit a merge with conflicts")
+    if repo.is_ancestor(preview.theirs, preview.ours):
+        logger.info("'%s' is already up to date with %s", branch, preview.theirs)
+        return preview.ours
+    if repo.is_ancestor(preview.ours, preview.theirs):
+        commit = preview.theirs
+    else:
+        commit = repo.git.commit_tree(preview.tree, '-p', preview.ours, '-p', preview.theirs, '-m', message)
+    worktree = parse_worktree_branches(repo.git.worktree('list', '--porcelain')).get(branch)
+    if worktree is not None:
+        repo.git.execute(['git', '-C', worktree, 'merge', '--quiet', '--ff-only', commit])
+    else:
+        repo.git.update_ref(f'refs/heads/{branch}', commit, preview.ours)
+    if commit == preview.theirs:
+        logger.info("Fast-forwarded '%s' to %s", branch, commit)
+    else:
+        logger.info("Created merge commit %s on '%s'", commit, branch)
+    return commit
@@ -1,36 +1,236 @@
 import os
 import json
+import copy
+import atexit
+import hashlib
 import logging
+import threading
+import weakref
+from . import tracing
+from .atomic_write import write_atomic
 
 logger = logging.getLogger(__name__)
 
+FLUSH_IMMEDIATE = 'immediate'
+FLUSH_ON_EXIT = 'on_exit'
+
+# Instances holding unflushed changes, flushed when the interpreter exits
+_pending = weakref.WeakSet()
+_pending_lock = threading.Lock()
+
+
+def _flush_pending():
+    with _pending_lock:
+        instances = list(_pending)
+    for instance in instances:
+        try:
+            instance.flush()
+        except Exception:
+            logger.exception("Failed to flush persistent config %s", instance.config_file)
+
+
+atexit.register(_flush_pending)
+
+PERSISTENCE_BACKENDS = ('json', 'journal')
+
+# Keys holding runtime state rather than configuration: they are neither
+# merged into the configuration nor replaced when it is saved
+STATE_ONLY_KEYS = ('remote_verification',)
+
+
+def parse_flush_policy(policy):
+    """
+    Normalize a flush policy setting.
+
+    Args:
+        policy: 'immediate', 'on_exit', or a flush interval in milliseconds
+            given as a number or a string such as '250ms'.
+
+    Returns:
+        The policy name, or the interval in milliseconds.
+
+    Raises:
+        ValueError: If the policy is not recognized.
+    """
+    if policy is None:
+        return FLUSH_IMMEDIATE
+    if policy in (FLUSH_IMMEDIATE, FLUSH_ON_EXIT):
+        return policy
+    interval = policy
+    if isinstance(interval, str) and interval.endswith('ms'):
+        interval = interval[:-2].strip()
+        interval = int(interval) if interval.isdigit() else None
+    if isinstance(interval, (int, float)) and not isinstance(interval, bool) and interval > 0:
+        return interval
+    raise ValueError(f"Invalid flush policy {policy!r}. Use 'immediate', 'on_exit' or an interval in milliseconds")
+
+
 class PersistentConfig:
-    def __init__(self, config_dir='.ai_feature_branch_toolbox'):
-        self.config_dir = config_dir
+    def __init__(self, config_dir='.ai_feature_branch_toolbox', flush_policy=FLUSH_IMMEDIATE):
+        """
+        Args:
+            config_dir (str): Directory holding persistent_config.json.
+            flush_policy: When changes reach the disk: 'immediate' writes on
+                every change, 'on_exit' writes when the interpreter exits or
+                flush() is called, and a number of milliseconds writes at most
+                that often.
+        """
+        # Pinned at construction so later working directory changes cannot
+        # point an existing instance at another directory's state
+        self.config_dir = os.path.abspath(config_dir)
         self.config_file = os.path.join(self.config_dir, 'persistent_config.json')
+        self.flush_policy = parse_flush_policy(flush_policy)
+        self._data = None
+        self._stamp = None
+        self._dirty = False
+        self._timer = None
+        self._lock = threading.RLock()
         self._ensure_config_dir()
 
     def _ensure_config_dir(self):
         if not os.path.exists(self.config_dir):
             os.makedirs(self.config_dir)
-            logger.info(f"Created persistent config directory: {self.config_dir}")
+            logger.info("Created persistent config directory: %s", self.config_dir)
 
-    def load(self):
-        if os.path.exists(self.config_file):
+    def _read_stamp(self):
+        try:
+            stat = os.stat(self.config_file)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def is_stale(self):
+        """
+        Check whether the file changed on disk since it was last read or written here.
+        """
+        return self._read_stamp() != self._stamp
+
+    def _ensure_loaded(self):
+        if self._data is not None and (self._dirty or not self.is_stale()):
+            return
+        self._load_state()
+
+    @tracing.traced('persistent_config.load')
+    def _load_state(self):
+        # Take the stamp first: a write racing with the read shows up as stale next time
+        stamp = self._read_stamp()
+        data = {}
+        if stamp is not None:
             with open(self.config_file, 'r') as f:
-                return json.load(f)
-        return {}
+                data = json.load(f)
+        self._data = data
+        self._stamp = stamp
+
+    def load(self):
+        with self._lock:
+            self._ensure_loaded()
+            return copy.deepcopy(self._data)
+
+    def fingerprint(self):
+        """
+        Digest of the stored state, used to key caches derived from it.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            return hashlib.sha256(json.dumps(self._data, sort_keys=True).encode('utf-8')).hexdigest()
 
     def save(self, config):
-        with open(self.config_file, 'w') as f:
-            json.dump(config, f, indent=2)
-        logger.info(f"Saved persistent config to {self.config_file}")
+        # The JSON round trip copies the config and normalizes it the way a reload would
+        data = json.loads(json.dumps(config))
+        with self._lock:
+            self._ensure_loaded()
+            if data == self._data:
+                return
+            self._data = data
+            self._mark_dirty()
 
     def update(self, key, value):
-        config = self.load()
-        config[key] = value
-        self.save(config)
+        value = json.loads(json.dumps(value))
+        with self._lock:
+            self._ensure_loaded()
+            if key in self._data and self._data[key] == value:
+                return
+            self._data[key] = value
+            self._mark_dirty()
 
     def get(self, key, default=None):
-        config = self.load()
-        return config.get(key, default)
\ No newline at end of file
+        with self._lock:
+            self._ensure_loaded()
+            if key not in self._data:
+                return default
+            return copy.deepcopy(self._data[key])
+
+    def _mark_dirty(self):
+        self._dirty = True
+        if self.flush_policy == FLUSH_IMMEDIATE:
+            self.flush()
+            return
+
+        with _pending_lock:
+            _pending.add(self)
+        if self.flush_policy != FLUSH_ON_EXIT and self._timer is None:
+            self._timer = threading.Timer(self.flush_policy / 1000.0, self._flush_from_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_from_timer(self):
+        with self._lock:
+            self._timer = None
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to flush persistent config %s", self.config_file)
+
+    def flush(self):
+        """
+        Write pending changes to disk, durably and atomically.
+
+        Returns:
+            bool: True if anything was written.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return False
+            self._write_pending()
+            self._dirty = False
+            with _pending_lock:
+                _pending.discard(self)
+            return True
+
+    @tracing.traced('persistent_config.flush')
+    def _write_pending(self):
+        write_atomic(self.config_file, json.dumps(self._data, indent=2), fsync=True)
+        self._stamp = self._read_stamp()
+        logger.info("Saved persistent config to %s", self.config_file)
+
+    def close(self):
+        """
+        Flush pending changes and stop the flush timer.
+        """
+        self.flush()
+
+
+def create_persistent_config(config_dir='.ai_feature_branch_toolbox', backend='json',
+                             flush_policy=FLUSH_IMMEDIATE, journal_max_bytes=None):
+    """
+    Build the persistent state store for a backend.
+
+    Args:
+        config_dir (str): Directory holding the persistent state.
+        backend (str): 'json' rewrites one JSON document per flush; 'journal'
+            appends one record per changed key and compacts in the background.
+        flush_policy: See PersistentConfig.
+        journal_max_bytes (int): Journal size that triggers compaction.
+
+    Returns:
+        PersistentConfig: The store.
+    """
+    if backend == 'json':
+        return PersistentConfig(config_dir, flush_policy)
+    if backend == 'journal':
+        from .persistent_journal import JournalPersistentConfig
+        return JournalPersistentConfig(config_dir, flush_policy, journal_max_bytes)
+    raise ValueError(f"Unknown persistence backend {backend!r}. Use one of: {', '.join(PERSISTENCE_BACKENDS)}")
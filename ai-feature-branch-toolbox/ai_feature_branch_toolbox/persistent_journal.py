@@ -0,0 +1,281 @@
+import os
+import json
+import fcntl
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from . import tracing
+from .atomic_write import write_atomic
+from .persistent_config import PersistentConfig, FLUSH_IMMEDIATE
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOURNAL_MAX_BYTES = 4 * 1024 * 1024
+
+SNAPSHOT_NAME = 'persistent_state.snapshot.json'
+JOURNAL_PREFIX = 'persistent_state.journal.'
+LOCK_NAME = 'persistent_state.lock'
+
+
+class JournalPersistentConfig(PersistentConfig):
+    """
+    Persistent state stored as a compacted snapshot plus an append-only journal.
+
+    Every changed key is appended to the journal as one JSON line, so an update
+    costs O(size of the change) instead of O(size of the state). Reads are
+    served from an in-memory index rebuilt from the snapshot and the journal
+    when the store is opened.
+
+    Journals are numbered by generation. The snapshot records the generation of
+    the first journal it does not cover. Compaction starts a new journal, then
+    writes a new snapshot in a background thread and deletes the old journal,
+    so a crash at any point leaves a snapshot and journals that replay to the
+    latest flushed state.
+
+    Several processes may share the directory. Reads, appends and compaction
+    take an exclusive lock on a file next to the journals, and appends always
+    go to the newest journal, so a store opened before another process
+    compacted does not write to a journal that is about to be deleted.
+    """
+
+    def __init__(self, config_dir='.ai_feature_branch_toolbox', flush_policy=FLUSH_IMMEDIATE,
+                 journal_max_bytes=None):
+        """
+        Args:
+            config_dir (str): Directory holding the snapshot and journals.
+            flush_policy: See PersistentConfig.
+            journal_max_bytes (int): Journal size that triggers compaction.
+        """
+        super().__init__(config_dir, flush_policy)
+        self.config_file = os.path.join(self.config_dir, SNAPSHOT_NAME)
+        self.lock_file = os.path.join(self.config_dir, LOCK_NAME)
+        self.journal_max_bytes = journal_max_bytes or DEFAULT_JOURNAL_MAX_BYTES
+        self._generation = 0
+        self._digest = None
+        self._pending_records = []
+        self._compaction = None
+
+    @contextmanager
+    def _locked(self):
+        # Held for as long as the journals and the snapshot must agree. The
+        # in-process lock, when also needed, is always taken first
+        with open(self.lock_file, 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _journal_path(self, generation):
+        return os.path.join(self.config_dir, f'{JOURNAL_PREFIX}{generation}')
+
+    def _journal_generations(self):
+        generations = []
+        for name in os.listdir(self.config_dir):
+            if name.startswith(JOURNAL_PREFIX) and name[len(JOURNAL_PREFIX):].isdigit():
+                generations.append(int(name[len(JOURNAL_PREFIX):]))
+        return sorted(generations)
+
+    def _read_stamp(self):
+        stamp = []
+        for path in (self.config_file, self._journal_path(self._generation)):
+            try:
+                stat = os.stat(path)
+                stamp.append((stat.st_ino, stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    @tracing.traced('persistent_config.load')
+    def _load_state(self):
+        # Locked so that no journal is deleted between reading the snapshot
+        # and replaying it, and no append is mistaken for a torn record
+        with self._locked():
+            self._read_state()
+
+    def _read_state(self):
+        digest = hashlib.sha256()
+        data = {}
+        generation = 0
+        try:
+            with open(self.config_file, 'rb') as f:
+                raw_snapshot = f.read()
+        except FileNotFoundError:
+            data = self._seed_from_json()
+        else:
+            snapshot = json.loads(raw_snapshot)
+            data = snapshot['data']
+            generation = snapshot['generation']
+            digest.update(raw_snapshot)
+
+        journals = [g for g in self._journal_generations() if g >= generation]
+        for journal_generation in journals:
+            self._replay(journal_generation, data, digest)
+
+        self._data = data
+        self._generation = journals[-1] if journals else generation
+        self._digest = digest
+        self._stamp = self._read_stamp()
+        logger.info("Loaded %s persistent keys from %s journal(s) in %s", len(data), len(journals), self.config_dir)
+
+    def _seed_from_json(self):
+        # Switching from the JSON backend keeps the existing state
+        legacy_file = os.path.join(self.config_dir, 'persistent_config.json')
+        if not os.path.exists(legacy_file) or self._journal_generations():
+            return {}
+        with open(legacy_file, 'r') as f:
+            return json.load(f)
+
+    def _replay(self, generation, data, digest):
+        path = self._journal_path(generation)
+        with open(path, 'rb') as f:
+            content = f.read()
+
+        complete = content[:content.rfind(b'\n') + 1]
+        if len(complete) != len(content):
+            # A torn final record from a crash mid-append; drop it so the
+            # next append starts on a fresh line
+            logger.warning("Discarding incomplete record at the end of %s", path)
+            with open(path, 'r+b') as f:
+                f.truncate(len(complete))
+
+        # One parse of the whole journal is much cheaper than one per record
+        lines = complete.decode('utf-8').splitlines()
+        for record in json.loads('[' + ','.join(line for line in lines if line) + ']'):
+            if record.get('d'):
+                data.pop(record['k'], None)
+            else:
+                data[record['k']] = record['v']
+        digest.update(complete)
+
+    def fingerprint(self):
+        with self._lock:
+            self._ensure_loaded()
+            return self._digest.hexdigest()
+
+    def _append_record(self, record):
+        line = json.dumps(record, separators=(',', ':'))
+        self._pending_records.append(line)
+        self._digest.update((line + '\n').encode('utf-8'))
+
+    def update(self, key, value):
+        value = json.loads(json.dumps(value))
+        with self._lock:
+            self._ensure_loaded()
+            if key in self._data and self._data[key] == value:
+                return
+            self._data[key] = value
+            self._append_record({'k': key, 'v': value})
+            self._mark_dirty()
+
+    def delete(self, key):
+        with self._lock:
+            self._ensure_loaded()
+            if key not in self._data:
+                return
+            del self._data[key]
+            self._append_record({'k': key, 'd': 1})
+            self._mark_dirty()
+
+    def save(self, config):
+        data = json.loads(json.dumps(config))
+        with self._lock:
+            self._ensure_loaded()
+            changed = False
+            for key in [key for key in self._data if key not in data]:
+                del self._data[key]
+                self._append_record({'k': key, 'd': 1})
+                changed = True
+            for key, value in data.items():
+                if key not in self._data or self._data[key] != value:
+                    self._data[key] = value
+                    self._append_record({'k': key, 'v': value})
+                    changed = True
+            if changed:
+                self._mark_dirty()
+
+    @tracing.traced('persistent_config.flush')
+    def _write_pending(self):
+        if not self._pending_records:
+            return
+        with self._locked():
+            journal_path = self._append_pending()
+        if os.path.getsize(journal_path) >= self.journal_max_bytes:
+            self.compact(wait=False)
+
+    def _append_pending(self):
+        # Called with the directory locked. Another process may have started
+        # a newer journal since this store was read; the old one is folded
+        # into a snapshot and deleted, so later records must not go there
+        generations = self._journal_generations()
+        if generations and generations[-1] > self._generation:
+            self._generation = generations[-1]
+        journal_path = self._journal_path(self._generation)
+        if not self._pending_records:
+            return journal_path
+        payload = ('\n'.join(self._pending_records) + '\n').encode('utf-8')
+        with open(journal_path, 'ab') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        self._pending_records = []
+        self._stamp = self._read_stamp()
+        tracing.record_bytes_written(len(payload))
+        logger.debug("Appended %s bytes to %s", len(payload), journal_path)
+        return journal_path
+
+    def compact(self, wait=True):
+        """
+        Fold the journals into a new snapshot.
+
+        Args:
+            wait (bool): Block until the snapshot is written. Otherwise it is
+                written by a background thread.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            if self._compaction is not None and self._compaction.is_alive():
+                compaction = self._compaction
+            else:
+                # Later appends, from any process, go to the next journal
+                # while the snapshot is written from a copy of the current
+                # state, re-read so it includes what other processes appended
+                with self._locked():
+                    self._append_pending()
+                    self._read_state()
+                    generation = self._generation + 1
+                    state = dict(self._data)
+                    self._generation = generation
+                    open(self._journal_path(generation), 'ab').close()
+                    self._stamp = self._read_stamp()
+                compaction = threading.Thread(target=self._write_snapshot, args=(generation, state), daemon=True)
+                self._compaction = compaction
+                compaction.start()
+        if wait:
+            compaction.join()
+
+    @tracing.traced('persistent_config.compact')
+    def _write_snapshot(self, generation, state):
+        try:
+            with self._locked():
+                if self._journal_generations()[-1] > generation:
+                    # A later compaction, here or in another process, started
+                    # from a state that includes this one
+                    logger.debug("Skipping snapshot %s of %s, superseded", generation, self.config_dir)
+                    return
+                write_atomic(self.config_file, json.dumps({'generation': generation, 'data': state}), fsync=True)
+                for old_generation in self._journal_generations():
+                    if old_generation < generation:
+                        os.unlink(self._journal_path(old_generation))
+            with self._lock:
+                self._stamp = self._read_stamp()
+            logger.info("Compacted %s persistent keys into %s", len(state), self.config_file)
+        except Exception:
+            logger.exception("Failed to compact persistent state in %s", self.config_dir)
+
+    def close(self):
+        self.flush()
+        compaction = self._compaction
+        if compaction is not None:
+            compaction.join()
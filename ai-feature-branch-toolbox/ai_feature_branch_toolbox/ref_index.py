@@ -0,0 +1,218 @@
+import os
+import logging
+import subprocess
+import threading
+
+logger = logging.getLogger(__name__)
+
+HEADS_PREFIX = 'refs/heads/'
+SYMREF_PREFIX = 'ref: '
+
+
+def _stat_key(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class RefIndex:
+    """
+    Read-only view of a repository's branches, read straight from the git directory.
+
+    Branch names come from `packed-refs` and the loose refs under
+    `refs/heads`. Each file and directory is re-read only when its mtime,
+    size or inode changed since the last lookup, so queries after the first
+    one cost a few stat calls and a dict lookup, and no git process is
+    started. Git replaces refs by renaming a lock file over them, which
+    always changes the mtime of the containing directory.
+
+    Repositories using the reftable ref backend are read with
+    `git for-each-ref` instead.
+    """
+
+    def __init__(self, git_dir, common_dir=None):
+        """
+        Args:
+            git_dir (str): The git directory holding HEAD. For a linked
+                worktree this is its own directory under .git/worktrees.
+            common_dir (str): The git directory holding the shared refs.
+                Defaults to git_dir.
+        """
+        self.git_dir = os.path.abspath(git_dir)
+        self.common_dir = os.path.abspath(common_dir or git_dir)
+        self._heads_dir = os.path.join(self.common_dir, 'refs', 'heads')
+        self._packed_file = os.path.join(self.common_dir, 'packed-refs')
+        self._head_file = os.path.join(self.git_dir, 'HEAD')
+        self._packed = {}
+        self._packed_key = None
+        self._reftable_key = None
+        self._head = (None, None)
+        # Directory under refs/heads -> (stat key, {branch: ref file}, subdirectories)
+        self._dirs = {}
+        self._index = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_repo(cls, repo):
+        """
+        Args:
+            repo (git.Repo): The repository.
+
+        Returns:
+            RefIndex: The index of the repository's branches.
+        """
+        return cls(repo.git_dir, repo.common_dir)
+
+    @property
+    def uses_reftable(self):
+        return os.path.isdir(os.path.join(self.common_dir, 'reftable'))
+
+    def branch_exists(self, name):
+        """
+        Returns:
+            bool: True if a local branch with the name exists.
+        """
+        return name in self._branches()
+
+    def current_branch(self):
+        """
+        Returns:
+            str: The checked out branch, or None when HEAD is detached. A
+            branch without commits yet is still returned.
+        """
+        with self._lock:
+            key = _stat_key(self._head_file)
+            if key != self._head[1]:
+                with open(self._head_file, 'r') as f:
+                    content = f.read().strip()
+                branch = None
+                if content.startswith(SYMREF_PREFIX + HEADS_PREFIX):
+                    branch = content[len(SYMREF_PREFIX + HEADS_PREFIX):]
+                self._head = (branch, key)
+            return self._head[0]
+
+    def branches(self, prefix=''):
+        """
+        List local branches.
+
+        Args:
+            prefix (str): Only list branches whose name starts with this.
+
+        Returns:
+            list: Sorted branch names.
+        """
+        return sorted(self.iter_branches(prefix))
+
+    def iter_branches(self, prefix=''):
+        """
+        Iterate over local branches without building a list, in no
+        particular order.
+
+        Args:
+            prefix (str): Only yield branches whose name starts with this.
+
+        Yields:
+            str: Branch names.
+        """
+        for name in self._branches():
+            if name.startswith(prefix):
+                yield name
+
+    def resolve(self, name):
+        """
+        Args:
+            name (str): A branch name.
+
+        Returns:
+            str: The commit id the branch points to, or None if it does not exist.
+        """
+        branches = self._branches()
+        if name not in branches:
+            return None
+        source = branches[name]
+        if source is None:
+            return self._packed.get(name)
+        try:
+            with open(source, 'r') as f:
+                content = f.read().strip()
+        except FileNotFoundError:
+            return None
+        if content.startswith(SYMREF_PREFIX):
+            target = content[len(SYMREF_PREFIX):]
+            if target.startswith(HEADS_PREFIX) and target[len(HEADS_PREFIX):] != name:
+                return self.resolve(target[len(HEADS_PREFIX):])
+            return None
+        return content
+
+    def _branches(self):
+        # Branch name -> loose ref file, or None for a packed ref
+        with self._lock:
+            if self.uses_reftable:
+                key = _stat_key(os.path.join(self.common_dir, 'reftable', 'tables.list'))
+                if key != self._reftable_key:
+                    self._index = self._for_each_ref()
+                    self._reftable_key = key
+                return self._index
+
+            changed = self._read_packed()
+            seen = set()
+            changed = self._scan_loose(self._heads_dir, '', seen) or changed
+            if seen != self._dirs.keys():
+                for path in self._dirs.keys() - seen:
+                    del self._dirs[path]
+                changed = True
+            if changed or self._index is None:
+                index = dict.fromkeys(self._packed)
+                for _, refs, _ in self._dirs.values():
+                    index.update(refs)
+                self._index = index
+                logger.debug("Indexed %s branches in %s", len(index), self.common_dir)
+            return self._index
+
+    def _read_packed(self):
+        key = _stat_key(self._packed_file)
+        if key == self._packed_key:
+            return False
+        packed = {}
+        if key is not None:
+            with open(self._packed_file, 'r') as f:
+                for line in f:
+                    if line.startswith(('#', '^')):
+                        continue
+                    oid, _, ref = line.rstrip('\n').partition(' ')
+                    if ref.startswith(HEADS_PREFIX):
+                        packed[ref[len(HEADS_PREFIX):]] = oid
+        self._packed = packed
+        self._packed_key = key
+        return True
+
+    def _scan_loose(self, path, prefix, seen):
+        # Returns True if any directory had to be re-read
+        key = _stat_key(path)
+        if key is None:
+            return False
+        seen.add(path)
+        changed = False
+        cached = self._dirs.get(path)
+        if cached is None or cached[0] != key:
+            refs, subdirs = {}, []
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.name)
+                    elif not entry.name.endswith('.lock'):
+                        refs[prefix + entry.name] = entry.path
+            cached = (key, refs, subdirs)
+            self._dirs[path] = cached
+            changed = True
+        for name in cached[2]:
+            changed = self._scan_loose(os.path.join(path, name), f'{prefix}{name}/', seen) or changed
+        return changed
+
+    def _for_each_ref(self):
+        output = subprocess.run(
+            ['git', '--git-dir', self.git_dir, 'for-each-ref', '--format=%(refname:strip=2)', HEADS_PREFIX],
+            check=True, capture_output=True, text=True).stdout
+        return dict.fromkeys(output.splitlines())
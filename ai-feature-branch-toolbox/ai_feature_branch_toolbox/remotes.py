@@ -0,0 +1,53 @@
+import time
+
+# Seconds a successful remote check stays valid; repository.remote_verify_ttl
+# overrides it and 0 checks every time
+DEFAULT_VERIFY_TTL = 3600
+STATE_KEY = 'remote_verification'
+# Reachability checks must fail rather than wait for credentials on a terminal
+VERIFY_ENV = {'GIT_TERMINAL_PROMPT': '0'}
+
+
+def recently_verified(config_manager, name, url, now=None):
+    """
+    Check whether a remote with this URL passed a reachability check within
+    the verification TTL.
+
+    Args:
+        config_manager (ConfigManager): Holds the verification state.
+        name (str): The remote name.
+        url (str): The remote URL.
+        now (float): The current time, for tests.
+
+    Returns:
+        bool: True if the remote does not need to be checked again.
+    """
+    ttl = config_manager.get_value('repository.remote_verify_ttl', DEFAULT_VERIFY_TTL)
+    if not ttl:
+        return False
+    entry = config_manager.persistent_config.get(STATE_KEY, {}).get(name)
+    if not isinstance(entry, dict) or entry.get('url') != url:
+        return False
+    age = (time.time() if now is None else now) - entry.get('verified_at', 0)
+    return 0 <= age < ttl
+
+
+def record_verified(config_manager, name, url, now=None):
+    """
+    Remember that a remote passed a reachability check. The check is kept in
+    the persistent state, keyed by the literal remote name, and never in
+    config.yaml.
+
+    Args:
+        config_manager (ConfigManager): Holds the verification state.
+        name (str): The remote name.
+        url (str): The remote URL.
+        now (float): The current time, for tests.
+    """
+    persistent_config = config_manager.persistent_config
+    state = persistent_config.get(STATE_KEY, {})
+    state[name] = {
+        'url': url,
+        'verified_at': time.time() if now is None else now,
+    }
+    persistent_config.update(STATE_KEY, state)
@@ -0,0 +1,138 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+STATUS_ARGS = ('--porcelain=v2', '-z', '--branch', '--untracked-files=all')
+
+
+class StatusSnapshot:
+    """
+    The working tree, index and branch state from one `git status` run.
+
+    Attributes:
+        branch (str): The checked out branch, or None when HEAD is detached.
+        oid (str): The commit HEAD points to, or None before the first commit.
+        upstream (str): The upstream branch, or None if none is set.
+        ahead (int): Commits on the branch that are not on its upstream.
+        behind (int): Commits on the upstream that are not on the branch.
+        staged (set): Paths with changes in the index.
+        modified (set): Paths with changes in the working tree that are not staged.
+        untracked (set): Untracked paths.
+        unmerged (set): Paths with unresolved merge conflicts.
+        renamed (dict): Renamed or copied paths, mapped to their original path.
+    """
+
+    def __init__(self):
+        self.branch = None
+        self.oid = None
+        self.upstream = None
+        self.ahead = 0
+        self.behind = 0
+        self.staged = set()
+        self.modified = set()
+        self.untracked = set()
+        self.unmerged = set()
+        self.renamed = {}
+
+    @property
+    def dirty(self):
+        """
+        True if tracked files have staged, unstaged or unmerged changes,
+        matching GitPython's Repo.is_dirty().
+        """
+        return bool(self.staged or self.modified or self.unmerged)
+
+    @property
+    def clean(self):
+        """
+        True if there is nothing to commit, untracked files included.
+        """
+        return not self.dirty and not self.untracked
+
+    @classmethod
+    def from_porcelain(cls, output):
+        """
+        Parse the output of `git status --porcelain=v2 -z --branch`.
+
+        Args:
+            output (str): The NUL separated status records.
+
+        Returns:
+            StatusSnapshot: The parsed status.
+        """
+        snapshot = cls()
+        records = iter(output.split('\0'))
+        for record in records:
+            if not record:
+                continue
+            kind = record[0]
+            if kind == '#':
+                snapshot._parse_header(record)
+            elif kind == '1':
+                fields = record.split(' ', 8)
+                snapshot._add_change(fields[1], fields[8])
+            elif kind == '2':
+                # The original path follows as its own record
+                fields = record.split(' ', 9)
+                snapshot._add_change(fields[1], fields[9])
+                snapshot.renamed[fields[9]] = next(records, '')
+            elif kind == 'u':
+                snapshot.unmerged.add(record.split(' ', 10)[10])
+            elif kind == '?':
+                snapshot.untracked.add(record[2:])
+        return snapshot
+
+    def _parse_header(self, record):
+        _, name, value = record.split(' ', 2)
+        if name == 'branch.oid':
+            self.oid = None if value == '(initial)' else value
+        elif name == 'branch.head':
+            self.branch = None if value == '(detached)' else value
+        elif name == 'branch.upstream':
+            self.upstream = value
+        elif name == 'branch.ab':
+            ahead, behind = value.split()
+            self.ahead = int(ahead)
+            self.behind = -int(behind)
+
+    def _add_change(self, xy, path):
+        if xy[0] != '.':
+            self.staged.add(path)
+        if xy[1] != '.':
+            self.modified.add(path)
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: The snapshot with sorted path lists, ready for JSON.
+        """
+        return {
+            'branch': self.branch,
+            'oid': self.oid,
+            'upstream': self.upstream,
+            'ahead': self.ahead,
+            'behind': self.behind,
+            'dirty': self.dirty,
+            'staged': sorted(self.staged),
+            'modified': sorted(self.modified),
+            'untracked': sorted(self.untracked),
+            'unmerged': sorted(self.unmerged),
+            'renamed': dict(sorted(self.renamed.items())),
+        }
+
+
+def read_status(repo):
+    """
+    Take a StatusSnapshot of a repository with a single `git status` call.
+
+    Args:
+        repo (git.Repo): The repository.
+
+    Returns:
+        StatusSnapshot: The current status.
+    """
+    output = repo.git.status(*STATUS_ARGS, strip_newline_in_stdout=False)
+    snapshot = StatusSnapshot.from_porcelain(output)
+    logger.debug("Status of %s: %s staged, %s modified, %s untracked, %s unmerged", repo.working_tree_dir,
+                 len(snapshot.staged), len(snapshot.modified), len(snapshot.untracked), len(snapshot.unmerged))
+    return snapshot
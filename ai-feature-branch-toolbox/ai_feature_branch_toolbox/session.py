@@ -0,0 +1,118 @@
+import os
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+class ToolboxSession:
+    """
+    Shared configuration, persistent state and repository handle.
+
+    Every component that needs the configuration should go through the session
+    returned by get_session() instead of building its own ConfigManager. Each
+    piece is built on first access; the configuration is re-read only when
+    config.yaml or the persistent config file changed on disk since it was last
+    loaded or saved by this process.
+    """
+
+    def __init__(self, config_path='config.yaml'):
+        self.config_path = config_path
+        self._config_manager = None
+        self._git_operations = None
+        self._repo_path = None
+        self._lock = threading.RLock()
+
+    @property
+    def config_manager(self):
+        with self._lock:
+            if self._config_manager is None:
+                from .config_manager import ConfigManager
+                self._config_manager = ConfigManager(self.config_path)
+            elif self._config_manager.is_stale():
+                self._config_manager.reload()
+            return self._config_manager
+
+    @property
+    def config(self):
+        return self.config_manager.get_config()
+
+    @property
+    def persistent_config(self):
+        return self.config_manager.persistent_config
+
+    @property
+    def git_operations(self):
+        """
+        GitOperations connected to the configured repository.path.
+
+        Raises:
+            ValueError: If no repository path is configured.
+            RuntimeError: If the repository cannot be opened.
+        """
+        with self._lock:
+            config_manager = self.config_manager
+            repo_path = config_manager.get_value('repository.path')
+            if not repo_path:
+                raise ValueError("Repository path not set. Please run 'init' command first.")
+
+            if self._git_operations is None:
+                from .git_operations import GitOperations
+                self._git_operations = GitOperations(config_manager)
+
+            if not self._git_operations.is_connected() or self._repo_path != os.path.realpath(repo_path):
+                self._git_operations.close_repo()
+                if not self._git_operations.initialize_repo(repo_path):
+                    raise RuntimeError(f"Failed to initialize repository at {repo_path}")
+                self._repo_path = os.path.realpath(repo_path)
+            return self._git_operations
+
+    @property
+    def repo(self):
+        return self.git_operations.repo
+
+    def close(self):
+        """
+        Release the repository handle and flush pending persistent state.
+        Configuration stays cached.
+        """
+        with self._lock:
+            if self._git_operations is not None:
+                self._git_operations.close_repo()
+            self._repo_path = None
+            if self._config_manager is not None:
+                self._config_manager.flush()
+
+
+def get_session(config_path='config.yaml'):
+    """
+    Return the process-wide session for a configuration file.
+
+    Args:
+        config_path (str): Path to the configuration file. Sessions are keyed
+            by absolute path, so relative paths resolve against the current
+            working directory.
+
+    Returns:
+        ToolboxSession: The shared session.
+    """
+    key = os.path.abspath(config_path)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = ToolboxSession(key)
+            _sessions[key] = session
+        return session
+
+
+def close_sessions():
+    """
+    Close and forget every session of this process.
+    """
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
@@ -0,0 +1,325 @@
+import os
+import sys
+import json
+import time
+import inspect
+import logging
+import functools
+import threading
+import contextvars
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = 'ai_feature_branch_toolbox_'
+
+_current_span = contextvars.ContextVar('ai_feature_branch_toolbox_span', default=None)
+_enabled = False
+_audit_hook_installed = False
+_listeners = []
+
+
+class Span:
+    """
+    One timed operation, with the operations it ran nested as children.
+
+    Attributes:
+        name (str): What was timed, such as 'git_operations.commit_changes'.
+        attributes (dict): Extra details, such as 'bytes_written'.
+        parent (Span): The enclosing span, or None for a root span.
+        children (list): Spans started while this one was current.
+        subprocesses (int): Subprocesses started directly in this span.
+        error (str): The exception that ended the span, if any.
+    """
+
+    def __init__(self, name, parent=None, attributes=None):
+        self.name = name
+        self.parent = parent
+        self.attributes = dict(attributes or {})
+        self.children = []
+        self.subprocesses = 0
+        self.error = None
+        self.start = time.perf_counter()
+        self.end = None
+
+    @property
+    def duration_ms(self):
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000
+
+    @property
+    def total_subprocesses(self):
+        return self.subprocesses + sum(child.total_subprocesses for child in self.children)
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'duration_ms': round(self.duration_ms, 3),
+            'subprocesses': self.subprocesses,
+            'attributes': self.attributes,
+            'error': self.error,
+            'children': [child.to_dict() for child in self.children],
+        }
+
+    def format_tree(self, depth=0):
+        """
+        Returns:
+            str: This span and its children, one per line, indented by depth.
+        """
+        line = f"{'  ' * depth}{self.name}  {self.duration_ms:.2f} ms"
+        if self.total_subprocesses:
+            line += f"  subprocesses={self.total_subprocesses}"
+        for key, value in sorted(self.attributes.items()):
+            line += f"  {key}={value}"
+        if self.error:
+            line += f"  error={self.error}"
+        return '\n'.join([line] + [child.format_tree(depth + 1) for child in self.children])
+
+
+class Metrics:
+    """
+    Counters and timing summaries, exportable as JSON or in the Prometheus
+    text format. Names get the METRIC_PREFIX on export.
+    """
+
+    def __init__(self):
+        self._counters = {}
+        self._timings = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            count, total, maximum = self._timings.get(key, (0, 0.0, 0.0))
+            self._timings[key] = (count + 1, total + seconds, max(maximum, seconds))
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+
+    def to_dict(self):
+        with self._lock:
+            counters = [{'name': METRIC_PREFIX + name, 'labels': dict(labels), 'value': value}
+                        for (name, labels), value in sorted(self._counters.items())]
+            timings = [{'name': METRIC_PREFIX + name, 'labels': dict(labels), 'count': count,
+                        'sum_seconds': total, 'max_seconds': maximum}
+                       for (name, labels), (count, total, maximum) in sorted(self._timings.items())]
+        return {'counters': counters, 'timings': timings}
+
+    def to_json(self):
+        return json.dumps(self.to_dict())
+
+    def to_prometheus(self):
+        """
+        Returns:
+            str: The metrics in the Prometheus text exposition format. Timings
+            are exported as summaries without quantiles, plus a gauge with
+            the maximum.
+        """
+        def render(labels):
+            if not labels:
+                return ''
+            pairs = ','.join(f'{key}="{_escape_label(value)}"' for key, value in labels)
+            return '{' + pairs + '}'
+
+        with self._lock:
+            counters = sorted(self._counters.items())
+            timings = sorted(self._timings.items())
+        lines = []
+        for name in sorted({name for (name, _), _ in counters}):
+            lines.append(f'# TYPE {METRIC_PREFIX}{name} counter')
+            for (metric, labels), value in counters:
+                if metric == name:
+                    lines.append(f'{METRIC_PREFIX}{name}{render(labels)} {value}')
+        for name in sorted({name for (name, _), _ in timings}):
+            lines.append(f'# TYPE {METRIC_PREFIX}{name} summary')
+            for (metric, labels), (count, total, _) in timings:
+                if metric == name:
+                    lines.append(f'{METRIC_PREFIX}{name}_count{render(labels)} {count}')
+                    lines.append(f'{METRIC_PREFIX}{name}_sum{render(labels)} {total}')
+            lines.append(f'# TYPE {METRIC_PREFIX}{name}_max gauge')
+            for (metric, labels), (_, _, maximum) in timings:
+                if metric == name:
+                    lines.append(f'{METRIC_PREFIX}{name}_max{render(labels)} {maximum}')
+        return '\n'.join(lines) + '\n' if lines else ''
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+METRICS = Metrics()
+
+
+def _audit_hook(event, args):
+    # Kept minimal: it runs for every audit event in the process
+    if event != 'subprocess.Popen' or not _enabled:
+        return
+    # An exception here would make the subprocess call itself fail
+    try:
+        executable, argv = args[0], args[1]
+        if executable is None:
+            executable = argv if isinstance(argv, (str, bytes)) else argv[0]
+        METRICS.increment('subprocesses_total', program=os.path.basename(os.fsdecode(executable)))
+        current = _current_span.get()
+        if current is not None:
+            current.subprocesses += 1
+    except Exception:
+        pass
+
+
+def enable():
+    """
+    Start recording spans and metrics.
+
+    Subprocesses are counted through an audit hook, which is installed the
+    first time tracing is enabled and cannot be removed; while tracing is
+    disabled it returns immediately.
+    """
+    global _enabled, _audit_hook_installed
+    if not _audit_hook_installed:
+        sys.addaudithook(_audit_hook)
+        _audit_hook_installed = True
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def add_listener(listener):
+    """
+    Call a function with every finished span, for exporting traces elsewhere.
+
+    Args:
+        listener (callable): Called with the Span. Root spans have no parent.
+    """
+    _listeners.append(listener)
+
+
+def remove_listener(listener):
+    _listeners.remove(listener)
+
+
+def current_span():
+    """
+    Returns:
+        Span: The innermost span being recorded, or None.
+    """
+    return _current_span.get()
+
+
+@contextmanager
+def span(name, **attributes):
+    """
+    Time a block as a span nested in the current one.
+
+    Does nothing unless tracing is enabled.
+
+    Args:
+        name (str): The span name.
+        **attributes: Extra details to record on the span.
+
+    Yields:
+        Span: The span, or None if tracing is disabled.
+    """
+    if not _enabled:
+        yield None
+        return
+    parent = _current_span.get()
+    current = Span(name, parent, attributes)
+    if parent is not None:
+        parent.children.append(current)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = type(e).__name__
+        raise
+    finally:
+        current.end = time.perf_counter()
+        _current_span.reset(token)
+        METRICS.observe('span_duration_seconds', current.end - current.start, span=name)
+        if current.error:
+            METRICS.increment('span_errors_total', span=name)
+        for listener in list(_listeners):
+            try:
+                listener(current)
+            except Exception:
+                logger.exception("Span listener failed for %s", name)
+
+
+def traced(name):
+    """
+    Decorator recording every call of a function or coroutine function as a span.
+
+    Args:
+        name (str): The span name.
+    """
+    def decorator(function):
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                if not _enabled:
+                    return await function(*args, **kwargs)
+                with span(name):
+                    return await function(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            with span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def trace_methods(prefix, exclude=()):
+    """
+    Class decorator recording each public method call as a span named
+    '<prefix>.<method>'.
+
+    Generator methods, static and class methods and properties are left
+    alone, as are the methods named in exclude.
+
+    Args:
+        prefix (str): The span name prefix.
+        exclude (tuple): Method names not to trace.
+    """
+    def decorator(cls):
+        for attribute, value in list(vars(cls).items()):
+            if attribute.startswith('_') or attribute in exclude:
+                continue
+            if not inspect.isfunction(value) or inspect.isgeneratorfunction(value):
+                continue
+            setattr(cls, attribute, traced(f'{prefix}.{attribute}')(value))
+        return cls
+    return decorator
+
+
+def record_bytes_written(count):
+    """
+    Count bytes written to disk, in the metrics and on the current span.
+
+    Args:
+        count (int): Bytes written.
+    """
+    if not _enabled:
+        return
+    METRICS.increment('bytes_written_total', count)
+    current = _current_span.get()
+    if current is not None:
+        current.attributes['bytes_written'] = current.attributes.get('bytes_written', 0) + count
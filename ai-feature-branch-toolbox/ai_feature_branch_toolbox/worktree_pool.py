@@ -0,0 +1,285 @@
+import os
+import json
+import time
+import fcntl
+import logging
+from contextlib import contextmanager
+from git import GitCommandError
+from .atomic_write import write_atomic
+
+logger = logging.getLogger(__name__)
+
+POOL_DIR_NAME = os.path.join('ai_feature_branch_toolbox', 'worktrees')
+DEFAULT_POOL_SIZE = 4
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class WorktreeLease:
+    """
+    Exclusive use of one pooled worktree with a branch checked out.
+
+    Use it as a context manager, or call release() when done.
+
+    Attributes:
+        path (str): The worktree directory.
+        branch (str): The branch checked out in it.
+    """
+
+    def __init__(self, pool, path, branch):
+        self.pool = pool
+        self.path = path
+        self.branch = branch
+        self.released = False
+
+    def git_operations(self, config_manager=None):
+        """
+        Returns:
+            GitOperations: Operations bound to this worktree.
+        """
+        from .git_operations import GitOperations
+        return GitOperations.for_worktree(self.path, config_manager)
+
+    def release(self):
+        if not self.released:
+            self.pool.release(self.branch)
+            self.released = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+
+class WorktreePool:
+    """
+    A bounded set of `git worktree` checkouts leased out one branch at a time.
+
+    A lease reuses, in order of preference, an idle worktree that already has
+    the branch checked out, a new worktree while the pool is below its size,
+    or the least recently used idle worktree without local changes, which is
+    switched to the branch. Uncommitted work is never discarded: a worktree
+    leased again for its own branch keeps it, and a worktree holding it is
+    not given to another branch. The pool state lives in the repository's git directory and is
+    guarded by a file lock, so several processes can share one pool. Leases
+    held by processes that have exited are reclaimed.
+    """
+
+    def __init__(self, repo, max_size=DEFAULT_POOL_SIZE, root=None):
+        """
+        Args:
+            repo (git.Repo): The repository whose branches are checked out.
+            max_size (int): Maximum number of worktrees.
+            root (str): Directory holding the worktrees. Defaults to a
+                directory in the repository's git directory.
+        """
+        if max_size < 1:
+            raise ValueError("Worktree pool size must be at least 1")
+        self.repo = repo
+        self.max_size = max_size
+        self.root = os.path.abspath(root or os.path.join(repo.common_dir, POOL_DIR_NAME))
+        self.state_file = os.path.join(self.root, 'pool.json')
+        self.lock_file = os.path.join(self.root, 'pool.lock')
+        os.makedirs(self.root, exist_ok=True)
+
+    @contextmanager
+    def _locked_state(self):
+        with open(self.lock_file, 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                try:
+                    with open(self.state_file, 'r') as f:
+                        state = json.load(f)
+                except FileNotFoundError:
+                    state = {'worktrees': []}
+                # Forget worktrees whose directory was removed behind our back
+                state['worktrees'] = [entry for entry in state['worktrees'] if os.path.isdir(entry['path'])]
+                yield state
+                write_atomic(self.state_file, json.dumps(state, indent=2))
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _is_idle(entry):
+        if not entry['leased']:
+            return True
+        pid = entry.get('pid')
+        return pid is not None and not _process_alive(pid)
+
+    def lease(self, branch, start_point=None, hold=False):
+        """
+        Lease a worktree with a branch checked out.
+
+        Args:
+            branch (str): The branch to check out.
+            start_point (str): Create the branch from this revision if it
+                does not exist yet.
+            hold (bool): Keep the lease after this process exits, until
+                release() is called. Used by the CLI, where every command is
+                a separate process.
+
+        Returns:
+            WorktreeLease: The lease.
+
+        Raises:
+            ValueError: If the branch does not exist or is already leased.
+            RuntimeError: If every worktree in the pool is leased, or every
+                idle one has uncommitted changes.
+        """
+        if branch not in self.repo.heads:
+            if start_point is None:
+                raise ValueError(f"Branch '{branch}' does not exist")
+            self.repo.git.branch(branch, start_point)
+
+        with self._locked_state() as state:
+            worktrees = state['worktrees']
+            entry = next((entry for entry in worktrees if entry['branch'] == branch), None)
+            if entry is not None and not self._is_idle(entry):
+                raise ValueError(f"Branch '{branch}' is already leased in {entry['path']}")
+
+            if entry is not None:
+                changes = self._local_changes(entry['path'])
+                if changes:
+                    logger.warning("Worktree %s of '%s' still has %s uncommitted changes from an earlier lease; "
+                                   "they are kept", entry['path'], branch, len(changes))
+            elif len(worktrees) < self.max_size:
+                entry = {'path': self._new_path(worktrees), 'branch': branch}
+                try:
+                    self.repo.git.worktree('add', '--quiet', entry['path'], branch)
+                except GitCommandError as e:
+                    raise ValueError(f"Cannot check out '{branch}' in a new worktree: {e.stderr.strip()}")
+                worktrees.append(entry)
+                logger.info("Created worktree %s for '%s'", entry['path'], branch)
+            else:
+                idle = [entry for entry in worktrees if self._is_idle(entry)]
+                if not idle:
+                    raise RuntimeError(f"All {len(worktrees)} pooled worktrees are leased")
+                entry = self._least_recently_used_clean(idle)
+                if entry is None:
+                    raise RuntimeError(
+                        f"Every idle pooled worktree has uncommitted changes ({', '.join(e['branch'] for e in idle)}); "
+                        "commit them or prune the worktrees")
+                logger.info("Reusing worktree %s of '%s' for '%s'", entry['path'], entry['branch'], branch)
+                self._switch(entry['path'], branch)
+                entry['branch'] = branch
+
+            entry['leased'] = True
+            entry['pid'] = None if hold else os.getpid()
+            entry['last_used'] = time.time()
+            return WorktreeLease(self, entry['path'], branch)
+
+    def release(self, branch):
+        """
+        Return the worktree leased for a branch to the pool.
+
+        Args:
+            branch (str): The leased branch.
+
+        Returns:
+            bool: True if a lease was released.
+        """
+        with self._locked_state() as state:
+            for entry in state['worktrees']:
+                if entry['branch'] == branch and entry['leased']:
+                    entry['leased'] = False
+                    entry['pid'] = None
+                    entry['last_used'] = time.time()
+                    logger.info("Released worktree %s of '%s'", entry['path'], branch)
+                    return True
+        return False
+
+    def path_for(self, branch):
+        """
+        Returns:
+            str: The worktree that has the branch checked out, or None.
+        """
+        with self._locked_state() as state:
+            for entry in state['worktrees']:
+                if entry['branch'] == branch:
+                    return entry['path']
+        return None
+
+    def worktrees(self):
+        """
+        Returns:
+            list: One dict per worktree with its path, branch, whether it is
+            leased and when it was last used.
+        """
+        with self._locked_state() as state:
+            return [dict(entry, leased=not self._is_idle(entry)) for entry in state['worktrees']]
+
+    def prune(self, max_size=None):
+        """
+        Remove the least recently used idle worktrees beyond a size.
+
+        Worktrees with uncommitted changes are kept, so the pool may stay
+        larger than max_size.
+
+        Args:
+            max_size (int): Worktrees to keep. Defaults to the pool size; 0
+                removes every idle worktree without local changes.
+
+        Returns:
+            int: The number of worktrees removed.
+        """
+        keep = self.max_size if max_size is None else max_size
+        removed = 0
+        with self._locked_state() as state:
+            worktrees = state['worktrees']
+            for entry in sorted((e for e in worktrees if self._is_idle(e)), key=lambda e: e['last_used']):
+                if len(worktrees) <= keep:
+                    break
+                changes = self._local_changes(entry['path'])
+                if changes:
+                    logger.warning("Keeping worktree %s of '%s': it has %s uncommitted changes",
+                                   entry['path'], entry['branch'], len(changes))
+                    continue
+                try:
+                    # Without --force git itself refuses to remove a worktree
+                    # that gained changes since the check above
+                    self.repo.git.worktree('remove', entry['path'])
+                except GitCommandError as e:
+                    logger.warning("Keeping worktree %s of '%s': %s", entry['path'], entry['branch'], e.stderr.strip())
+                    continue
+                worktrees.remove(entry)
+                removed += 1
+                logger.info("Removed worktree %s", entry['path'])
+        self.repo.git.worktree('prune')
+        return removed
+
+    def _new_path(self, worktrees):
+        used = {os.path.basename(entry['path']) for entry in worktrees}
+        index = 1
+        while f'wt-{index}' in used or os.path.exists(os.path.join(self.root, f'wt-{index}')):
+            index += 1
+        return os.path.join(self.root, f'wt-{index}')
+
+    def _local_changes(self, path):
+        # Modified, staged and untracked paths, as `git status` lists them
+        return self.repo.git.execute(['git', '-C', path, 'status', '--porcelain']).splitlines()
+
+    def _least_recently_used_clean(self, idle):
+        for entry in sorted(idle, key=lambda entry: entry['last_used']):
+            changes = self._local_changes(entry['path'])
+            if not changes:
+                return entry
+            logger.warning("Not reusing worktree %s of '%s': it has %s uncommitted changes",
+                           entry['path'], entry['branch'], len(changes))
+        return None
+
+    def _switch(self, path, branch):
+        # The worktree has no local changes, so only files that differ
+        # between the two branches are rewritten
+        try:
+            self.repo.git.execute(['git', '-C', path, 'checkout', '--quiet', branch])
+        except GitCommandError as e:
+            raise ValueError(f"Cannot check out '{branch}' in {path}: {e.stderr.strip()}")
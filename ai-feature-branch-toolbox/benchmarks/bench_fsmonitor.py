@@ -0,0 +1,169 @@
+"""
+Filesystem monitor benchmark for ai-feature-branch-toolbox.
+
+Generates a large synthetic working tree (or uses --repo) and times, in three
+copies of it, what a commit does with a few changed files:
+
+- scan: git's default, every tracked file is checked and every directory
+  read for untracked files;
+- untracked_cache: core.untrackedCache only, with
+  status.showUntrackedFiles=all so that git uses it for the status the
+  toolbox reads;
+- fsmonitor: GitOperations.enable_fsmonitor(), which adds a filesystem
+  monitor on top of the untracked cache.
+
+Each sample changes --changed tracked files and adds one untracked file, then
+times status() and commit_changes(); a status() of the clean tree follows.
+The median of --repeat samples is reported with the speedup over scan:
+
+    python benchmarks/bench_fsmonitor.py --files 100000 --changed 10
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PACKAGE_ROOT)
+
+from bench_operations import Workspace, _git  # noqa: E402
+from synthetic_repo import add_arguments, shape  # noqa: E402
+
+from ai_feature_branch_toolbox.config_manager import ConfigManager  # noqa: E402
+from ai_feature_branch_toolbox.git_operations import GitOperations  # noqa: E402
+
+MODES = ('scan', 'untracked_cache', 'fsmonitor')
+TIMINGS = ('status_dirty_ms', 'commit_ms', 'status_clean_ms')
+
+
+def _open(workspace, mode):
+    path = workspace.copy()
+    git_ops = GitOperations(ConfigManager(os.path.join(path, 'config.yaml')), track_state=False)
+    if not git_ops.initialize_repo(path):
+        raise RuntimeError(f"Could not open {path}")
+    if mode == 'untracked_cache':
+        _git('config', 'core.untrackedCache', 'true', cwd=path)
+        _git('config', 'status.showUntrackedFiles', 'all', cwd=path)
+    elif mode == 'fsmonitor' and not git_ops.enable_fsmonitor():
+        raise RuntimeError("No filesystem monitor is available on this system")
+    # The first status calls write the untracked cache and the monitor's
+    # token into the index; later calls are what the benchmark is about
+    git_ops.status()
+    git_ops.status()
+    return path, git_ops
+
+
+def _change(workspace, path, sample, changed):
+    files = workspace.files
+    for index in range(sample * changed, (sample + 1) * changed):
+        name = files[index % len(files)]
+        with open(os.path.join(path, name), 'a', encoding='utf-8') as f:
+            f.write(f'changed by benchmark sample {sample}\n')
+    with open(os.path.join(path, f'benchmark-sample-{sample}.txt'), 'w', encoding='utf-8') as f:
+        f.write('added by benchmark\n')
+
+
+def measure(workspace, mode, repeat, changed):
+    """
+    Returns:
+        dict: Median and minimum of each timing, and whether every commit
+        succeeded.
+    """
+    path, git_ops = _open(workspace, mode)
+    samples = {name: [] for name in TIMINGS}
+    ok = True
+    try:
+        for sample in range(repeat):
+            _change(workspace, path, sample, changed)
+
+            start = time.perf_counter()
+            status = git_ops.status()
+            samples['status_dirty_ms'].append((time.perf_counter() - start) * 1000)
+            ok = ok and len(status.modified) == changed and len(status.untracked) == 1
+
+            start = time.perf_counter()
+            ok = git_ops.commit_changes(f'Benchmark sample {sample}') and ok
+            samples['commit_ms'].append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            ok = git_ops.status().clean and ok
+            samples['status_clean_ms'].append((time.perf_counter() - start) * 1000)
+    finally:
+        if mode == 'fsmonitor':
+            git_ops.disable_fsmonitor()
+        git_ops.close_repo()
+        shutil.rmtree(path, ignore_errors=True)
+
+    result = {'ok': ok}
+    for name, values in samples.items():
+        result[name] = statistics.median(values)
+        result[name.replace('_ms', '_min_ms')] = min(values)
+    return result
+
+
+def print_report(results):
+    scan = results['scan']
+    print(f"{'mode':16} " + ' '.join(f'{name[:-3]:>22}' for name in TIMINGS))
+    for mode, result in results.items():
+        cells = []
+        for name in TIMINGS:
+            speedup = scan[name] / result[name] if result[name] else 0
+            cells.append(f"{result[name]:9.2f} ms ({speedup:5.1f}x)")
+        failed = '' if result['ok'] else '  FAILED'
+        print(f"{mode:16} " + ' '.join(f'{cell:>22}' for cell in cells) + failed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dirty checks and commits with a filesystem monitor")
+    add_arguments(parser)
+    parser.set_defaults(files=100000, depth=4, commits=2, branches=1)
+    parser.add_argument('--repo', help='Benchmark copies of an existing repository instead')
+    parser.add_argument('--repeat', type=int, default=5, help='Samples per mode (default: 5)')
+    parser.add_argument('--changed', type=int, default=10, help='Tracked files changed per sample (default: 10)')
+    parser.add_argument('--only', action='append', choices=MODES, help='Only run this mode (repeatable)')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='bench_fsmonitor_')
+    cwd = os.getcwd()
+    modes = [mode for mode in MODES if not args.only or mode in args.only or mode == 'scan']
+    try:
+        os.chdir(root)
+        workspace = Workspace(root, args.repo, shape(args))
+        results = {
+            'environment': {
+                'python': platform.python_version(),
+                'git': _git('--version').strip(),
+                'platform': platform.platform(),
+            },
+            'repository': {
+                'path': args.repo,
+                'shape': None if args.repo else shape(args),
+                'files': len(workspace.files),
+            },
+            'repeat': args.repeat,
+            'changed': args.changed,
+            'modes': {mode: measure(workspace, mode, args.repeat, args.changed) for mode in modes},
+        }
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(root, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results['modes'])
+    sys.exit(0 if all(result['ok'] for result in results['modes'].values()) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,378 @@
+"""
+Operation benchmark for ai-feature-branch-toolbox on a synthetic repository.
+
+Generates a repository with benchmarks/synthetic_repo.py (or uses --repo) and
+measures, with the median of --repeat runs each:
+
+- every GitOperations operation, in-process. Operations that change the
+  repository run on a fresh copy each time; copying is not timed;
+- ConfigManager load, with and without its cache, and a single-value save;
+- full CLI invocations in a fresh interpreter, without a daemon.
+
+For in-process operations the git subprocesses started per call are counted
+as well. Results go to --output as JSON; with --baseline the run is compared
+with an earlier output and the script exits with status 1 on regressions
+(see benchmarks/compare.py):
+
+    python benchmarks/bench_operations.py --files 20000 --branches 50 --output baseline.json
+    python benchmarks/bench_operations.py --files 20000 --branches 50 --baseline baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PACKAGE_ROOT)
+
+from compare import compare, load, print_comparison  # noqa: E402
+from synthetic_repo import BRANCH_PREFIX, add_arguments, generate_repo, shape  # noqa: E402
+
+from ai_feature_branch_toolbox import tracing  # noqa: E402
+from ai_feature_branch_toolbox.config_manager import ConfigManager  # noqa: E402
+from ai_feature_branch_toolbox.git_operations import GitOperations  # noqa: E402
+
+CONFIG_TEMPLATE = """\
+repository:
+  path: {path}
+  remote: origin
+branches:
+  main: main
+  prefix: {prefix}
+commit:
+  author_name: Benchmark
+  author_email: benchmark@example.com
+  message_template: 'feat: {{message}}'
+merge:
+  strategy: merge
+  squash: false
+logging:
+  level: INFO
+  file: benchmark.log
+ai_agent:
+  model: default
+  temperature: 0.7
+"""
+
+# Kept out of commits made in copies of the repository
+EXCLUDED = 'config.yaml\n.ai_feature_branch_toolbox/\n*.log\n'
+
+
+def _git(*args, cwd=None):
+    return subprocess.run(['git'] + list(args), cwd=cwd, check=True, capture_output=True, text=True).stdout
+
+
+class Workspace:
+    """
+    The repository under test, a bare clone of it serving as remote, and the
+    configuration, all in one temporary directory.
+    """
+
+    def __init__(self, root, repo=None, repo_shape=None):
+        self.root = root
+        self.template = os.path.abspath(repo) if repo else os.path.join(root, 'repo')
+        if repo is None:
+            generate_repo(self.template, **repo_shape)
+        self.branches = sorted(line.strip() for line in _git(
+            'for-each-ref', '--format=%(refname:short)', f'refs/heads/{BRANCH_PREFIX}',
+            cwd=self.template).splitlines())
+        if not self.branches:
+            raise ValueError(f"{self.template} has no feature branches")
+        self.main_branch = _git('symbolic-ref', '--short', 'HEAD', cwd=self.template).strip()
+        self.files = _git('ls-files', cwd=self.template).splitlines()
+        self.clean_branch, self.conflicting_branch = self._pick_branches()
+
+        self.remote = os.path.join(root, 'remote.git')
+        _git('clone', '-q', '--bare', self.template, self.remote)
+
+        # Commands run here use the template; copies get their own config.yaml
+        self.config_path = os.path.join(root, 'config.yaml')
+        self._write_config(self.config_path, self.template)
+        self.config_manager = ConfigManager(self.config_path)
+        self._copies = 0
+
+    def _pick_branches(self):
+        clean = conflicting = None
+        for branch in self.branches:
+            merged = subprocess.run(['git', 'merge-tree', '--write-tree', self.main_branch, branch],
+                                    cwd=self.template, capture_output=True)
+            if merged.returncode == 0 and clean is None:
+                clean = branch
+            elif merged.returncode == 1 and conflicting is None:
+                conflicting = branch
+        return clean or self.branches[0], conflicting or self.branches[-1]
+
+    def _write_config(self, path, repo_path):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(CONFIG_TEMPLATE.format(path=json.dumps(repo_path), prefix=BRANCH_PREFIX))
+
+    def copy(self):
+        """
+        Returns:
+            str: A fresh copy of the repository with a config.yaml for it.
+        """
+        self._copies += 1
+        path = os.path.join(self.root, f'copy{self._copies}')
+        shutil.copytree(self.template, path, symlinks=True)
+        with open(os.path.join(path, '.git', 'info', 'exclude'), 'a', encoding='utf-8') as f:
+            f.write(EXCLUDED)
+        self._write_config(os.path.join(path, 'config.yaml'), './')
+        _git('config', 'user.name', 'Benchmark', cwd=path)
+        _git('config', 'user.email', 'benchmark@example.com', cwd=path)
+        # Copied files have new inode numbers and ctimes, which would make
+        # the first status call rehash every file
+        subprocess.run(['git', 'update-index', '-q', '--refresh'], cwd=path, capture_output=True)
+        return path
+
+    def touch_files(self, path, fraction=0.01):
+        """
+        Change a fraction of the tracked files in a copy.
+        """
+        step = max(1, int(1 / fraction))
+        for name in self.files[::step]:
+            with open(os.path.join(path, name), 'a', encoding='utf-8') as f:
+                f.write('changed by benchmark\n')
+
+
+@contextmanager
+def _operations(workspace, copy=False, prepare=None):
+    path = workspace.copy() if copy else workspace.template
+    git_ops = GitOperations.for_worktree(path, workspace.config_manager)
+    try:
+        if prepare is not None:
+            prepare(workspace, git_ops, path)
+        yield git_ops
+    finally:
+        git_ops.close_repo()
+        if copy:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+@contextmanager
+def _unconnected(workspace):
+    yield GitOperations(workspace.config_manager, track_state=False)
+
+
+@contextmanager
+def _directory(workspace, copy=False, prepare=None):
+    path = workspace.copy() if copy else workspace.root
+    try:
+        if prepare is not None:
+            prepare(workspace, None, path)
+        yield path
+    finally:
+        if copy:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def _touch(workspace, git_ops, path):
+    workspace.touch_files(path)
+
+
+def _commit_to_push(workspace, git_ops, path):
+    _git('remote', 'add', 'origin', workspace.remote, cwd=path)
+    # A new branch each time, so every push transfers the same commits
+    _git('checkout', '-q', '-b', f'benchmark/push-{os.path.basename(path)}', cwd=path)
+    workspace.touch_files(path)
+    _git('commit', '-q', '-a', '-m', 'Benchmark push', cwd=path)
+
+
+def git_operation_cases(workspace):
+    """
+    Returns:
+        list: (name, context factory, operation) for every GitOperations
+        operation. The context factory yields what the operation is run on.
+    """
+    clean, conflicting, main_branch = workspace.clean_branch, workspace.conflicting_branch, workspace.main_branch
+    sample = workspace.files[::max(1, len(workspace.files) // 100)]
+    return [
+        ('git_operations.initialize_repo', _unconnected, lambda git_ops: git_ops.initialize_repo(workspace.template)),
+        ('git_operations.status', _operations, lambda git_ops: git_ops.status()),
+        ('git_operations.conflicts', _operations, lambda git_ops: git_ops.conflicts()),
+        ('git_operations.ref_index', _operations, lambda git_ops: git_ops.ref_index().branches()),
+        ('git_operations.list_branches', _operations, lambda git_ops: git_ops.list_branches(BRANCH_PREFIX)),
+        ('git_operations.read_files', _operations, lambda git_ops: git_ops.read_files(main_branch, sample)),
+        ('git_operations.can_merge', _operations, lambda git_ops: git_ops.can_merge(conflicting, main_branch)),
+        ('git_operations.merge_feature_branch.dry_run', _operations,
+         lambda git_ops: git_ops.merge_feature_branch(clean, main_branch, dry_run=True)),
+        ('git_operations.merge_matrix', _operations, lambda git_ops: git_ops.merge_matrix()),
+        ('git_operations.resolve_conflicts', _operations, lambda git_ops: git_ops.resolve_conflicts()),
+        ('git_operations.run_batch', _operations, lambda git_ops: list(git_ops.run_batch(
+            [{'command': 'list-branches', 'prefix': BRANCH_PREFIX}, {'command': 'resolve-conflicts'}]))),
+        ('git_operations.create_feature_branch', lambda ws: _operations(ws, copy=True),
+         lambda git_ops: git_ops.create_feature_branch(f'{BRANCH_PREFIX}benchmark')),
+        ('git_operations.switch_branch', lambda ws: _operations(ws, copy=True),
+         lambda git_ops: git_ops.switch_branch(clean)),
+        ('git_operations.commit_changes', lambda ws: _operations(ws, copy=True, prepare=_touch),
+         lambda git_ops: git_ops.commit_changes('Benchmark commit')),
+        ('git_operations.merge_feature_branch', lambda ws: _operations(ws, copy=True),
+         lambda git_ops: git_ops.merge_feature_branch(clean, main_branch)),
+        ('git_operations.merge_feature_branch.in_memory', lambda ws: _operations(ws, copy=True),
+         lambda git_ops: git_ops.merge_feature_branch(clean, main_branch, in_memory=True)),
+        ('git_operations.add_remote', lambda ws: _operations(ws, copy=True),
+         lambda git_ops: git_ops.add_remote('origin', workspace.remote)),
+        ('git_operations.push_changes', lambda ws: _operations(ws, copy=True, prepare=_commit_to_push),
+         lambda git_ops: git_ops.push_changes('origin')),
+        ('git_operations.worktree_pool.lease', lambda ws: _operations(ws, copy=True),
+         lambda git_ops: git_ops.worktree_pool().lease(clean).release() is None),
+    ]
+
+
+@contextmanager
+def _config_manager(workspace):
+    yield ConfigManager(workspace.config_path)
+
+
+def config_cases(workspace):
+    counter = iter(range(1 << 30))
+    return [
+        ('config_manager.load', _directory, lambda root: ConfigManager(workspace.config_path, use_cache=False)),
+        ('config_manager.load.cached', _directory, lambda root: ConfigManager(workspace.config_path)),
+        ('config_manager.set_value', _config_manager,
+         lambda config_manager: config_manager.set_value('benchmark.counter', next(counter)) is None),
+    ]
+
+
+def _cli(*argv):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = PACKAGE_ROOT + os.pathsep + env.get('PYTHONPATH', '')
+    env['PYTHONDONTWRITEBYTECODE'] = '1'
+    env['AI_FEATURE_BRANCH_TOOLBOX_NO_DAEMON'] = '1'
+
+    def run(cwd):
+        completed = subprocess.run([sys.executable, '-m', 'ai_feature_branch_toolbox'] + list(argv),
+                                   cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return completed.returncode == 0
+    return run
+
+
+def cli_cases(workspace):
+    clean, conflicting = workspace.clean_branch, workspace.conflicting_branch
+    return [
+        ('cli.help', _directory, _cli('help')),
+        ('cli.merge.dry_run', _directory, _cli('merge', conflicting, '--main-branch', workspace.main_branch, '--dry-run')),
+        ('cli.merge_matrix', _directory, _cli('merge-matrix', '--json')),
+        ('cli.create_branch', lambda ws: _directory(ws, copy=True), _cli('create-branch', f'{BRANCH_PREFIX}benchmark')),
+        ('cli.switch_branch', lambda ws: _directory(ws, copy=True), _cli('switch-branch', clean)),
+        ('cli.commit', lambda ws: _directory(ws, copy=True, prepare=_touch), _cli('commit', 'Benchmark commit')),
+    ]
+
+
+def measure(workspace, name, context, operation, repeat):
+    """
+    Time an operation repeat times, each in a fresh context.
+
+    Returns:
+        dict: Median and minimum time, git subprocesses started in-process
+        by one run, and whether every run succeeded.
+    """
+    samples = []
+    subprocesses = 0
+    ok = True
+    for _ in range(repeat):
+        with context(workspace) as target:
+            with tracing.span(name) as span:
+                start = time.perf_counter()
+                result = operation(target)
+                samples.append((time.perf_counter() - start) * 1000)
+            subprocesses = span.total_subprocesses
+        ok = ok and result is not None and result is not False
+    return {
+        'median_ms': statistics.median(samples),
+        'min_ms': min(samples),
+        'subprocesses': subprocesses,
+        'ok': ok,
+    }
+
+
+def run(workspace, repeat, groups=('git', 'config', 'cli')):
+    case_lists = {'git': git_operation_cases, 'config': config_cases, 'cli': cli_cases}
+    results = {}
+    tracing.enable()
+    try:
+        for group in groups:
+            for name, context, operation in case_lists[group](workspace):
+                results[name] = measure(workspace, name, context, operation, repeat)
+    finally:
+        tracing.disable()
+    return results
+
+
+def print_report(results):
+    width = max(len(name) for name in results)
+    print(f"{'operation':{width}} {'median':>12} {'min':>12} {'procs':>5}")
+    for name, result in results.items():
+        failed = '' if result['ok'] else '  FAILED'
+        print(f"{name:{width}} {result['median_ms']:9.2f} ms {result['min_ms']:9.2f} ms "
+              f"{result['subprocesses']:5d}{failed}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark toolbox operations on a synthetic repository")
+    add_arguments(parser)
+    parser.add_argument('--repo', help='Benchmark an existing repository instead (it is not modified)')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement (default: 5)')
+    parser.add_argument('--only', action='append', choices=('git', 'config', 'cli'),
+                        help='Only run this group of benchmarks (repeatable)')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    parser.add_argument('--baseline', help='Compare with results written earlier by --output')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Relative slowdown against the baseline that fails (default: 0.2)')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0,
+                        help='Ignore slowdowns against the baseline smaller than this (default: 1.0)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='bench_operations_')
+    cwd = os.getcwd()
+    try:
+        # Persistent state of in-process operations goes to the workspace
+        os.chdir(root)
+        workspace = Workspace(root, args.repo, shape(args))
+        results = {
+            'environment': {
+                'python': platform.python_version(),
+                'git': _git('--version').strip(),
+                'platform': platform.platform(),
+            },
+            'repository': {
+                'path': args.repo,
+                'shape': None if args.repo else shape(args),
+                'files': len(workspace.files),
+                'branches': len(workspace.branches),
+            },
+            'repeat': args.repeat,
+            'operations': run(workspace, args.repeat, args.only or ('git', 'config', 'cli')),
+        }
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(root, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results['operations'])
+
+    failed = [name for name, result in results['operations'].items() if not result['ok']]
+    regressed = []
+    if args.baseline:
+        rows = compare(load(args.baseline), results, args.threshold, args.min_delta_ms)
+        regressed = [row for row in rows if row['regressed']]
+        if not args.json:
+            print()
+            print_comparison(rows)
+    sys.exit(1 if failed or regressed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Persistent state backend benchmark for ai-feature-branch-toolbox.
+
+Fills a store with --keys keys, then measures for each backend:
+
+- the mean cost of one `update` of a single key under the given flush
+  policy (with `immediate`, every update reaches the disk);
+- the mean cost of one `ConfigManager.set_value` with the same state
+  merged into the configuration, which is how the toolbox updates it;
+- the time to open the store and read one key, i.e. rebuilding the
+  in-memory index from disk;
+- the bytes on disk after the updates.
+
+    python benchmarks/bench_persistence.py --keys 10000 --updates 500
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import yaml
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PACKAGE_ROOT)
+
+from ai_feature_branch_toolbox.config_manager import ConfigManager  # noqa: E402
+from ai_feature_branch_toolbox.config_template import DEFAULT_CONFIG  # noqa: E402
+from ai_feature_branch_toolbox.persistent_config import PERSISTENCE_BACKENDS, create_persistent_config  # noqa: E402
+
+
+def _directory_size(directory):
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+
+
+def _initial_state(keys):
+    return {f'branch/{i}': {'last_operation': 'commit', 'sequence': i} for i in range(keys)}
+
+
+def measure_set_value(backend, keys, updates, policy):
+    work_dir = tempfile.mkdtemp(prefix=f'bench_config_{backend}_')
+    cwd = os.getcwd()
+    # The persistent state directory is relative to the working directory
+    os.chdir(work_dir)
+    try:
+        config = {section: dict(values) for section, values in DEFAULT_CONFIG.items()}
+        config['persistence'] = {'backend': backend, 'flush_policy': policy}
+        with open('config.yaml', 'w') as f:
+            yaml.dump(config, f)
+        store = create_persistent_config(os.path.join(work_dir, '.ai_feature_branch_toolbox'), backend, policy)
+        store.save(_initial_state(keys))
+        store.close()
+
+        config_manager = ConfigManager('config.yaml')
+        start = time.perf_counter()
+        for i in range(updates):
+            config_manager.set_value('current_branch', f'feature/{i}')
+        config_manager.flush()
+        set_value_ms = (time.perf_counter() - start) * 1000 / updates
+        config_manager.persistent_config.close()
+        return set_value_ms
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def measure_backend(backend, keys, updates, policy):
+    config_dir = tempfile.mkdtemp(prefix=f'bench_{backend}_')
+    try:
+        store = create_persistent_config(config_dir, backend, policy)
+        store.save(_initial_state(keys))
+        store.flush()
+
+        start = time.perf_counter()
+        for i in range(updates):
+            store.update(f'branch/{i % keys}', {'last_operation': 'push', 'sequence': i})
+        store.flush()
+        update_ms = (time.perf_counter() - start) * 1000 / updates
+        store.close()
+
+        start = time.perf_counter()
+        create_persistent_config(config_dir, backend).get('branch/0')
+        open_ms = (time.perf_counter() - start) * 1000
+
+        return {
+            'update_ms': update_ms,
+            'set_value_ms': measure_set_value(backend, keys, updates, policy),
+            'open_ms': open_ms,
+            'disk_bytes': _directory_size(config_dir),
+        }
+    finally:
+        shutil.rmtree(config_dir, ignore_errors=True)
+
+
+def run(keys, updates, policy):
+    return {backend: measure_backend(backend, keys, updates, policy) for backend in PERSISTENCE_BACKENDS}
+
+
+def print_report(results):
+    print(f"{'backend':10} {'update':>12} {'set_value':>12} {'open':>12} {'disk':>12}")
+    for backend, result in results.items():
+        print(f"{backend:10} {result['update_ms']:9.3f} ms {result['set_value_ms']:9.3f} ms "
+              f"{result['open_ms']:9.1f} ms {result['disk_bytes']:12d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the persistent state backends")
+    parser.add_argument('--keys', type=int, default=10000, help='Keys in the store (default: 10000)')
+    parser.add_argument('--updates', type=int, default=500, help='Single-key updates to time (default: 500)')
+    parser.add_argument('--policy', default='immediate', help="Flush policy (default: 'immediate')")
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    results = run(args.keys, args.updates, args.policy)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""
+Cold-start benchmark for the ai-feature-branch-toolbox CLI.
+
+Measures, in fresh interpreters:
+
+- the import time of the package and of the CLI module, and which heavy
+  dependencies (GitPython, PyYAML) get loaded by those imports;
+- the time to first output of `help` and of `<command> --help` for every
+  subcommand.
+
+Every measurement is repeated and the median is reported. With --budget-ms
+and --import-budget-ms the script exits with status 1 when a median exceeds
+its budget, so it can be enforced in CI:
+
+    python benchmarks/bench_startup.py --budget-ms 150 --import-budget-ms 50
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PACKAGE_ROOT)
+
+HEAVY_MODULES = ('git', 'yaml')
+
+IMPORT_PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'ms': elapsed * 1000, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def _environment():
+    env = dict(os.environ)
+    env['PYTHONPATH'] = PACKAGE_ROOT + os.pathsep + env.get('PYTHONPATH', '')
+    env['PYTHONDONTWRITEBYTECODE'] = '1'
+    return env
+
+
+def measure_interpreter_startup(repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'print()'], capture_output=True, check=True)
+        samples.append((time.perf_counter() - start) * 1000)
+    return {'median_ms': statistics.median(samples)}
+
+
+def measure_import(module, repeat):
+    samples = []
+    loaded = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, '-c', IMPORT_PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            env=_environment(), capture_output=True, text=True, check=True,
+        ).stdout
+        result = json.loads(output)
+        samples.append(result['ms'])
+        loaded = result['loaded']
+    return {'median_ms': statistics.median(samples), 'heavy_modules_loaded': loaded}
+
+
+def measure_first_output(argv, repeat):
+    """
+    Time from process spawn until the first byte appears on stdout.
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'ai_feature_branch_toolbox'] + argv,
+            env=_environment(), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+        process.stdout.read(1)
+        samples.append((time.perf_counter() - start) * 1000)
+        process.communicate()
+    return {'median_ms': statistics.median(samples)}
+
+
+def subcommands():
+    from ai_feature_branch_toolbox.cli import build_parser
+
+    parser = build_parser()
+    for action in parser._subparsers._group_actions:
+        return list(action.choices)
+    return []
+
+
+def run(repeat):
+    results = {
+        'interpreter': measure_interpreter_startup(repeat),
+        'imports': {
+            module: measure_import(module, repeat)
+            for module in ('ai_feature_branch_toolbox', 'ai_feature_branch_toolbox.cli')
+        },
+        'commands': {'help': measure_first_output(['help'], repeat)},
+    }
+    for command in subcommands():
+        results['commands'][f'{command} --help'] = measure_first_output([command, '--help'], repeat)
+    return results
+
+
+def check_budgets(results, budget_ms, import_budget_ms):
+    violations = []
+    if import_budget_ms is not None:
+        for module, result in results['imports'].items():
+            if result['median_ms'] > import_budget_ms:
+                violations.append(f"import {module}: {result['median_ms']:.1f} ms > {import_budget_ms} ms")
+            if result['heavy_modules_loaded']:
+                violations.append(f"import {module} loaded {', '.join(result['heavy_modules_loaded'])}")
+    if budget_ms is not None:
+        for command, result in results['commands'].items():
+            if result['median_ms'] > budget_ms:
+                violations.append(f"{command}: {result['median_ms']:.1f} ms > {budget_ms} ms")
+    return violations
+
+
+def print_report(results):
+    print(f"{'interpreter start-up':40} {results['interpreter']['median_ms']:8.1f} ms")
+    for module, result in results['imports'].items():
+        loaded = ', '.join(result['heavy_modules_loaded']) or '-'
+        print(f"{'import ' + module:40} {result['median_ms']:8.1f} ms   heavy: {loaded}")
+    for command, result in results['commands'].items():
+        print(f"{command:40} {result['median_ms']:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start benchmark for the CLI")
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement (default: 5)')
+    parser.add_argument('--budget-ms', type=float, help='Maximum median time to first output per command')
+    parser.add_argument('--import-budget-ms', type=float, help='Maximum median import time per module')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    violations = check_budgets(results, args.budget_ms, args.import_budget_ms)
+
+    if args.json:
+        results['budget_violations'] = violations
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+        for violation in violations:
+            print(f"BUDGET EXCEEDED: {violation}")
+
+    sys.exit(1 if violations else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Regression check between two benchmark result files.
+
+Works on the JSON written by any of the benchmarks: every number whose key
+ends in `_ms` is compared with the same entry of the baseline. An entry
+regressed when it is more than --threshold slower (relative) and more than
+--min-delta-ms slower (absolute), so that sub-millisecond noise is ignored.
+The script exits with status 1 when anything regressed:
+
+    python benchmarks/bench_operations.py --output baseline.json
+    ... change the code ...
+    python benchmarks/bench_operations.py --output current.json
+    python benchmarks/compare.py baseline.json current.json --threshold 0.2
+"""
+import argparse
+import json
+import sys
+
+
+def timings(results, prefix=''):
+    """
+    Flatten the timings of a result file.
+
+    Args:
+        results (dict): Parsed benchmark results.
+        prefix (str): Path of results within the file.
+
+    Returns:
+        dict: 'path/to/entry_ms' -> milliseconds.
+    """
+    flat = {}
+    for key, value in results.items():
+        path = f'{prefix}/{key}' if prefix else str(key)
+        if isinstance(value, dict):
+            flat.update(timings(value, path))
+        elif str(key).endswith('_ms') and isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+def compare(baseline, current, threshold=0.2, min_delta_ms=1.0):
+    """
+    Compare benchmark results with a baseline.
+
+    Args:
+        baseline (dict): Baseline results.
+        current (dict): New results.
+        threshold (float): Relative slowdown that counts as a regression.
+        min_delta_ms (float): Absolute slowdown below which an entry never
+            counts as a regression.
+
+    Returns:
+        list: One dict per timing present in both, with 'name',
+        'baseline_ms', 'current_ms', 'change' (relative) and 'regressed'.
+    """
+    old = timings(baseline)
+    new = timings(current)
+    rows = []
+    for name in sorted(old.keys() & new.keys()):
+        before, after = old[name], new[name]
+        change = (after - before) / before if before else 0.0
+        rows.append({
+            'name': name,
+            'baseline_ms': before,
+            'current_ms': after,
+            'change': change,
+            'regressed': change > threshold and after - before > min_delta_ms,
+        })
+    return rows
+
+
+def print_comparison(rows):
+    width = max([len(row['name']) for row in rows] + [10])
+    print(f"{'entry':{width}} {'baseline':>12} {'current':>12} {'change':>8}")
+    for row in rows:
+        flag = '  REGRESSED' if row['regressed'] else ''
+        print(f"{row['name']:{width}} {row['baseline_ms']:9.2f} ms {row['current_ms']:9.2f} ms "
+              f"{row['change']:+8.1%}{flag}")
+
+
+def load(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flag benchmark regressions against a baseline")
+    parser.add_argument('baseline', help='Baseline results (JSON)')
+    parser.add_argument('current', help='New results (JSON)')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Relative slowdown that fails (default: 0.2)')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0,
+                        help='Ignore slowdowns smaller than this (default: 1.0)')
+    parser.add_argument('--json', action='store_true', help='Print the comparison as JSON')
+    args = parser.parse_args()
+
+    rows = compare(load(args.baseline), load(args.current), args.threshold, args.min_delta_ms)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print_comparison(rows)
+    sys.exit(1 if any(row['regressed'] for row in rows) else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+"""
+Synthetic repository generator for the ai-feature-branch-toolbox benchmarks.
+
+Builds a repository of a given shape in one `git fast-import` run, so even
+large repositories take seconds:
+
+- `main` starts with --files text files spread over --depth levels of
+  directories, followed by --commits commits that each change about 1% of
+  the files;
+- --branches branches named `feature/branch-<n>` fork from the commit before
+  the tip of `main`. Each adds a file and changes a few others. Every
+  --conflict-every'th branch also edits the line the last commit on `main`
+  changed, so it conflicts with `main`.
+
+The same arguments always produce the same objects, so results on the same
+machine are comparable.
+
+    python benchmarks/synthetic_repo.py /tmp/big-repo --files 20000 --depth 4 --branches 50
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import time
+
+BRANCH_PREFIX = 'feature/'
+FEATURE_PREFIX = BRANCH_PREFIX + 'branch-'
+IGNORED = '.ai_feature_branch_toolbox/\nconfig.yaml\n*.log\n'
+AUTHOR = 'Benchmark <benchmark@example.com>'
+EPOCH = 1700000000
+
+
+def file_paths(files, depth):
+    """
+    Args:
+        files (int): Number of files.
+        depth (int): Directory levels above each file.
+
+    Returns:
+        list: Relative file paths, with about the same number of entries in
+        every directory.
+    """
+    fanout = max(2, round(files ** (1 / (depth + 1)))) if depth else 1
+    paths = []
+    for index in range(files):
+        directories = [f'dir{(index // fanout ** (level + 1)) % fanout}' for level in reversed(range(depth))]
+        paths.append('/'.join(directories + [f'file{index}.txt']))
+    return paths
+
+
+class _Stream:
+    """
+    Writes a git fast-import stream.
+    """
+
+    def __init__(self, output):
+        self.output = output
+        self.marks = 0
+        self.time = EPOCH
+
+    def data(self, content):
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        self.output.write(b'data %d\n' % len(content))
+        self.output.write(content)
+        self.output.write(b'\n')
+
+    def commit(self, ref, message, changes, parent=None):
+        """
+        Args:
+            ref (str): The branch ref the commit goes on.
+            message (str): The commit message.
+            changes (dict): Path -> new file contents.
+            parent (int): Mark of the parent commit, if not the tip of ref.
+
+        Returns:
+            int: The mark of the commit.
+        """
+        self.marks += 1
+        self.time += 60
+        self.output.write(f'commit {ref}\nmark :{self.marks}\n'.encode('utf-8'))
+        self.output.write(f'author {AUTHOR} {self.time} +0000\ncommitter {AUTHOR} {self.time} +0000\n'.encode('utf-8'))
+        self.data(message)
+        if parent is not None:
+            self.output.write(f'from :{parent}\n'.encode('utf-8'))
+        for path, content in changes.items():
+            self.output.write(f'M 100644 inline {path}\n'.encode('utf-8'))
+            self.data(content)
+        return self.marks
+
+
+def generate_repo(path, files=2000, depth=3, commits=20, branches=10, lines=20, conflict_every=4, seed=0):
+    """
+    Create a synthetic repository.
+
+    Args:
+        path (str): Directory for the repository. Created if missing; must
+            not already be a repository.
+        files (int): Files on the main branch.
+        depth (int): Directory levels above each file.
+        commits (int): Commits on the main branch, including the first.
+        branches (int): Feature branches.
+        lines (int): Lines per file.
+        conflict_every (int): Every n-th feature branch conflicts with the
+            main branch; 0 for none.
+        seed (int): Seed for the file contents and the changes.
+
+    Returns:
+        dict: The parameters, the feature branch names and the elapsed time.
+    """
+    if files < 1 or commits < 1 or lines < 1:
+        raise ValueError("A synthetic repository needs at least one file, commit and line")
+    start = time.perf_counter()
+    rng = random.Random(seed)
+    paths = file_paths(files, depth)
+    contents = [[f'{paths[index]} line {line} {rng.getrandbits(64):016x}' for line in range(lines)]
+                for index in range(files)]
+
+    def change(index, line, label, edited=None):
+        # Branches record their edits in edited instead of changing contents
+        file_lines = contents[index] if edited is None else edited.setdefault(index, list(contents[index]))
+        file_lines[line] = f'{paths[index]} line {line} {label} {rng.getrandbits(64):016x}'
+        return paths[index], '\n'.join(file_lines) + '\n'
+
+    os.makedirs(path, exist_ok=True)
+    subprocess.run(['git', 'init', '-q', path], check=True)
+    subprocess.run(['git', '-C', path, 'symbolic-ref', 'HEAD', 'refs/heads/main'], check=True)
+    process = subprocess.Popen(['git', '-C', path, 'fast-import', '--quiet'], stdin=subprocess.PIPE)
+    try:
+        stream = _Stream(process.stdin)
+        initial = {paths[index]: '\n'.join(contents[index]) + '\n' for index in range(files)}
+        initial['.gitignore'] = IGNORED
+        marks = [stream.commit('refs/heads/main', 'Initial commit\n', initial)]
+
+        changed_per_commit = max(1, files // 100)
+        for number in range(1, commits - 1):
+            changes = dict(change(rng.randrange(files), rng.randrange(lines), f'main{number}')
+                           for _ in range(changed_per_commit))
+            marks.append(stream.commit('refs/heads/main', f'Change {number}\n', changes))
+        # Feature branches fork before the last commit, which changes the
+        # line that conflicting branches change as well
+        fork = marks[-1]
+        fork_first_file = list(contents[0])
+        if commits > 1:
+            marks.append(stream.commit('refs/heads/main', 'Change the conflict line\n', dict([change(0, 0, 'main')])))
+            fork = marks[-2]
+
+        names = []
+        for number in range(branches):
+            edited = {0: list(fork_first_file)}
+            changes = {f'features/branch-{number}.txt': f'Feature {number}\n'}
+            for _ in range(3):
+                index = rng.randrange(1, files) if files > 1 else 0
+                changes.update([change(index, rng.randrange(1, lines) if lines > 1 else 0, f'feature{number}', edited)])
+            if conflict_every and number % conflict_every == conflict_every - 1:
+                changes.update([change(0, 0, f'feature{number}', edited)])
+            name = f'{FEATURE_PREFIX}{number}'
+            stream.commit(f'refs/heads/{name}', f'Work on feature {number}\n', changes, parent=fork)
+            names.append(name)
+        process.stdin.close()
+    finally:
+        if process.wait() != 0:
+            raise RuntimeError(f"git fast-import failed with status {process.returncode}")
+    subprocess.run(['git', '-C', path, 'reset', '-q', '--hard', 'main'], check=True)
+
+    return {
+        'files': files,
+        'depth': depth,
+        'commits': commits,
+        'branches': names,
+        'lines': lines,
+        'seed': seed,
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 3),
+    }
+
+
+def add_arguments(parser):
+    """
+    Add the repository shape options to an argument parser.
+    """
+    parser.add_argument('--files', type=int, default=2000, help='Files on the main branch (default: 2000)')
+    parser.add_argument('--depth', type=int, default=3, help='Directory levels above each file (default: 3)')
+    parser.add_argument('--commits', type=int, default=20, help='Commits on the main branch (default: 20)')
+    parser.add_argument('--branches', type=int, default=10, help='Feature branches (default: 10)')
+    parser.add_argument('--lines', type=int, default=20, help='Lines per file (default: 20)')
+    parser.add_argument('--conflict-every', type=int, default=4,
+                        help='Every n-th feature branch conflicts with main, 0 for none (default: 4)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for contents and changes (default: 0)')
+
+
+def shape(args):
+    """
+    Returns:
+        dict: The generate_repo keyword arguments given on the command line.
+    """
+    return {
+        'files': args.files,
+        'depth': args.depth,
+        'commits': args.commits,
+        'branches': args.branches,
+        'lines': args.lines,
+        'conflict_every': args.conflict_every,
+        'seed': args.seed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic repository for benchmarks")
+    parser.add_argument('path', help='Directory for the new repository')
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    if os.path.exists(os.path.join(args.path, '.git')):
+        sys.exit(f"{args.path} is already a repository")
+    result = generate_repo(args.path, **shape(args))
+    print(f"Generated {result['files']} files, {result['commits']} commits and "
+          f"{len(result['branches'])} feature branches in {result['elapsed_ms'] / 1000:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
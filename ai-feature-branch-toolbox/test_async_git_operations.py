@@ -0,0 +1,171 @@
+import asyncio
+import os
+import threading
+import unittest
+from unittest import mock
+
+from git import Repo
+
+from ai_feature_branch_toolbox import maintenance
+from ai_feature_branch_toolbox.async_git_operations import AsyncGitOperations, _repo_lock
+
+from test_helpers import FakeConfigManager, FakePersistentConfig, make_temp_dir, set_identity
+
+
+class TestAsyncGitOperations(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.temp_dir = make_temp_dir(self)
+        self.config_manager = FakeConfigManager(persistent_config=FakePersistentConfig())
+        self.git_ops = AsyncGitOperations(self.config_manager)
+        self.assertTrue(await self.git_ops.initialize_repo(self.temp_dir))
+        with Repo(self.temp_dir) as repo:
+            set_identity(repo)
+
+    def write(self, name, content, root=None):
+        with open(os.path.join(root or self.temp_dir, name), 'w') as f:
+            f.write(content)
+
+    async def test_initialize_creates_initial_commit(self):
+        self.assertEqual(self.config_manager.values['repository.path'], self.temp_dir)
+        self.assertEqual(len(await self.git_ops.list_branches()), 1)
+        self.assertTrue((await self.git_ops.status()).clean)
+        self.assertFalse(await AsyncGitOperations(FakeConfigManager()).initialize_repo(os.path.join(self.temp_dir, 'missing')))
+
+    async def test_branch_commit_and_merge(self):
+        main = (await self.git_ops.ref_index()).current_branch()
+        self.assertTrue(await self.git_ops.create_feature_branch('feature/a'))
+        self.write('a.txt', 'a\n')
+        self.assertTrue(await self.git_ops.commit_changes('Add a'))
+        self.assertFalse(await self.git_ops.commit_changes('Nothing to commit'))
+
+        self.assertFalse(await self.git_ops.switch_branch('feature/missing'))
+        self.assertTrue(await self.git_ops.merge_feature_branch('feature/a', main, dry_run=True))
+        self.assertEqual((await self.git_ops.ref_index()).current_branch(), 'feature/a')
+        self.assertTrue(await self.git_ops.merge_feature_branch('feature/a', main))
+        self.assertEqual(self.config_manager.values['current_branch'], main)
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, 'a.txt')))
+
+    async def test_commit_runs_hooks(self):
+        hook = os.path.join(self.temp_dir, '.git', 'hooks', 'pre-commit')
+        with open(hook, 'w') as f:
+            f.write('#!/bin/sh\nexit 1\n')
+        os.chmod(hook, 0o755)
+        self.write('a.txt', 'a\n')
+        self.assertFalse(await self.git_ops.commit_changes('Rejected by the hook'))
+        os.remove(hook)
+        self.assertTrue(await self.git_ops.commit_changes('Add a'))
+
+    async def test_merge_conflict(self):
+        main = (await self.git_ops.ref_index()).current_branch()
+        await self.git_ops.create_feature_branch('feature/a')
+        self.write('README.md', 'feature\n')
+        await self.git_ops.commit_changes('Change on feature')
+        await self.git_ops.switch_branch(main)
+        self.write('README.md', 'main\n')
+        await self.git_ops.commit_changes('Change on main')
+
+        self.assertEqual(await self.git_ops.merge_feature_branch('feature/a', main, in_memory=True), 'CONFLICT')
+        self.assertEqual(await self.git_ops.merge_feature_branch('feature/a', main), 'CONFLICT')
+        self.assertEqual([c.path for c in await self.git_ops.conflicts()], ['README.md'])
+        self.assertEqual(await self.git_ops.resolve_conflicts(), 'CONFLICT')
+
+    async def test_in_memory_merge(self):
+        main = (await self.git_ops.ref_index()).current_branch()
+        await self.git_ops.create_feature_branch('feature/a')
+        self.write('a.txt', 'a\n')
+        await self.git_ops.commit_changes('Add a')
+        await self.git_ops.switch_branch(main)
+        self.write('b.txt', 'b\n')
+        await self.git_ops.commit_changes('Add b')
+        await self.git_ops.switch_branch('feature/a')
+        self.assertTrue(await self.git_ops.merge_feature_branch('feature/a', main, in_memory=True))
+        with Repo(self.temp_dir) as repo:
+            merge = repo.heads[main].commit
+            self.assertEqual(len(merge.parents), 2)
+            self.assertEqual(repo.active_branch.name, 'feature/a')
+        # Merging again records nothing
+        self.assertTrue(await self.git_ops.merge_feature_branch('feature/a', main, in_memory=True))
+        with Repo(self.temp_dir) as repo:
+            self.assertEqual(repo.heads[main].commit, merge)
+
+    async def test_in_memory_merge_into_branch_of_linked_worktree(self):
+        main = (await self.git_ops.ref_index()).current_branch()
+        await self.git_ops.create_feature_branch('feature/a')
+        self.write('a.txt', 'a\n')
+        await self.git_ops.commit_changes('Add a')
+        linked = make_temp_dir(self)
+        with Repo(self.temp_dir) as repo:
+            repo.git.worktree('add', '--quiet', os.path.join(linked, 'main'), main)
+        self.assertTrue(await self.git_ops.merge_feature_branch('feature/a', main, in_memory=True))
+        self.assertTrue(os.path.exists(os.path.join(linked, 'main', 'a.txt')))
+        with Repo(os.path.join(linked, 'main')) as repo:
+            self.assertFalse(repo.is_dirty(untracked_files=True))
+
+    async def test_in_memory_merge_fast_forwards(self):
+        main = (await self.git_ops.ref_index()).current_branch()
+        await self.git_ops.create_feature_branch('feature/a')
+        self.write('a.txt', 'a\n')
+        await self.git_ops.commit_changes('Add a')
+        self.assertTrue(await self.git_ops.merge_feature_branch('feature/a', main, in_memory=True))
+        with Repo(self.temp_dir) as repo:
+            self.assertEqual(repo.heads[main].commit, repo.heads['feature/a'].commit)
+
+    async def test_runs_maintenance_in_background_after_every_n_commits(self):
+        self.config_manager.values['maintenance.auto_commits'] = 2
+        with mock.patch.object(maintenance, 'start_background') as start_background:
+            for index in range(5):
+                self.write('change.txt', f'change {index}\n')
+                self.assertTrue(await self.git_ops.commit_changes(f'Change {index}'))
+        self.assertEqual(start_background.call_count, 2)
+        self.assertEqual(os.path.realpath(start_background.call_args[0][0].working_tree_dir), self.git_ops.path)
+
+    async def test_state_is_written_off_the_event_loop(self):
+        main = (await self.git_ops.ref_index()).current_branch()
+        threads = []
+
+        def record(*args):
+            threads.append(threading.current_thread())
+
+        remote_dir = make_temp_dir(self)
+        Repo.init(remote_dir, bare=True).close()
+        with mock.patch.object(self.config_manager, 'set_value', side_effect=record), \
+                mock.patch.object(self.config_manager.persistent_config, 'update', side_effect=record):
+            self.assertTrue(await self.git_ops.initialize_repo(self.temp_dir))
+            self.assertTrue(await self.git_ops.create_feature_branch('feature/a'))
+            self.assertTrue(await self.git_ops.switch_branch(main))
+            self.assertTrue(await self.git_ops.add_remote('origin', remote_dir))
+        self.assertEqual(len(threads), 3)
+        self.assertNotIn(threading.current_thread(), threads)
+
+    async def test_concurrent_calls_on_one_repo_are_serialized(self):
+        for index in range(8):
+            self.write(f'{index}.txt', f'{index}\n')
+        results = await asyncio.gather(*(self.git_ops.commit_changes(f'Commit {index}') for index in range(8)))
+        # The first commit takes every change, the others find nothing left
+        self.assertEqual(sorted(results), [False] * 7 + [True])
+        self.assertTrue((await self.git_ops.status()).clean)
+
+    async def test_repositories_run_in_parallel(self):
+        other_dir = make_temp_dir(self)
+        other = AsyncGitOperations(FakeConfigManager())
+        await other.initialize_repo(other_dir)
+        self.write('a.txt', 'a\n')
+        self.write('b.txt', 'b\n', other_dir)
+        results = await asyncio.gather(self.git_ops.commit_changes('In first'), other.commit_changes('In second'))
+        self.assertEqual(results, [True, True])
+        self.assertIsNot(_repo_lock(self.git_ops.path), _repo_lock(other.path))
+
+    async def test_add_remote(self):
+        remote_dir = make_temp_dir(self)
+        Repo.init(remote_dir, bare=True).close()
+        self.assertTrue(await self.git_ops.add_remote('origin', remote_dir))
+        self.assertEqual(self.config_manager.persistent_config.get('remote_verification')['origin']['url'], remote_dir)
+        self.assertTrue(await self.git_ops.add_remote('origin', remote_dir))
+        # Only checked, never fetched
+        with Repo(self.temp_dir) as repo:
+            self.assertEqual(repo.git.for_each_ref('refs/remotes/'), '')
+        self.assertTrue(await self.git_ops.push_changes('origin'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import yaml
+
+from ai_feature_branch_toolbox.config_manager import ConfigManager
+from ai_feature_branch_toolbox.config_template import DEFAULT_CONFIG
+from ai_feature_branch_toolbox.git_operations import GitOperations
+
+
+class TestRunBatch(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.repo_path = os.path.join(self.temp_dir, 'repo')
+        os.makedirs(self.repo_path)
+        config_path = os.path.join(self.temp_dir, 'config.yaml')
+        with open(config_path, 'w') as f:
+            yaml.dump(DEFAULT_CONFIG, f)
+        self.git_ops = GitOperations(ConfigManager(config_path))
+        self.git_ops.initialize_repo(self.repo_path)
+        self.main_branch = self.git_ops.repo.active_branch.name
+
+    def tearDown(self):
+        self.git_ops.close_repo()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def write_file(self, name, content):
+        with open(os.path.join(self.repo_path, name), 'w') as f:
+            f.write(content)
+
+    def test_branch_commit_merge_sequence(self):
+        def commands():
+            yield {'command': 'create-branch', 'branch_name': 'feature/batch', 'id': 'create'}
+            self.write_file('one.txt', 'one')
+            yield json.dumps({'command': 'commit', 'message': 'First batch commit'})
+            self.write_file('two.txt', 'two')
+            yield {'command': 'commit', 'message': 'Second batch commit'}
+            yield {'command': 'merge', 'feature_branch': 'feature/batch', 'main_branch': self.main_branch}
+
+        results = list(self.git_ops.run_batch(commands()))
+
+        self.assertEqual([r['index'] for r in results], [0, 1, 2, 3])
+        self.assertTrue(all(r['ok'] for r in results), results)
+        self.assertEqual(results[0]['id'], 'create')
+        self.assertEqual(self.git_ops.repo.active_branch.name, self.main_branch)
+        self.assertTrue(os.path.exists(os.path.join(self.repo_path, 'two.txt')))
+
+    def test_errors_are_reported_per_command(self):
+        lines = [
+            '{"command": "list-branches"}',
+            '',
+            'not json',
+            '{"command": "unknown"}',
+            '{"command": "commit", "msg": "typo"}',
+            '{"command": "switch-branch", "branch_name": "feature/missing"}',
+        ]
+        results = list(self.git_ops.run_batch(lines))
+
+        self.assertEqual(len(results), 5)
+        self.assertTrue(results[0]['ok'])
+        self.assertEqual(results[0]['result'], [self.main_branch])
+        self.assertIn('error', results[1])
+        self.assertIn('Unknown batch command', results[2]['error'])
+        self.assertIn('Unexpected arguments', results[3]['error'])
+        self.assertFalse(results[4]['ok'])
+        self.assertIs(results[4]['result'], False)
+
+    def test_stop_on_error(self):
+        commands = [
+            {'command': 'switch-branch', 'branch_name': 'feature/missing'},
+            {'command': 'list-branches'},
+        ]
+        results = list(self.git_ops.run_batch(commands, stop_on_error=True))
+        self.assertEqual(len(results), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
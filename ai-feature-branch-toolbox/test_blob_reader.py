@@ -0,0 +1,104 @@
+import os
+import unittest
+
+from ai_feature_branch_toolbox.blob_reader import BlobCache, BlobReader, BlobStream
+from ai_feature_branch_toolbox.git_operations import GitOperations
+
+from test_helpers import FakeConfigManager, make_temp_repo
+
+
+class TestBlobReader(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir, self.repo = make_temp_repo(self)
+        self.write('shared.txt', b'same on both branches\n')
+        self.write('changed.txt', b'main\n')
+        self.write('dir with space/file.txt', b'nested\n')
+        self.write('large.bin', os.urandom(300000))
+        self.repo.index.add(['shared.txt', 'changed.txt', 'dir with space/file.txt', 'large.bin'])
+        self.repo.index.commit('Initial commit')
+        self.repo.create_head('feature/a').checkout()
+        self.write('changed.txt', b'feature\n')
+        self.repo.index.add(['changed.txt'])
+        self.repo.index.commit('Change on feature')
+        self.repo.heads.main.checkout()
+        self.reader = BlobReader(self.repo.git_dir, stream_threshold=100000)
+
+    def tearDown(self):
+        self.reader.close()
+
+    def write(self, name, content):
+        path = os.path.join(self.temp_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(content)
+
+    def test_read_files(self):
+        paths = ['changed.txt', 'shared.txt', 'dir with space/file.txt', 'missing.txt', 'dir with space', 'changed.txt']
+        files = self.reader.read_files('feature/a', paths)
+        self.assertEqual(files, {
+            'changed.txt': b'feature\n',
+            'shared.txt': b'same on both branches\n',
+            'dir with space/file.txt': b'nested\n',
+            'missing.txt': None,
+            'dir with space': None,
+        })
+        self.assertEqual(self.reader.read_files('main', ['changed.txt'])['changed.txt'], b'main\n')
+
+    def test_unchanged_blobs_come_from_cache(self):
+        self.reader.read_files('main', ['shared.txt', 'changed.txt'])
+        cached = len(self.reader.cache)
+        self.reader.read_files('feature/a', ['shared.txt', 'changed.txt'])
+        # Only the changed file is new
+        self.assertEqual(len(self.reader.cache), cached + 1)
+
+    def test_large_blobs_are_streamed(self):
+        with open(os.path.join(self.temp_dir, 'large.bin'), 'rb') as f:
+            expected = f.read()
+        for path, stream in self.reader.iter_files('main', ['large.bin', 'shared.txt']):
+            if path == 'large.bin':
+                self.assertIsInstance(stream, BlobStream)
+                self.assertEqual(stream.read(10), expected[:10])
+                # The rest is skipped when the next file is requested
+        self.assertEqual(self.reader.read_files('main', ['large.bin'])['large.bin'], expected)
+        self.assertEqual(len(self.reader.cache), 1)
+
+    def test_abandoned_iteration_restarts_processes(self):
+        files = self.reader.iter_files('main', ['large.bin', 'shared.txt'])
+        next(files)
+        files.close()
+        self.assertEqual(self.reader.read_files('main', ['shared.txt'])['shared.txt'], b'same on both branches\n')
+
+    def test_many_files_in_one_request(self):
+        names = [f'f{index}.txt' for index in range(500)]
+        for name in names:
+            self.write(name, name.encode() * 200)
+        self.repo.index.add(names)
+        self.repo.index.commit('Many files')
+        files = self.reader.read_files('main', names)
+        self.assertEqual(files['f499.txt'], b'f499.txt' * 200)
+
+    def test_unknown_revision(self):
+        with self.assertRaises(ValueError):
+            self.reader.read_files('no-such-branch', ['shared.txt'])
+
+    def test_cache_eviction(self):
+        cache = BlobCache(max_bytes=10)
+        cache.put('a', b'12345')
+        cache.put('b', b'12345')
+        cache.get('a')
+        cache.put('c', b'12345')
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        cache.put('d', b'12345678901')
+        self.assertNotIn('d', cache)
+
+    def test_git_operations_read_files(self):
+        git_ops = GitOperations(FakeConfigManager())
+        git_ops.repo = self.repo
+        self.assertEqual(git_ops.read_files('feature/a', ['changed.txt']), {'changed.txt': b'feature\n'})
+        self.assertIsNone(git_ops.read_files('no-such-branch', ['changed.txt']))
+        git_ops.close_repo()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import yaml
+
+from ai_feature_branch_toolbox import config_manager as config_manager_module
+from ai_feature_branch_toolbox.config_manager import ConfigManager
+from ai_feature_branch_toolbox.config_template import DEFAULT_CONFIG
+
+
+class TestConfigCache(unittest.TestCase):
+    def setUp(self):
+        # Persistent state and the cache live relative to the working directory
+        self.cwd = os.getcwd()
+        self.temp_dir = tempfile.mkdtemp()
+        os.chdir(self.temp_dir)
+        self.config_path = os.path.join(self.temp_dir, 'config.yaml')
+        self.write_config(DEFAULT_CONFIG)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def write_config(self, config):
+        with open(self.config_path, 'w') as f:
+            yaml.dump(config, f)
+
+    def load_counting(self, **kwargs):
+        with mock.patch.object(config_manager_module.yaml, 'load', wraps=yaml.load) as load, \
+                mock.patch.object(config_manager_module.ConfigValidator, 'validate_config') as validate:
+            config_manager = ConfigManager(self.config_path, **kwargs)
+        return config_manager, load.call_count, validate.call_count
+
+    def test_warm_start_skips_parsing_and_validation(self):
+        cold, parses, _ = self.load_counting()
+        self.assertEqual(parses, 1)
+
+        warm, parses, validations = self.load_counting()
+        self.assertEqual((parses, validations), (0, 0))
+        self.assertEqual(warm.get_config(), cold.get_config())
+
+    def test_config_change_invalidates_cache(self):
+        ConfigManager(self.config_path)
+        config = {section: dict(values) for section, values in DEFAULT_CONFIG.items()}
+        config['branches']['prefix'] = 'agent/'
+        self.write_config(config)
+
+        config_manager, parses, _ = self.load_counting()
+        self.assertEqual(parses, 1)
+        self.assertEqual(config_manager.get_value('branches.prefix'), 'agent/')
+
+    def test_saved_state_is_cached(self):
+        ConfigManager(self.config_path).set_value('current_branch', 'feature/cached')
+
+        config_manager, parses, _ = self.load_counting()
+        self.assertEqual(parses, 0)
+        self.assertEqual(config_manager.get_value('current_branch'), 'feature/cached')
+
+    def test_invalid_config_is_never_cached(self):
+        config = {section: dict(values) for section, values in DEFAULT_CONFIG.items()}
+        config['merge']['strategy'] = 'invalid'
+        self.write_config(config)
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                ConfigManager(self.config_path)
+
+    def test_cache_can_be_disabled(self):
+        ConfigManager(self.config_path)
+        _, parses, _ = self.load_counting(use_cache=False)
+        self.assertEqual(parses, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import copy
+import os
+import shutil
+import tempfile
+import unittest
+
+import yaml
+
+from ai_feature_branch_toolbox.config_manager import ConfigManager
+from ai_feature_branch_toolbox.config_template import DEFAULT_CONFIG
+
+
+class TestConfigIndex(unittest.TestCase):
+    def setUp(self):
+        # Persistent state lives relative to the working directory
+        self.cwd = os.getcwd()
+        self.temp_dir = tempfile.mkdtemp()
+        os.chdir(self.temp_dir)
+        self.config_path = os.path.join(self.temp_dir, 'config.yaml')
+        self.write_config(DEFAULT_CONFIG)
+        self.config_manager = ConfigManager(self.config_path)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def write_config(self, config):
+        with open(self.config_path, 'w') as f:
+            yaml.dump(config, f)
+
+    def read_yaml(self):
+        with open(self.config_path) as f:
+            return yaml.safe_load(f)
+
+    def test_dotted_set_is_nested(self):
+        self.config_manager.set_value('repository.path', '/new/repo')
+        self.assertEqual(self.config_manager.get_value('repository.path'), '/new/repo')
+        self.assertEqual(self.config_manager.get_value('repository')['path'], '/new/repo')
+
+        saved = self.read_yaml()
+        self.assertNotIn('repository.path', saved)
+        self.assertEqual(saved['repository']['path'], '/new/repo')
+        self.assertEqual(ConfigManager(self.config_path).get_value('repository.path'), '/new/repo')
+
+    def test_new_sections_are_created(self):
+        self.config_manager.set_value('agents.reviewer.model', 'large')
+        self.assertEqual(self.config_manager.get_value('agents'), {'reviewer': {'model': 'large'}})
+        self.assertEqual(self.config_manager.get_value('agents.reviewer.model'), 'large')
+
+    def test_replacing_a_section_updates_its_paths(self):
+        self.config_manager.set_value('ai_agent', {'model': 'small'})
+        self.assertEqual(self.config_manager.get_value('ai_agent.model'), 'small')
+        self.assertIsNone(self.config_manager.get_value('ai_agent.temperature'))
+
+        self.config_manager.set_value('ai_agent.model.name', 'tiny')
+        self.assertEqual(self.config_manager.get_value('ai_agent.model'), {'name': 'tiny'})
+
+    def test_stored_values_are_copied(self):
+        section = {'model': 'small', 'temperature': 0.1}
+        self.config_manager.set_value('ai_agent', section)
+        section['model'] = 'changed'
+        self.assertEqual(self.config_manager.get_value('ai_agent.model'), 'small')
+
+    def test_get_many_and_set_many(self):
+        self.config_manager.set_many({'branches.prefix': 'agent/', 'merge.squash': True, 'current_branch': 'main'})
+        self.assertEqual(
+            self.config_manager.get_many(['branches.prefix', 'merge.squash', 'current_branch', 'missing.key'], 'n/a'),
+            {'branches.prefix': 'agent/', 'merge.squash': True, 'current_branch': 'main', 'missing.key': 'n/a'},
+        )
+
+    def test_rollback_restores_index(self):
+        with self.assertRaises(RuntimeError):
+            with self.config_manager.transaction():
+                self.config_manager.set_value('branches.prefix', 'agent/')
+                raise RuntimeError("abort")
+        self.assertEqual(self.config_manager.get_value('branches.prefix'), 'feature/')
+
+    def test_literal_dotted_keys_are_folded_on_load(self):
+        config = copy.deepcopy(DEFAULT_CONFIG)
+        config['repository.path'] = '/legacy/repo'
+        self.write_config(config)
+
+        config_manager = ConfigManager(self.config_path, use_cache=False)
+        self.assertEqual(config_manager.get_value('repository.path'), '/legacy/repo')
+        self.assertNotIn('repository.path', config_manager.get_config())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import yaml
+
+from ai_feature_branch_toolbox import config_manager as config_manager_module
+from ai_feature_branch_toolbox.config_manager import ConfigManager
+from ai_feature_branch_toolbox.config_template import DEFAULT_CONFIG
+
+
+class TestConfigTransactions(unittest.TestCase):
+    def setUp(self):
+        # Persistent state lives relative to the working directory
+        self.cwd = os.getcwd()
+        self.temp_dir = tempfile.mkdtemp()
+        os.chdir(self.temp_dir)
+        self.config_path = os.path.join(self.temp_dir, 'config.yaml')
+        with open(self.config_path, 'w') as f:
+            yaml.dump(DEFAULT_CONFIG, f)
+        self.config_manager = ConfigManager(self.config_path)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def read_yaml(self):
+        with open(self.config_path) as f:
+            return yaml.safe_load(f)
+
+    def read_persistent(self):
+        with open(self.config_manager.persistent_config.config_file) as f:
+            return json.load(f)
+
+    def test_transaction_writes_once_on_exit(self):
+        with mock.patch.object(config_manager_module, 'write_if_changed',
+                               wraps=config_manager_module.write_if_changed) as write:
+            with self.config_manager.transaction():
+                self.config_manager.set_value('current_branch', 'feature/a')
+                self.config_manager.set_value('current_branch', 'feature/b')
+                self.config_manager.set_value('last_operation', 'commit')
+                self.assertNotIn('current_branch', self.read_yaml())
+            self.assertEqual(write.call_count, 1)
+
+        self.assertEqual(self.read_yaml()['current_branch'], 'feature/b')
+        self.assertEqual(self.read_persistent()['last_operation'], 'commit')
+
+    def test_set_many(self):
+        self.config_manager.set_many({'current_branch': 'feature/many', 'last_operation': 'merge'})
+        self.assertEqual(self.read_yaml()['current_branch'], 'feature/many')
+        self.assertEqual(self.read_persistent()['last_operation'], 'merge')
+
+    def test_unchanged_value_skips_write(self):
+        self.config_manager.set_value('current_branch', 'feature/same')
+        mtimes = (os.stat(self.config_path).st_mtime_ns,
+                  os.stat(self.config_manager.persistent_config.config_file).st_mtime_ns)
+
+        self.config_manager.set_value('current_branch', 'feature/same')
+        self.config_manager._save_config()
+
+        self.assertEqual(mtimes, (os.stat(self.config_path).st_mtime_ns,
+                                  os.stat(self.config_manager.persistent_config.config_file).st_mtime_ns))
+
+    def test_transaction_rolls_back_on_error(self):
+        with self.assertRaises(RuntimeError):
+            with self.config_manager.transaction():
+                self.config_manager.set_value('current_branch', 'feature/lost')
+                raise RuntimeError("boom")
+
+        self.assertIsNone(self.config_manager.get_value('current_branch'))
+        self.assertNotIn('current_branch', self.read_yaml())
+
+    def test_rollback_restores_changed_and_new_sections(self):
+        path = self.config_manager.get_value('repository.path')
+        with self.assertRaises(RuntimeError):
+            with self.config_manager.transaction():
+                self.config_manager.set_value('repository.path', '/lost')
+                self.config_manager.set_value('new_section.key', 'lost')
+                raise RuntimeError("boom")
+
+        self.assertEqual(self.config_manager.get_value('repository.path'), path)
+        self.assertIsNone(self.config_manager.get_value('new_section'))
+        self.assertIsNone(self.config_manager.get_value('new_section.key'))
+        self.config_manager.set_value('current_branch', 'feature/after')
+        self.assertEqual(self.read_yaml(), dict(DEFAULT_CONFIG, current_branch='feature/after'))
+
+    def test_set_value_updates_only_changed_keys(self):
+        persistent_config = self.config_manager.persistent_config
+        with mock.patch.object(persistent_config, 'save') as save, \
+                mock.patch.object(persistent_config, 'update', wraps=persistent_config.update) as update:
+            with self.config_manager.transaction():
+                self.config_manager.set_value('current_branch', 'feature/a')
+                self.config_manager.set_value('repository.path', '/new/repo')
+        save.assert_not_called()
+        self.assertEqual([call.args[0] for call in update.call_args_list], ['current_branch', 'repository'])
+        self.assertEqual(self.read_persistent()['repository']['path'], '/new/repo')
+
+    def test_nested_transactions_flush_at_outermost(self):
+        with self.config_manager.transaction():
+            with self.config_manager.transaction():
+                self.config_manager.set_value('current_branch', 'feature/nested')
+            self.assertNotIn('current_branch', self.read_yaml())
+        self.assertEqual(self.read_yaml()['current_branch'], 'feature/nested')
+
+    def test_no_temporary_files_left_behind(self):
+        self.config_manager.set_value('current_branch', 'feature/clean')
+        leftovers = [name for name in os.listdir(self.temp_dir) if name.endswith('.tmp')]
+        leftovers += [name for name in os.listdir(self.config_manager.persistent_config.config_dir)
+                      if name.endswith('.tmp')]
+        self.assertEqual(leftovers, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import copy
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import yaml
+
+from ai_feature_branch_toolbox.config_manager import ConfigManager
+from ai_feature_branch_toolbox.config_template import DEFAULT_CONFIG
+from ai_feature_branch_toolbox.config_validator import (
+    CONFIG_SCHEMA, ConfigValidationError, ConfigValidator, compile_schema,
+)
+
+
+class TestConfigValidator(unittest.TestCase):
+    def setUp(self):
+        ConfigValidator.reset()
+        self.config = copy.deepcopy(DEFAULT_CONFIG)
+
+    def tearDown(self):
+        ConfigValidator.reset()
+
+    def count_checks(self):
+        checks = {section: mock.Mock(wraps=check) for section, check in ConfigValidator._checks.items()}
+        patcher = mock.patch.object(ConfigValidator, '_checks', checks)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return lambda: sorted(section for section, check in checks.items() if check.called)
+
+    def test_valid_config(self):
+        ConfigValidator.validate_config(self.config)
+
+    def test_every_error_is_reported(self):
+        del self.config['repository']['path']
+        self.config['commit']['author_email'] = 'invalid_email'
+        self.config['merge']['strategy'] = 'octopus'
+        self.config['ai_agent']['temperature'] = 1.5
+
+        with self.assertRaises(ConfigValidationError) as context:
+            ConfigValidator.validate_config(self.config)
+        self.assertEqual(context.exception.errors, [
+            "Repository path is required in 'repository'",
+            "Invalid email format for commit author_email in 'commit'",
+            "Invalid merge strategy. Must be 'merge' or 'rebase' in 'merge'",
+            "AI agent temperature must be a float between 0 and 1 in 'ai_agent'",
+        ])
+        self.assertIsInstance(context.exception, ValueError)
+
+    def test_missing_section_reports_its_fields(self):
+        del self.config['branches']
+        with self.assertRaises(ConfigValidationError) as context:
+            ConfigValidator.validate_config(self.config)
+        self.assertEqual(context.exception.errors, [
+            "Main branch name is required in 'branches'",
+            "Branch prefix is required in 'branches'",
+        ])
+
+    def test_optional_section_may_be_missing(self):
+        del self.config['persistence']
+        ConfigValidator.validate_config(self.config)
+
+    def test_only_changed_sections_are_checked(self):
+        checked = self.count_checks()
+        ConfigValidator.validate_config(self.config)
+        self.assertEqual(checked(), sorted(CONFIG_SCHEMA))
+
+        checked = self.count_checks()
+        self.config['current_branch'] = 'feature/a'
+        self.config['branches']['prefix'] = 'agent/'
+        ConfigValidator.validate_config(self.config)
+        self.assertEqual(checked(), ['branches'])
+
+    def test_failed_sections_are_checked_again(self):
+        self.config['logging']['level'] = 'LOUD'
+        for _ in range(2):
+            with self.assertRaises(ConfigValidationError):
+                ConfigValidator.validate_config(self.config)
+
+    def test_compile_schema(self):
+        checks = compile_schema({'ports': {'http': {'required': "Port is required", 'type': int,
+                                                    'invalid': "Port must be an integer"}}})
+        self.assertEqual(checks['ports']({'http': 80}), [])
+        self.assertEqual(checks['ports']({}), ["Port is required in 'ports'"])
+        self.assertEqual(checks['ports']({'http': '80'}), ["Port must be an integer in 'ports'"])
+        self.assertEqual(checks['ports'](['http']), ["Configuration section 'ports' must be a mapping"])
+
+    def test_set_value_does_not_revalidate_sections(self):
+        cwd = os.getcwd()
+        temp_dir = tempfile.mkdtemp()
+        os.chdir(temp_dir)
+        try:
+            with open('config.yaml', 'w') as f:
+                yaml.dump(DEFAULT_CONFIG, f)
+            config_manager = ConfigManager('config.yaml')
+            checked = self.count_checks()
+            config_manager.set_value('current_branch', 'feature/a')
+            self.assertEqual(checked(), [])
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
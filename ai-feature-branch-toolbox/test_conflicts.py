@@ -0,0 +1,84 @@
+import io
+import json
+import os
+import unittest
+from contextlib import redirect_stdout
+
+from ai_feature_branch_toolbox.cli import build_parser, merge_branch_command
+from ai_feature_branch_toolbox.conflicts import parse_unmerged, read_conflicts
+from ai_feature_branch_toolbox.git_operations import GitOperations
+
+from test_helpers import FakeConfigManager, make_temp_repo
+
+
+class TestParseUnmerged(unittest.TestCase):
+    def test_conflict_types(self):
+        output = '\0'.join([
+            '100644 aaaa 1\tboth modified.txt',
+            '100644 bbbb 2\tboth modified.txt',
+            '100755 cccc 3\tboth modified.txt',
+            '100644 dddd 2\tadded.txt',
+            '100644 eeee 3\tadded.txt',
+            '100644 ffff 1\tdeleted.txt',
+            '100644 1111 3\tdeleted.txt',
+            '',
+        ])
+        conflicts = parse_unmerged(output)
+
+        self.assertEqual([c.path for c in conflicts], ['both modified.txt', 'added.txt', 'deleted.txt'])
+        self.assertEqual([c.type for c in conflicts], ['both_modified', 'both_added', 'deleted_by_us'])
+        self.assertEqual(conflicts[0].to_dict(), {
+            'path': 'both modified.txt',
+            'type': 'both_modified',
+            'base': 'aaaa',
+            'ours': 'bbbb',
+            'theirs': 'cccc',
+            'modes': {'base': '100644', 'ours': '100644', 'theirs': '100755'},
+        })
+        self.assertIsNone(conflicts[1].base)
+        self.assertIsNone(conflicts[2].ours)
+
+    def test_no_conflicts(self):
+        self.assertEqual(parse_unmerged(''), [])
+
+
+class TestMergeConflicts(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir, self.repo = make_temp_repo(self)
+        self.commit('shared.txt', 'base\n', 'Initial commit')
+        self.repo.create_head('feature/conflict').checkout()
+        self.commit('shared.txt', 'feature\n', 'Feature change')
+        self.repo.heads.main.checkout()
+        self.commit('shared.txt', 'main\n', 'Main change')
+
+        self.git_ops = GitOperations(FakeConfigManager())
+        self.git_ops.repo = self.repo
+
+    def commit(self, name, content, message):
+        with open(os.path.join(self.temp_dir, name), 'w') as f:
+            f.write(content)
+        self.repo.index.add([name])
+        self.repo.index.commit(message)
+
+    def test_merge_reports_conflicts(self):
+        self.assertEqual(self.git_ops.merge_feature_branch('feature/conflict'), 'CONFLICT')
+        conflicts = read_conflicts(self.repo)
+        self.assertEqual(len(conflicts), 1)
+        self.assertEqual(conflicts[0].path, 'shared.txt')
+        self.assertEqual(conflicts[0].type, 'both_modified')
+        self.assertEqual(conflicts[0].theirs, self.repo.heads['feature/conflict'].commit.tree['shared.txt'].hexsha)
+        self.assertEqual(self.git_ops.resolve_conflicts(), 'CONFLICT')
+
+    def test_merge_json_output(self):
+        args = build_parser().parse_args(['merge', 'feature/conflict', '--json'])
+        output = io.StringIO()
+        with redirect_stdout(output):
+            merge_branch_command(args, self.git_ops)
+
+        report = json.loads(output.getvalue())
+        self.assertEqual(report['result'], 'conflict')
+        self.assertEqual([c['path'] for c in report['conflicts']], ['shared.txt'])
+
+
+if __name__ == '__main__':
+    unittest.main()
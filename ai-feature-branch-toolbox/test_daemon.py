@@ -0,0 +1,74 @@
+import io
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from contextlib import redirect_stdout
+
+import yaml
+
+from ai_feature_branch_toolbox.config_template import DEFAULT_CONFIG
+from ai_feature_branch_toolbox.daemon import ToolboxDaemon, forward_command, stop_daemon
+
+
+@unittest.skipUnless(hasattr(__import__('socket'), 'AF_UNIX'), "Unix domain sockets are not available")
+class TestDaemon(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.repo_path = os.path.join(self.temp_dir, 'repo')
+        os.makedirs(self.repo_path)
+
+        config = {section: dict(values) for section, values in DEFAULT_CONFIG.items()}
+        config['repository']['path'] = self.repo_path
+        with open(os.path.join(self.temp_dir, 'config.yaml'), 'w') as f:
+            yaml.dump(config, f)
+
+        self.socket_path = os.path.join(self.temp_dir, 'daemon.sock')
+        self.daemon = ToolboxDaemon(self.socket_path)
+        self.daemon.bind()
+        self.thread = threading.Thread(target=self.daemon.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        stop_daemon(self.socket_path)
+        self.thread.join(timeout=5)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def forward(self, *argv):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            exit_code = forward_command(list(argv), self.socket_path, cwd=self.temp_dir)
+        return exit_code, output.getvalue()
+
+    def test_commands_run_in_daemon(self):
+        exit_code, output = self.forward('create-branch', 'feature/daemon')
+        self.assertEqual(exit_code, 0)
+        self.assertIn("Successfully created and switched to new branch: feature/daemon", output)
+        session = next(iter(self.daemon._sessions))
+        repo = session.repo
+
+        with open(os.path.join(self.repo_path, 'daemon.txt'), 'w') as f:
+            f.write('served')
+        exit_code, output = self.forward('commit', 'Commit through daemon')
+        self.assertEqual(exit_code, 0)
+        self.assertIn("Successfully committed changes", output)
+
+        # The repository stays open between requests
+        self.assertEqual(len(self.daemon._sessions), 1)
+        self.assertIs(session.repo, repo)
+        self.assertEqual(repo.head.commit.message, 'Commit through daemon')
+
+    def test_failing_command_returns_exit_code(self):
+        exit_code, output = self.forward('switch-branch', 'feature/missing')
+        self.assertEqual(exit_code, 1)
+        self.assertIn("Failed to switch to branch: feature/missing", output)
+
+    def test_no_daemon_falls_back(self):
+        missing_socket = os.path.join(self.temp_dir, 'missing.sock')
+        self.assertIsNone(forward_command(['commit', 'message'], missing_socket))
+        self.assertFalse(stop_daemon(missing_socket))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import io
+import json
+import os
+import unittest
+from contextlib import redirect_stdout
+from types import SimpleNamespace
+from unittest import mock
+
+from git import Repo
+
+from ai_feature_branch_toolbox.cli import main
+from ai_feature_branch_toolbox.fleet import FleetExecutor, run_fleet_command
+
+from test_helpers import FakeConfigManager, init_repo, make_temp_dir
+
+
+class TestFleet(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = make_temp_dir(self)
+        self.repos = []
+        for index in range(4):
+            path = os.path.join(self.temp_dir, f'repo{index}')
+            repo = init_repo(path)
+            with open(os.path.join(path, 'README.md'), 'w') as f:
+                f.write('base\n')
+            repo.index.add(['README.md'])
+            repo.index.commit('Initial commit')
+            repo.close()
+            self.repos.append(path)
+        self.missing = os.path.join(self.temp_dir, 'missing')
+        self.config_manager = FakeConfigManager({'branches.prefix': 'feature/'})
+
+    def test_runs_command_in_every_repo(self):
+        executor = FleetExecutor(workers=2, config_manager=self.config_manager)
+        results = list(executor.run(self.repos + [self.missing], {'command': 'create-branch', 'branch_name': 'feature/x'}))
+
+        self.assertEqual(sorted(result['repo'] for result in results), sorted(self.repos + [self.missing]))
+        for path in self.repos:
+            with Repo(path) as repo:
+                self.assertEqual(repo.active_branch.name, 'feature/x')
+        summary = executor.summary(slowest=2)
+        self.assertEqual((summary.total, summary.succeeded), (5, 4))
+        self.assertEqual([result['repo'] for result in summary.failed], [self.missing])
+        self.assertEqual(len(summary.slowest), 2)
+        self.assertIn('4/5 repositories succeeded', summary.format())
+        json.dumps(summary.to_dict())
+        self.assertNotIn('repository.path', self.config_manager.values)
+
+    def test_commit_and_merge(self):
+        executor = FleetExecutor(workers=4, config_manager=self.config_manager)
+        list(executor.run(self.repos, {'command': 'create-branch', 'branch_name': 'feature/x'}))
+        for path in self.repos:
+            with open(os.path.join(path, 'new.txt'), 'w') as f:
+                f.write('new\n')
+        results = list(executor.run(self.repos, {'command': 'commit', 'message': 'Add new'}))
+        self.assertTrue(all(result['ok'] for result in results))
+
+        results = list(executor.run(self.repos, {'command': 'merge', 'feature_branch': 'feature/x', 'in_memory': True}))
+        self.assertTrue(all(result['ok'] for result in results))
+        with Repo(self.repos[0]) as repo:
+            # main has no commits of its own, so it is fast-forwarded
+            self.assertEqual(repo.heads.main.commit, repo.heads['feature/x'].commit)
+
+    def test_process_pool(self):
+        with mock.patch('ai_feature_branch_toolbox.fleet.get_session') as get_session:
+            results = list(FleetExecutor(workers=2, processes=True).run(self.repos, {'command': 'list-branches'}))
+            get_session.assert_not_called()
+        self.assertEqual([result['result'] for result in results], [['main']] * 4)
+
+    def test_unknown_command(self):
+        with self.assertRaises(ValueError):
+            list(FleetExecutor(config_manager=self.config_manager).run(self.repos, {'command': 'rebase'}))
+        result = run_fleet_command(self.repos[0], {'command': 'commit', 'bogus': 1}, self.config_manager)
+        self.assertFalse(result['ok'])
+
+    def test_cli(self):
+        repos_file = os.path.join(self.temp_dir, 'repos.txt')
+        with open(repos_file, 'w') as f:
+            f.write('\n'.join(self.repos[1:]) + '\n')
+        session = SimpleNamespace(config_manager=self.config_manager)
+        output = io.StringIO()
+        # Merging a missing branch fails everywhere
+        with mock.patch('ai_feature_branch_toolbox.fleet.get_session', return_value=session), redirect_stdout(output):
+            with self.assertRaises(SystemExit) as exit:
+                main(['fleet', '--repo', self.repos[0], '--repos-file', repos_file, '--json',
+                      'merge', 'feature/missing', '--dry-run'])
+        self.assertEqual(exit.exception.code, 1)
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(lines[-1]['summary']['total'], 4)
+        self.assertEqual(len(lines[-1]['summary']['failed']), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import os
+import tempfile
+import unittest
+
+from ai_feature_branch_toolbox import fsmonitor
+from ai_feature_branch_toolbox.fsmonitor import FsmonitorDaemon, InotifyWatcher
+from ai_feature_branch_toolbox.git_operations import GitOperations
+
+from test_helpers import FakeConfigManager, make_temp_dir, make_temp_repo
+
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+@unittest.skipUnless(fsmonitor.inotify_supported(), "inotify is not available")
+class TestInotifyWatcher(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = make_temp_dir(self)
+        write(os.path.join(self.temp_dir, 'src', 'app.py'), 'print(1)\n')
+        os.makedirs(os.path.join(self.temp_dir, '.git'))
+        self.watcher = InotifyWatcher(self.temp_dir)
+
+    def tearDown(self):
+        self.watcher.close()
+
+    def test_reports_relative_paths(self):
+        write(os.path.join(self.temp_dir, 'src', 'app.py'), 'print(2)\n')
+        write(os.path.join(self.temp_dir, '.git', 'index'), 'ignored')
+        os.makedirs(os.path.join(self.temp_dir, 'docs'))
+        paths, overflow = self.watcher.read_events()
+        self.assertFalse(overflow)
+        self.assertEqual(set(paths), {b'src/app.py', b'docs/'})
+
+    def test_watches_new_directories(self):
+        os.makedirs(os.path.join(self.temp_dir, 'docs'))
+        self.watcher.read_events()
+        write(os.path.join(self.temp_dir, 'docs', 'guide.md'), '# Guide\n')
+        os.rename(os.path.join(self.temp_dir, 'src'), os.path.join(self.temp_dir, 'lib'))
+        paths, _ = self.watcher.read_events()
+        self.assertEqual(set(paths), {b'docs/guide.md', b'src/', b'lib/'})
+        write(os.path.join(self.temp_dir, 'lib', 'app.py'), 'print(3)\n')
+        self.assertEqual(set(self.watcher.read_events()[0]), {b'lib/app.py'})
+
+
+@unittest.skipUnless(fsmonitor.inotify_supported(), "inotify is not available")
+class TestFsmonitorDaemon(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = make_temp_dir(self)
+        write(os.path.join(self.temp_dir, 'a.txt'), 'a\n')
+        self.daemon = FsmonitorDaemon(self.temp_dir, os.path.join(self.temp_dir, 'unused.sock'))
+
+    def tearDown(self):
+        self.daemon.watcher.close()
+
+    def test_unknown_token_means_everything_changed(self):
+        token, paths = self.daemon.query('')
+        self.assertIsNone(paths)
+        self.assertEqual(self.daemon.query(token), (token, []))
+        self.assertIsNone(self.daemon.query('other-instance:0')[1])
+
+    def test_changes_since_token(self):
+        first, _ = self.daemon.query('')
+        write(os.path.join(self.temp_dir, 'a.txt'), 'b\n')
+        second, paths = self.daemon.query(first)
+        self.assertEqual(paths, [b'a.txt'])
+        write(os.path.join(self.temp_dir, 'b.txt'), 'b\n')
+        self.assertEqual(self.daemon.query(second)[1], [b'b.txt'])
+        self.assertEqual(self.daemon.query(first)[1], [b'a.txt', b'b.txt'])
+        # Another working tree sharing the hook is told to scan
+        self.assertIsNone(self.daemon.query(second, cwd=tempfile.gettempdir())[1])
+
+    def test_dropped_journal(self):
+        token, _ = self.daemon.query('')
+        self.daemon.journal.clear()
+        self.daemon.floor = self.daemon.sequence + 1
+        self.assertIsNone(self.daemon.query(token)[1])
+
+
+@unittest.skipUnless(fsmonitor.inotify_supported(), "inotify is not available")
+class TestGitOperationsFsmonitor(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir, self.repo = make_temp_repo(self)
+        write(os.path.join(self.temp_dir, 'src', 'app.py'), 'print(1)\n')
+        write(os.path.join(self.temp_dir, 'README.md'), '# Test\n')
+        self.repo.index.add(['src/app.py', 'README.md'])
+        self.repo.index.commit('Initial commit')
+        self.git_ops = GitOperations(FakeConfigManager(), track_state=False)
+        self.git_ops.initialize_repo(self.temp_dir)
+
+    def tearDown(self):
+        self.git_ops.disable_fsmonitor()
+        self.git_ops.close_repo()
+
+    def test_enable_and_disable(self):
+        self.assertTrue(self.git_ops.enable_fsmonitor())
+        state = self.git_ops.fsmonitor_status()
+        self.assertEqual(state['mode'], 'hook')
+        self.assertEqual(state['daemon']['root'], os.path.realpath(self.temp_dir))
+        self.assertEqual(self.repo.git.config('core.fsmonitorHookVersion'), '2')
+        self.assertEqual(self.repo.git.config('core.untrackedCache'), 'true')
+
+        self.assertTrue(self.git_ops.disable_fsmonitor())
+        self.assertEqual(self.git_ops.fsmonitor_status(), {'mode': None, 'daemon': None})
+        self.assertIsNone(fsmonitor.daemon_status(fsmonitor.get_socket_path(self.repo.git_dir)))
+        self.assertFalse(os.path.exists(os.path.join(self.repo.git_dir, fsmonitor.HOOK_NAME)))
+
+    def test_status_and_commit_through_the_monitor(self):
+        self.assertTrue(self.git_ops.enable_fsmonitor())
+        self.assertTrue(self.git_ops.status().clean)
+
+        write(os.path.join(self.temp_dir, 'src', 'app.py'), 'print(2)\n')
+        write(os.path.join(self.temp_dir, 'docs', 'guide.md'), '# Guide\n')
+        os.remove(os.path.join(self.temp_dir, 'README.md'))
+        status = self.git_ops.status()
+        self.assertEqual(status.modified, {'src/app.py', 'README.md'})
+        self.assertEqual(status.untracked, {'docs/guide.md'})
+        self.assertGreater(self.git_ops.fsmonitor_status()['daemon']['queries'], 0)
+
+        self.assertTrue(self.git_ops.commit_changes('Change through the monitor'))
+        self.assertTrue(self.git_ops.status().clean)
+        self.assertEqual(sorted(self.repo.git.ls_files().splitlines()), ['docs/guide.md', 'src/app.py'])
+
+    def test_enabled_from_config(self):
+        git_ops = GitOperations(FakeConfigManager({'fsmonitor.enabled': True}), track_state=False)
+        self.assertTrue(git_ops.initialize_repo(self.temp_dir))
+        self.assertEqual(git_ops.fsmonitor_status()['mode'], 'hook')
+        git_ops.close_repo()
+
+
+class TestStageChangedPaths(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir, self.repo = make_temp_repo(self)
+        write(os.path.join(self.temp_dir, 'keep.txt'), 'keep\n')
+        write(os.path.join(self.temp_dir, ':(glob)odd.txt'), 'odd\n')
+        self.repo.index.add(['keep.txt', ':(glob)odd.txt'])
+        self.repo.index.commit('Initial commit')
+        self.git_ops = GitOperations(FakeConfigManager(), track_state=False)
+        self.git_ops.initialize_repo(self.temp_dir)
+
+    def tearDown(self):
+        self.git_ops.close_repo()
+
+    def test_unusual_names_are_staged_literally(self):
+        write(os.path.join(self.temp_dir, ':(glob)odd.txt'), 'changed\n')
+        write(os.path.join(self.temp_dir, '*.txt'), 'star\n')
+        write(os.path.join(self.temp_dir, 'dir with space', 'new file.txt'), 'new\n')
+        self.assertTrue(self.git_ops.commit_changes('Unusual names'))
+        self.assertTrue(self.git_ops.status().clean)
+        self.assertEqual(self.repo.head.commit.message, 'Unusual names')
+        self.assertEqual(self.repo.head.commit.author.email, 'test@example.com')
+
+
+if __name__ == '__main__':
+    unittest.main()
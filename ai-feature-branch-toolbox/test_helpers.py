@@ -0,0 +1,67 @@
+import shutil
+import tempfile
+
+from git import Repo
+
+
+class FakePersistentConfig:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def update(self, key, value):
+        self.data[key] = value
+
+
+class FakeConfigManager:
+    """In-memory stand-in for ConfigManager; unset keys return the default."""
+
+    def __init__(self, values=None, persistent_config=None):
+        self.values = values if values is not None else {}
+        self.persistent_config = persistent_config
+
+    def get_value(self, key, default=None):
+        return self.values.get(key, default)
+
+    def set_value(self, key, value):
+        self.values[key] = value
+
+
+def set_identity(repo):
+    with repo.config_writer() as config:
+        config.set_value('user', 'name', 'Test')
+        config.set_value('user', 'email', 'test@example.com')
+
+
+def init_repo(path, initial_branch='main'):
+    """
+    Create a repository that can commit without a global git identity.
+
+    Returns:
+        git.Repo: The new repository; the caller closes it.
+    """
+    repo = Repo.init(path, initial_branch=initial_branch)
+    set_identity(repo)
+    return repo
+
+
+def make_temp_dir(test_case):
+    """Create a directory that is removed after the test."""
+    temp_dir = tempfile.mkdtemp()
+    test_case.addCleanup(shutil.rmtree, temp_dir, True)
+    return temp_dir
+
+
+def make_temp_repo(test_case):
+    """
+    Create a repository in a temporary directory, closed and removed after the test.
+
+    Returns:
+        tuple: (temp_dir, repo)
+    """
+    temp_dir = make_temp_dir(test_case)
+    repo = init_repo(temp_dir)
+    test_case.addCleanup(repo.close)
+    return temp_dir, repo
@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+import unittest
+
+PACKAGE_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+PROBE = """
+import sys
+{statement}
+print('loaded:' + ','.join(sorted(m for m in ('git', 'yaml') if m in sys.modules)))
+"""
+
+
+def loaded_heavy_modules(statement):
+    env = dict(os.environ, PYTHONPATH=PACKAGE_ROOT)
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE.format(statement=statement)],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return output.splitlines()[-1][len('loaded:'):]
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_package_import_is_light(self):
+        self.assertEqual(loaded_heavy_modules("import ai_feature_branch_toolbox"), '')
+
+    def test_cli_import_is_light(self):
+        self.assertEqual(loaded_heavy_modules("import ai_feature_branch_toolbox.cli"), '')
+
+    def test_help_command_is_light(self):
+        statement = "from ai_feature_branch_toolbox.cli import main\ntry:\n    main(['help'])\nexcept SystemExit:\n    pass"
+        self.assertEqual(loaded_heavy_modules(statement), '')
+
+    def test_lazy_attributes_resolve(self):
+        statement = "from ai_feature_branch_toolbox import GitOperations, ConfigManager"
+        self.assertEqual(loaded_heavy_modules(statement), 'git,yaml')
+
+
+if __name__ == '__main__':
+    unittest.main()
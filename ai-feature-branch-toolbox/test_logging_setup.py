@@ -0,0 +1,81 @@
+import logging
+import os
+import unittest
+
+from ai_feature_branch_toolbox import logging_setup
+from ai_feature_branch_toolbox.logging_setup import configure_logging, configure_logging_from_config, shutdown_logging, truncated
+
+from test_helpers import FakeConfigManager, make_temp_dir
+
+
+class CountingItems(list):
+    formatted = 0
+
+    def __iter__(self):
+        CountingItems.formatted += 1
+        return super().__iter__()
+
+
+class TestLoggingSetup(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = make_temp_dir(self)
+        self.log_file = os.path.join(self.temp_dir, 'toolbox.log')
+        self.logger = logging.getLogger('ai_feature_branch_toolbox.git_operations')
+
+    def tearDown(self):
+        shutdown_logging()
+
+    def read_log(self):
+        # Stopping the listener writes out the queued records
+        shutdown_logging()
+        with open(self.log_file, encoding='utf-8') as f:
+            return f.read()
+
+    def test_records_below_level_are_dropped(self):
+        configure_logging('WARNING', self.log_file)
+        self.logger.info("Switched to branch: %s", 'feature/a')
+        self.logger.warning("Branch '%s' does not exist.", 'feature/b')
+        log = self.read_log()
+        self.assertNotIn('feature/a', log)
+        self.assertIn("WARNING ai_feature_branch_toolbox.git_operations [MainThread]: Branch 'feature/b' does not exist.", log)
+
+    def test_config_section_is_applied(self):
+        configure_logging_from_config(FakeConfigManager({'logging.level': 'DEBUG', 'logging.file': self.log_file}))
+        self.logger.debug("Found %s conflicted paths", 3)
+        self.assertIn('Found 3 conflicted paths', self.read_log())
+
+    def test_reconfiguring_replaces_the_pipeline(self):
+        package_logger = logging.getLogger(logging_setup.PACKAGE_LOGGER)
+        handlers = list(package_logger.handlers)
+        configure_logging('INFO', self.log_file)
+        configure_logging('INFO', self.log_file)
+        configure_logging('ERROR', self.log_file)
+        self.assertEqual(len(package_logger.handlers), len(handlers) + 1)
+        self.assertEqual(package_logger.level, logging.ERROR)
+        self.assertFalse(package_logger.propagate)
+        shutdown_logging()
+        self.assertEqual(package_logger.handlers, handlers)
+        self.assertTrue(package_logger.propagate)
+
+    def test_invalid_level(self):
+        with self.assertRaises(ValueError):
+            configure_logging('LOUD')
+
+    def test_truncated(self):
+        paths = [f'file{index}.txt' for index in range(100)]
+        self.assertEqual(str(truncated(paths, 2)), 'file0.txt, file1.txt, ... (98 more)')
+        self.assertEqual(str(truncated({'b', 'a'})), 'a, b')
+        self.assertEqual(str(truncated({'key': 'value', 'other': 1}, 1)), "{'key': 'value', ... (1 more)}")
+        self.assertEqual(str(truncated(iter(['x']))), 'x')
+
+    def test_arguments_are_not_formatted_below_level(self):
+        configure_logging('INFO', self.log_file)
+        items = CountingItems(['a', 'b'])
+        self.logger.debug("Untracked files: %s", truncated(items))
+        self.assertEqual(CountingItems.formatted, 0)
+        self.logger.info("Untracked files: %s", truncated(items))
+        self.assertIn('Untracked files: a, b', self.read_log())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import os
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from ai_feature_branch_toolbox import maintenance
+from ai_feature_branch_toolbox.git_operations import GitOperations
+
+from test_helpers import FakeConfigManager, make_temp_repo
+
+
+class TestMaintenance(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir, self.repo = make_temp_repo(self)
+        for i in range(5):
+            self.commit_file(f'file{i}.txt', f'content {i}\n')
+        self.repo.git.branch('feature/a')
+        self.git_ops = GitOperations(FakeConfigManager({'maintenance.auto_commits': 0}), track_state=False)
+        self.git_ops.initialize_repo(self.temp_dir)
+
+    def tearDown(self):
+        self.git_ops.close_repo()
+
+    def commit_file(self, name, content):
+        with open(os.path.join(self.temp_dir, name), 'w') as f:
+            f.write(content)
+        self.repo.index.add([name])
+        self.repo.index.commit(f'Add {name}')
+
+    def test_maintain_repo(self):
+        loose = maintenance.count_objects(self.repo)['count']
+        self.assertGreater(loose, 0)
+
+        report = self.git_ops.maintain_repo()
+        self.assertTrue(report.ok, report.steps)
+        self.assertEqual([step['name'] for step in report.steps], [name for name, _ in maintenance.STEPS])
+        self.assertEqual(report.objects_before['count'], loose)
+        self.assertEqual(report.objects_after['count'], 0)
+        self.assertEqual(set(report.before), {'status', 'list_branches', 'count_commits', 'merge_base', 'path_history'})
+        self.assertEqual(set(report.after), set(report.before))
+
+        objects = os.path.join(self.repo.git_dir, 'objects')
+        self.assertTrue(os.path.exists(os.path.join(objects, 'pack', 'multi-pack-index')))
+        self.assertTrue(os.path.exists(os.path.join(objects, 'info', 'commit-graphs', 'commit-graph-chain')))
+        self.assertTrue(os.path.exists(os.path.join(self.repo.git_dir, 'packed-refs')))
+        self.assertEqual(self.repo.git.config('core.untrackedCache'), 'true')
+        self.assertIn('commit_graph', report.format_table())
+
+        # The repository still works and a second run has nothing to pack
+        self.assertEqual(self.git_ops.list_branches(), ['feature/a', 'main'])
+        self.assertTrue(self.git_ops.maintain_repo(measure=False).ok)
+
+    def test_failed_step_does_not_stop_the_others(self):
+        def fail(repo):
+            raise RuntimeError('disk full')
+
+        steps = (('broken', fail),) + maintenance.STEPS[1:]
+        with mock.patch.object(maintenance, 'STEPS', steps):
+            report = maintenance.maintain(self.repo, measure=False)
+        self.assertFalse(report.ok)
+        self.assertEqual(report.steps[0]['error'], 'disk full')
+        self.assertTrue(all(step['ok'] for step in report.steps[1:]))
+
+    def test_runs_in_background_after_every_n_commits(self):
+        git_ops = GitOperations(FakeConfigManager({'maintenance.auto_commits': 2}), track_state=False)
+        git_ops.initialize_repo(self.temp_dir)
+        with mock.patch.object(maintenance, 'start_background') as start_background:
+            for i in range(5):
+                with open(os.path.join(self.temp_dir, 'change.txt'), 'w') as f:
+                    f.write(f'change {i}\n')
+                self.assertTrue(git_ops.commit_changes(f'Change {i}'))
+        self.assertEqual(start_background.call_count, 2)
+        git_ops.close_repo()
+
+    def test_concurrent_commits_are_all_counted(self):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            due = list(executor.map(lambda _: maintenance.record_commit(self.repo, 1000), range(40)))
+        self.assertFalse(any(due))
+        with open(os.path.join(self.repo.git_dir, maintenance.COUNTER_NAME)) as f:
+            self.assertEqual(f.read(), '40')
+
+    def test_commits_are_not_counted_during_a_run(self):
+        with maintenance.maintenance_lock(self.repo) as locked, \
+                mock.patch.object(maintenance, 'COUNTER_LOCK_SECONDS', 0):
+            self.assertTrue(locked)
+            self.assertFalse(maintenance.record_commit(self.repo, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.repo.git_dir, maintenance.COUNTER_NAME)))
+        self.assertTrue(maintenance.record_commit(self.repo, 1))
+
+    def test_maintain_repo_refuses_to_overlap_a_run(self):
+        with maintenance.maintenance_lock(self.repo):
+            self.assertIsNone(self.git_ops.maintain_repo(measure=False))
+        self.assertFalse(os.path.exists(os.path.join(self.repo.git_dir, maintenance.LOCK_NAME)))
+        self.assertTrue(self.git_ops.maintain_repo(measure=False).ok)
+
+    def test_background_run_maintains_the_repository(self):
+        self.assertTrue(maintenance.start_background(self.repo))
+        packed_refs = os.path.join(self.repo.git_dir, 'packed-refs')
+        lock = os.path.join(self.repo.git_dir, maintenance.LOCK_NAME)
+        deadline = time.monotonic() + 30
+        while not os.path.exists(packed_refs) or os.path.exists(lock):
+            self.assertLess(time.monotonic(), deadline, 'background maintenance did not finish')
+            time.sleep(0.05)
+        self.assertTrue(os.path.exists(os.path.join(self.repo.git_dir, maintenance.LOG_NAME)))
+
+    def test_background_run_is_skipped_while_locked(self):
+        with open(os.path.join(self.repo.git_dir, maintenance.LOCK_NAME), 'w'):
+            pass
+        with mock.patch.object(maintenance.subprocess, 'Popen') as popen:
+            self.assertFalse(maintenance.start_background(self.repo))
+        popen.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import json
+import os
+import unittest
+
+from ai_feature_branch_toolbox.git_operations import GitOperations
+from ai_feature_branch_toolbox.merge_matrix import MergeMatrix, merge_cell
+from ai_feature_branch_toolbox.repo_status import read_status
+
+from test_helpers import FakeConfigManager, make_temp_repo
+
+
+class TestMergeMatrix(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir, self.repo = make_temp_repo(self)
+        self.commit('shared.txt', 'base\n', 'Initial commit')
+        self.commit('main.txt', 'base\n', 'Main file')
+
+        # feature/a and feature/b conflict with each other, feature/c with main
+        self.branch('feature/a', 'shared.txt', 'a\n')
+        self.branch('feature/b', 'shared.txt', 'b\n')
+        self.branch('feature/c', 'main.txt', 'c\n')
+        self.branch('other/d', 'shared.txt', 'd\n')
+        self.commit('main.txt', 'main\n', 'Main change')
+
+        self.git_ops = GitOperations(FakeConfigManager())
+        self.git_ops.repo = self.repo
+
+    def commit(self, name, content, message):
+        with open(os.path.join(self.temp_dir, name), 'w') as f:
+            f.write(content)
+        self.repo.index.add([name])
+        self.repo.index.commit(message)
+
+    def branch(self, branch_name, name, content):
+        self.repo.create_head(branch_name).checkout()
+        self.commit(name, content, f'Change on {branch_name}')
+        self.repo.heads.main.checkout()
+
+    def test_matrix(self):
+        report = self.git_ops.merge_matrix(workers=2)
+
+        self.assertEqual(sorted(report.branches), ['feature/a', 'feature/b', 'feature/c'])
+        self.assertEqual({name: cell['clean'] for name, cell in report.against_main.items()},
+                         {'feature/a': True, 'feature/b': True, 'feature/c': False})
+        self.assertEqual(report.against_main['feature/c']['conflicts'], ['main.txt'])
+        self.assertEqual({pair: cell['clean'] for pair, cell in report.pairs.items()}, {
+            ('feature/a', 'feature/b'): False,
+            ('feature/a', 'feature/c'): True,
+            ('feature/b', 'feature/c'): True,
+        })
+        self.assertEqual(report.computed, 6)
+        self.assertTrue(read_status(self.repo).clean)
+        json.dumps(report.to_dict())
+        self.assertIn('feature/a', report.format_table())
+
+    def test_only_moved_branch_is_recomputed(self):
+        self.git_ops.merge_matrix(workers=2)
+        report = self.git_ops.merge_matrix(workers=2)
+        self.assertEqual((report.computed, report.cached), (0, 6))
+
+        self.repo.heads['feature/c'].checkout()
+        self.commit('c.txt', 'more\n', 'Move feature/c')
+        self.repo.heads.main.checkout()
+
+        report = self.git_ops.merge_matrix(workers=2)
+        self.assertEqual((report.computed, report.cached), (3, 3))
+
+    def test_against_main_only(self):
+        report = MergeMatrix(self.repo, workers=1).compute('main', 'feature/', pairs=False)
+        self.assertEqual(report.pairs, {})
+        self.assertEqual(len(report.against_main), 3)
+
+    def test_merge_cell_error(self):
+        cell = merge_cell((self.repo.git_dir, 'main', '0' * 40))
+        self.assertFalse(cell['clean'])
+        self.assertIn('error', cell)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import io
+import json
+import os
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from git import Repo
+
+from ai_feature_branch_toolbox.cli import build_parser, merge_branch_command
+from ai_feature_branch_toolbox.git_operations import GitOperations
+from ai_feature_branch_toolbox.repo_status import read_status
+
+from test_helpers import FakeConfigManager, make_temp_dir, make_temp_repo
+
+
+class TestMergeTree(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir, self.repo = make_temp_repo(self)
+        self.commit('shared.txt', 'base\n', 'Initial commit')
+
+        self.repo.create_head('feature/clean').checkout()
+        self.commit('clean.txt', 'clean\n', 'Clean change')
+        self.repo.heads.main.checkout()
+        self.repo.create_head('feature/conflict').checkout()
+        self.commit('shared.txt', 'feature\n', 'Conflicting change')
+        self.repo.heads.main.checkout()
+        self.commit('shared.txt', 'main\n', 'Main change')
+        self.repo.create_head('work').checkout()
+
+        self.git_ops = GitOperations(FakeConfigManager())
+        self.git_ops.repo = self.repo
+
+    def commit(self, name, content, message):
+        with open(os.path.join(self.temp_dir, name), 'w') as f:
+            f.write(content)
+        self.repo.index.add([name])
+        self.repo.index.commit(message)
+
+    def assert_checkout_untouched(self):
+        self.assertEqual(self.repo.active_branch.name, 'work')
+        self.assertTrue(read_status(self.repo).clean)
+
+    def test_can_merge_clean(self):
+        main_before = self.repo.heads.main.commit
+        preview = self.git_ops.can_merge('feature/clean', 'main')
+        self.assertTrue(preview.clean)
+        self.assertEqual(preview.conflicts, [])
+        self.assertIn('clean.txt', self.repo.git.ls_tree('--name-only', preview.tree).splitlines())
+        self.assertEqual(self.repo.heads.main.commit, main_before)
+        self.assert_checkout_untouched()
+
+    def test_can_merge_conflict(self):
+        preview = self.git_ops.can_merge('feature/conflict', 'main')
+        self.assertFalse(preview.clean)
+        self.assertEqual([(c.path, c.type) for c in preview.conflicts], [('shared.txt', 'both_modified')])
+        self.assertEqual(self.git_ops.merge_feature_branch('feature/conflict', dry_run=True), 'CONFLICT')
+        self.assert_checkout_untouched()
+
+    def test_in_memory_merge_commits_without_checkout(self):
+        main_before = self.repo.heads.main.commit
+        self.assertTrue(self.git_ops.merge_feature_branch('feature/clean', in_memory=True))
+
+        merge = self.repo.heads.main.commit
+        self.assertEqual(merge.parents, (main_before, self.repo.heads['feature/clean'].commit))
+        self.assertEqual(merge.tree['clean.txt'].data_stream.read(), b'clean\n')
+        self.assert_checkout_untouched()
+
+    def test_in_memory_merge_into_checked_out_branch(self):
+        self.repo.heads.main.checkout()
+        self.assertTrue(self.git_ops.merge_feature_branch('feature/clean', in_memory=True))
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, 'clean.txt')))
+        self.assertTrue(read_status(self.repo).clean)
+
+    def test_in_memory_merge_into_branch_of_linked_worktree(self):
+        linked = os.path.join(make_temp_dir(self), 'linked')
+        self.repo.git.worktree('add', '--quiet', linked, 'main')
+        self.assertTrue(self.git_ops.merge_feature_branch('feature/clean', in_memory=True))
+
+        with Repo(linked) as linked_repo:
+            self.assertEqual(len(linked_repo.head.commit.parents), 2)
+            self.assertTrue(read_status(linked_repo).clean)
+        self.assertTrue(os.path.exists(os.path.join(linked, 'clean.txt')))
+        self.assert_checkout_untouched()
+
+    def test_in_memory_merge_of_merged_branch_records_nothing(self):
+        main_before = self.repo.heads.main.commit
+        self.repo.create_head('feature/merged', main_before.parents[0])
+        self.assertTrue(self.git_ops.merge_feature_branch('feature/merged', in_memory=True))
+        self.assertEqual(self.repo.heads.main.commit, main_before)
+        self.assert_checkout_untouched()
+
+    def test_in_memory_merge_fast_forwards(self):
+        self.repo.create_head('feature/ahead', 'main').checkout()
+        self.commit('ahead.txt', 'ahead\n', 'Change ahead of main')
+        self.repo.heads.work.checkout()
+        self.assertTrue(self.git_ops.merge_feature_branch('feature/ahead', in_memory=True))
+        self.assertEqual(self.repo.heads.main.commit, self.repo.heads['feature/ahead'].commit)
+        self.assert_checkout_untouched()
+
+        # A checked-out branch is fast-forwarded along with its working tree
+        self.repo.heads.main.checkout()
+        self.repo.heads['feature/ahead'].checkout()
+        self.commit('later.txt', 'later\n', 'Later change')
+        self.repo.heads.main.checkout()
+        self.assertTrue(self.git_ops.merge_feature_branch('feature/ahead', in_memory=True))
+        self.assertEqual(self.repo.heads.main.commit, self.repo.heads['feature/ahead'].commit)
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, 'later.txt')))
+        self.assertTrue(read_status(self.repo).clean)
+
+    def test_in_memory_conflict_commits_nothing(self):
+        main_before = self.repo.heads.main.commit
+        self.assertEqual(self.git_ops.merge_feature_branch('feature/conflict', in_memory=True), 'CONFLICT')
+        self.assertEqual(self.repo.heads.main.commit, main_before)
+
+    def test_dry_run_json(self):
+        args = build_parser().parse_args(['merge', 'feature/conflict', '--dry-run', '--json'])
+        output = io.StringIO()
+        with redirect_stdout(output):
+            merge_branch_command(args, self.git_ops)
+
+        report = json.loads(output.getvalue())
+        self.assertEqual(report['result'], 'conflict')
+        self.assertEqual([c['path'] for c in report['conflicts']], ['shared.txt'])
+        self.assert_checkout_untouched()
+
+    def test_in_memory_json_when_conflicts_cannot_be_listed(self):
+        args = build_parser().parse_args(['merge', 'feature/conflict', '--in-memory', '--json'])
+        output = io.StringIO()
+        with mock.patch.object(self.git_ops, 'merge_feature_branch', return_value='CONFLICT'), \
+                mock.patch.object(self.git_ops, 'can_merge', return_value=None), redirect_stdout(output):
+            merge_branch_command(args, self.git_ops)
+
+        self.assertEqual(json.loads(output.getvalue()), {'result': 'conflict', 'conflicts': []})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import yaml
+
+from ai_feature_branch_toolbox import persistent_config as persistent_config_module
+from ai_feature_branch_toolbox.config_manager import ConfigManager
+from ai_feature_branch_toolbox.config_template import DEFAULT_CONFIG
+from ai_feature_branch_toolbox.persistent_config import PersistentConfig, parse_flush_policy
+
+
+class TestPersistentConfig(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_dir = os.path.join(self.temp_dir, 'state')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def read_file(self, persistent_config):
+        with open(persistent_config.config_file) as f:
+            return json.load(f)
+
+    def test_reads_are_served_from_memory(self):
+        persistent_config = PersistentConfig(self.config_dir)
+        persistent_config.update('current_branch', 'feature/a')
+        with mock.patch.object(persistent_config_module.json, 'load') as load:
+            for _ in range(10):
+                self.assertEqual(persistent_config.get('current_branch'), 'feature/a')
+            persistent_config.update('last_operation', 'commit')
+            self.assertEqual(load.call_count, 0)
+
+    def test_external_changes_are_picked_up(self):
+        persistent_config = PersistentConfig(self.config_dir)
+        persistent_config.update('current_branch', 'feature/a')
+
+        other = PersistentConfig(self.config_dir)
+        time.sleep(0.01)
+        other.update('current_branch', 'feature/b')
+
+        self.assertEqual(persistent_config.get('current_branch'), 'feature/b')
+
+    def test_immediate_policy_writes_every_change(self):
+        persistent_config = PersistentConfig(self.config_dir)
+        persistent_config.update('current_branch', 'feature/a')
+        self.assertEqual(self.read_file(persistent_config), {'current_branch': 'feature/a'})
+
+    def test_on_exit_policy_defers_writes(self):
+        persistent_config = PersistentConfig(self.config_dir, flush_policy='on_exit')
+        for i in range(100):
+            persistent_config.update('counter', i)
+        self.assertFalse(os.path.exists(persistent_config.config_file))
+        self.assertEqual(persistent_config.get('counter'), 99)
+
+        self.assertTrue(persistent_config.flush())
+        self.assertEqual(self.read_file(persistent_config), {'counter': 99})
+        self.assertFalse(persistent_config.flush())
+
+    def test_pending_changes_are_flushed_at_exit(self):
+        persistent_config = PersistentConfig(self.config_dir, flush_policy='on_exit')
+        persistent_config.update('current_branch', 'feature/exit')
+        persistent_config_module._flush_pending()
+        self.assertEqual(self.read_file(persistent_config), {'current_branch': 'feature/exit'})
+
+    def test_interval_policy_flushes_in_background(self):
+        persistent_config = PersistentConfig(self.config_dir, flush_policy='20ms')
+        persistent_config.update('current_branch', 'feature/timer')
+        self.assertFalse(os.path.exists(persistent_config.config_file))
+
+        deadline = time.time() + 5
+        while not os.path.exists(persistent_config.config_file) and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.read_file(persistent_config), {'current_branch': 'feature/timer'})
+
+    def test_unchanged_save_does_not_write(self):
+        persistent_config = PersistentConfig(self.config_dir)
+        persistent_config.save({'a': 1})
+        with mock.patch.object(persistent_config_module, 'write_atomic') as write:
+            persistent_config.save({'a': 1})
+            persistent_config.update('a', 1)
+            self.assertEqual(write.call_count, 0)
+
+    def test_parse_flush_policy(self):
+        self.assertEqual(parse_flush_policy(None), 'immediate')
+        self.assertEqual(parse_flush_policy('on_exit'), 'on_exit')
+        self.assertEqual(parse_flush_policy(250), 250)
+        self.assertEqual(parse_flush_policy('250ms'), 250)
+        for invalid in ('sometimes', 0, -5, True, 'ms'):
+            with self.assertRaises(ValueError):
+                parse_flush_policy(invalid)
+
+    def test_flush_policy_from_config(self):
+        cwd = os.getcwd()
+        os.chdir(self.temp_dir)
+        try:
+            config = {section: dict(values) for section, values in DEFAULT_CONFIG.items()}
+            config['persistence'] = {'flush_policy': 'on_exit'}
+            with open('config.yaml', 'w') as f:
+                yaml.dump(config, f)
+            config_manager = ConfigManager('config.yaml')
+            self.assertEqual(config_manager.persistent_config.flush_policy, 'on_exit')
+            # Cached warm starts still honour the setting
+            self.assertEqual(ConfigManager('config.yaml').persistent_config.flush_policy, 'on_exit')
+            config_manager.flush()
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == '__main__':
+    unittest.main()
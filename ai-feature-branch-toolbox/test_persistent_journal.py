@@ -0,0 +1,184 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import yaml
+
+from ai_feature_branch_toolbox.config_manager import ConfigManager
+from ai_feature_branch_toolbox.config_template import DEFAULT_CONFIG
+from ai_feature_branch_toolbox.config_validator import ConfigValidator
+from ai_feature_branch_toolbox.persistent_config import PersistentConfig, create_persistent_config
+from ai_feature_branch_toolbox.persistent_journal import JournalPersistentConfig
+
+
+# Writes COUNT keys named NAME-i from a separate process, with a journal small
+# enough to compact every few records, then compacts if COMPACT is 1
+WRITER = '''
+import sys
+from ai_feature_branch_toolbox.persistent_journal import JournalPersistentConfig
+config_dir, name, count, compact = sys.argv[1], sys.argv[2], int(sys.argv[3]), sys.argv[4] == '1'
+journal = JournalPersistentConfig(config_dir, journal_max_bytes=256)
+for i in range(count):
+    journal.update(f'{name}-{i}', i)
+if compact:
+    journal.compact()
+journal.close()
+'''
+
+
+class TestJournalPersistentConfig(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_dir = os.path.join(self.temp_dir, 'state')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def journal_files(self):
+        return sorted(name for name in os.listdir(self.config_dir) if '.journal.' in name)
+
+    def test_changes_are_appended_and_replayed(self):
+        journal = JournalPersistentConfig(self.config_dir)
+        journal.update('current_branch', 'feature/a')
+        journal.update('last_operation', 'commit')
+        journal.update('current_branch', 'feature/b')
+        journal.delete('last_operation')
+
+        with open(os.path.join(self.config_dir, self.journal_files()[0])) as f:
+            self.assertEqual(len(f.read().splitlines()), 4)
+        self.assertEqual(JournalPersistentConfig(self.config_dir).load(), {'current_branch': 'feature/b'})
+
+    def test_save_appends_only_changed_keys(self):
+        journal = JournalPersistentConfig(self.config_dir)
+        journal.save({'key_%d' % i: i for i in range(100)})
+        journal.save(dict({'key_%d' % i: i for i in range(100)}, key_5='changed'))
+
+        with open(os.path.join(self.config_dir, self.journal_files()[0])) as f:
+            self.assertEqual(len(f.read().splitlines()), 101)
+        self.assertEqual(JournalPersistentConfig(self.config_dir).get('key_5'), 'changed')
+
+    def test_compaction_folds_journals_into_snapshot(self):
+        journal = JournalPersistentConfig(self.config_dir, journal_max_bytes=512)
+        for i in range(50):
+            journal.update('counter', i)
+        journal.close()
+
+        self.assertTrue(os.path.exists(journal.config_file))
+        self.assertEqual(len(self.journal_files()), 1)
+        self.assertEqual(JournalPersistentConfig(self.config_dir).get('counter'), 49)
+
+    def test_writes_during_compaction_are_kept(self):
+        journal = JournalPersistentConfig(self.config_dir)
+        journal.update('before', 1)
+        journal.compact(wait=False)
+        journal.update('after', 2)
+        journal.close()
+        self.assertEqual(JournalPersistentConfig(self.config_dir).load(), {'before': 1, 'after': 2})
+
+    def test_store_opened_before_another_process_compacted(self):
+        journal = JournalPersistentConfig(self.config_dir, flush_policy='on_exit')
+        journal.update('first', 1)
+        journal.flush()
+        journal.update('second', 2)
+        subprocess.run([sys.executable, '-c', WRITER, self.config_dir, 'other', '1', '1'], check=True)
+        # The other process compacted and deleted the journal this store read
+        journal.close()
+        self.assertEqual(JournalPersistentConfig(self.config_dir).load(), {'first': 1, 'other-0': 0, 'second': 2})
+
+    def test_concurrent_processes_compacting(self):
+        writers = [subprocess.Popen([sys.executable, '-c', WRITER, self.config_dir, name, '200', '0'])
+                   for name in ('a', 'b')]
+        for writer in writers:
+            self.assertEqual(writer.wait(), 0)
+        state = JournalPersistentConfig(self.config_dir).load()
+        self.assertEqual(len(state), 400)
+        self.assertEqual(state['a-199'], 199)
+        self.assertEqual(state['b-199'], 199)
+
+    def test_torn_final_record_is_discarded(self):
+        journal = JournalPersistentConfig(self.config_dir)
+        journal.update('current_branch', 'feature/a')
+        with open(os.path.join(self.config_dir, self.journal_files()[0]), 'ab') as f:
+            f.write(b'{"k":"current_branch","v":"feat')
+
+        reopened = JournalPersistentConfig(self.config_dir)
+        self.assertEqual(reopened.get('current_branch'), 'feature/a')
+        reopened.update('last_operation', 'push')
+        self.assertEqual(JournalPersistentConfig(self.config_dir).load(),
+                         {'current_branch': 'feature/a', 'last_operation': 'push'})
+
+    def test_existing_json_state_is_imported(self):
+        PersistentConfig(self.config_dir).save({'current_branch': 'feature/json'})
+        self.assertEqual(JournalPersistentConfig(self.config_dir).get('current_branch'), 'feature/json')
+
+    def test_fingerprint_tracks_external_appends(self):
+        journal = JournalPersistentConfig(self.config_dir)
+        journal.update('a', 1)
+        fingerprint = journal.fingerprint()
+        self.assertEqual(JournalPersistentConfig(self.config_dir).fingerprint(), fingerprint)
+
+        JournalPersistentConfig(self.config_dir).update('a', 2)
+        self.assertTrue(journal.is_stale())
+        self.assertNotEqual(journal.fingerprint(), fingerprint)
+        self.assertEqual(journal.get('a'), 2)
+
+    def test_create_persistent_config(self):
+        self.assertIs(type(create_persistent_config(self.config_dir)), PersistentConfig)
+        self.assertIsInstance(create_persistent_config(self.config_dir, 'journal'), JournalPersistentConfig)
+        with self.assertRaises(ValueError):
+            create_persistent_config(self.config_dir, 'sqlite')
+
+    def test_backend_from_config(self):
+        cwd = os.getcwd()
+        os.chdir(self.temp_dir)
+        try:
+            config = {section: dict(values) for section, values in DEFAULT_CONFIG.items()}
+            config['persistence'] = {'backend': 'journal', 'journal_max_bytes': 4096}
+            with open('config.yaml', 'w') as f:
+                yaml.dump(config, f)
+            config_manager = ConfigManager('config.yaml')
+            self.assertIsInstance(config_manager.persistent_config, JournalPersistentConfig)
+            self.assertEqual(config_manager.persistent_config.journal_max_bytes, 4096)
+            config_manager.set_value('current_branch', 'feature/journal')
+
+            self.assertEqual(ConfigManager('config.yaml').get_value('current_branch'), 'feature/journal')
+        finally:
+            os.chdir(cwd)
+
+    def test_set_value_appends_one_record(self):
+        cwd = os.getcwd()
+        os.chdir(self.temp_dir)
+        try:
+            config = {section: dict(values) for section, values in DEFAULT_CONFIG.items()}
+            config['persistence'] = {'backend': 'journal'}
+            with open('config.yaml', 'w') as f:
+                yaml.dump(config, f)
+            store = JournalPersistentConfig('.ai_feature_branch_toolbox')
+            store.save({f'branch/{i}': i for i in range(1000)})
+            store.close()
+
+            config_manager = ConfigManager('config.yaml')
+            journal = os.path.join(config_manager.persistent_config.config_dir,
+                                   [name for name in os.listdir('.ai_feature_branch_toolbox') if '.journal.' in name][0])
+            size = os.path.getsize(journal)
+            config_manager.set_value('current_branch', 'feature/one')
+            with open(journal, 'rb') as f:
+                f.seek(size)
+                self.assertEqual(f.read().splitlines(), [b'{"k":"current_branch","v":"feature/one"}'])
+            self.assertEqual(ConfigManager('config.yaml').get_value('branch/999'), 999)
+        finally:
+            os.chdir(cwd)
+
+    def test_invalid_backend_settings(self):
+        config = {section: dict(values) for section, values in DEFAULT_CONFIG.items()}
+        for persistence in ({'backend': 'sqlite'}, {'backend': 'journal', 'journal_max_bytes': 0}):
+            config['persistence'] = persistence
+            with self.assertRaises(ValueError):
+                ConfigValidator.validate_config(config)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import unittest
+from unittest import mock
+
+from git import Repo
+
+from ai_feature_branch_toolbox.git_operations import GitOperations
+from ai_feature_branch_toolbox.ref_index import RefIndex
+
+from test_helpers import FakeConfigManager, make_temp_repo
+
+
+class TestRefIndex(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir, self.repo = make_temp_repo(self)
+        with open(os.path.join(self.temp_dir, 'README.md'), 'w') as f:
+            f.write('base\n')
+        self.repo.index.add(['README.md'])
+        self.repo.index.commit('Initial commit')
+        for name in ('feature/a', 'feature/b', 'fix/c'):
+            self.repo.create_head(name)
+        self.index = RefIndex.for_repo(self.repo)
+
+    def test_loose_and_packed_refs(self):
+        self.assertEqual(self.index.branches(), ['feature/a', 'feature/b', 'fix/c', 'main'])
+        self.repo.git.pack_refs('--all')
+        self.repo.create_head('feature/loose')
+
+        self.assertEqual(self.index.branches('feature/'), ['feature/a', 'feature/b', 'feature/loose'])
+        self.assertEqual(sorted(self.index.iter_branches('fix/')), ['fix/c'])
+        self.assertTrue(self.index.branch_exists('main'))
+        self.assertFalse(self.index.branch_exists('feature'))
+        self.assertEqual(self.index.resolve('feature/a'), self.repo.heads.main.commit.hexsha)
+        self.assertEqual(self.index.resolve('feature/loose'), self.repo.heads.main.commit.hexsha)
+        self.assertIsNone(self.index.resolve('missing'))
+
+    def test_changes_are_picked_up(self):
+        self.assertFalse(self.index.branch_exists('feature/new'))
+        self.repo.create_head('feature/new')
+        self.assertTrue(self.index.branch_exists('feature/new'))
+
+        self.repo.git.pack_refs('--all')
+        self.repo.git.branch('-D', 'feature/a')
+        self.assertNotIn('feature/a', self.index.branches())
+
+        self.repo.git.branch('-D', 'fix/c')
+        self.assertEqual(self.index.branches('fix/'), [])
+
+    def test_unchanged_refs_are_not_reread(self):
+        self.index.branches()
+        with mock.patch('os.scandir') as scandir, mock.patch('subprocess.run') as run:
+            self.assertTrue(self.index.branch_exists('feature/a'))
+            scandir.assert_not_called()
+            run.assert_not_called()
+
+    def test_current_branch(self):
+        self.assertEqual(self.index.current_branch(), 'main')
+        self.repo.heads['feature/a'].checkout()
+        self.assertEqual(self.index.current_branch(), 'feature/a')
+        self.repo.git.checkout('--detach')
+        self.assertIsNone(self.index.current_branch())
+
+    def test_worktree_has_its_own_head(self):
+        path = os.path.join(self.temp_dir, 'wt')
+        self.repo.git.worktree('add', path, 'fix/c')
+        worktree = Repo(path)
+        index = RefIndex.for_repo(worktree)
+        self.assertEqual(index.current_branch(), 'fix/c')
+        self.assertEqual(index.branches(), self.index.branches())
+        worktree.close()
+
+    def test_git_operations_use_index(self):
+        git_ops = GitOperations(FakeConfigManager())
+        git_ops.repo = self.repo
+        self.assertEqual(git_ops.list_branches('feature/'), ['feature/a', 'feature/b'])
+        self.assertTrue(git_ops.switch_branch('fix/c'))
+        self.assertFalse(git_ops.switch_branch('fix/missing'))
+        self.assertEqual(git_ops.ref_index().current_branch(), 'fix/c')
+
+
+if __name__ == '__main__':
+    unittest.main()
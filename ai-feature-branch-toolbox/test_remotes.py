@@ -0,0 +1,97 @@
+import os
+import unittest
+
+from git import Repo
+
+from ai_feature_branch_toolbox import remotes
+from ai_feature_branch_toolbox.git_operations import GitOperations
+from ai_feature_branch_toolbox.persistent_config import PersistentConfig
+
+from test_helpers import FakeConfigManager, init_repo, make_temp_dir
+
+
+class TestAddRemote(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = make_temp_dir(self)
+        self.repo_path = os.path.join(self.temp_dir, 'repo')
+        self.remote_path = os.path.join(self.temp_dir, 'remote.git')
+
+        # The remote already has history that a fetch would download
+        source = init_repo(os.path.join(self.temp_dir, 'source'))
+        with open(os.path.join(source.working_tree_dir, 'history.txt'), 'w') as f:
+            f.write('history\n')
+        source.index.add(['history.txt'])
+        source.index.commit('Remote history')
+        Repo.init(self.remote_path, bare=True).close()
+        source.git.push(self.remote_path, 'main')
+        source.close()
+
+        self.repo = Repo.init(self.repo_path, initial_branch='main')
+        self.config_manager = FakeConfigManager(persistent_config=PersistentConfig(os.path.join(self.temp_dir, 'state')))
+        self.git_ops = GitOperations(self.config_manager)
+        self.git_ops.initialize_repo(self.repo_path)
+
+    def tearDown(self):
+        self.git_ops.close_repo()
+        self.repo.close()
+
+    def verification(self, name):
+        # Read back from disk, as the next process would
+        state = PersistentConfig(self.config_manager.persistent_config.config_dir).get(remotes.STATE_KEY, {})
+        return state.get(name)
+
+    def remote_refs(self):
+        return self.repo.git.for_each_ref('refs/remotes/').splitlines()
+
+    def test_verifies_without_fetching(self):
+        self.assertTrue(self.git_ops.add_remote('origin', self.remote_path))
+        self.assertEqual(self.repo.remote('origin').url, self.remote_path)
+        self.assertEqual(self.remote_refs(), [])
+        self.assertEqual(self.verification('origin')['url'], self.remote_path)
+        # Nothing is written to the configuration
+        self.assertEqual(list(self.config_manager.values), ['repository.path'])
+
+    def test_fetch(self):
+        self.assertTrue(self.git_ops.add_remote('origin', self.remote_path, fetch=True))
+        self.assertEqual(len(self.remote_refs()), 1)
+        self.assertIn('refs/remotes/origin/main', self.remote_refs()[0])
+
+    def test_verification_is_cached(self):
+        self.assertTrue(self.git_ops.add_remote('origin', self.remote_path))
+        moved = self.remote_path + '.moved'
+        os.rename(self.remote_path, moved)
+        # Within the TTL the remote is not contacted again
+        self.assertTrue(self.git_ops.add_remote('origin', self.remote_path))
+        # A different URL is checked
+        self.assertFalse(self.git_ops.add_remote('origin', os.path.join(self.temp_dir, 'missing.git')))
+        self.assertEqual(self.verification('origin')['url'], self.remote_path)
+
+        self.config_manager.set_value('repository.remote_verify_ttl', 0)
+        self.assertFalse(self.git_ops.add_remote('origin', self.remote_path))
+        os.rename(moved, self.remote_path)
+        self.assertTrue(self.git_ops.add_remote('origin', self.remote_path))
+
+    def test_expired_verification(self):
+        remotes.record_verified(self.config_manager, 'origin', self.remote_path, now=1000)
+        self.assertTrue(remotes.recently_verified(self.config_manager, 'origin', self.remote_path, now=1000 + 3599))
+        self.assertFalse(remotes.recently_verified(self.config_manager, 'origin', self.remote_path, now=1000 + 3600))
+        self.assertFalse(remotes.recently_verified(self.config_manager, 'upstream', self.remote_path, now=1000))
+
+    def test_dotted_remote_name(self):
+        self.assertTrue(self.git_ops.add_remote('team.upstream', self.remote_path))
+        self.assertEqual(self.verification('team.upstream')['url'], self.remote_path)
+        self.assertIsNone(self.verification('team'))
+
+    def test_unreachable_remote(self):
+        self.assertFalse(self.git_ops.add_remote('origin', os.path.join(self.temp_dir, 'missing.git')))
+        self.assertIsNone(self.verification('origin'))
+
+    def test_pooled_worktree_does_not_record(self):
+        git_ops = GitOperations.for_worktree(self.repo_path, self.config_manager)
+        self.assertTrue(git_ops.add_remote('origin', self.remote_path))
+        self.assertIsNone(self.verification('origin'))
+        git_ops.close_repo()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import unittest
+
+from ai_feature_branch_toolbox.git_operations import GitOperations
+from ai_feature_branch_toolbox.repo_status import StatusSnapshot, read_status
+
+from test_helpers import FakeConfigManager, make_temp_repo
+
+
+class TestStatusSnapshot(unittest.TestCase):
+    def test_from_porcelain(self):
+        output = '\0'.join([
+            '# branch.oid 4e66dbbe33624bf33e52b79d8396972fc6e6ebe4',
+            '# branch.head main',
+            '# branch.upstream origin/main',
+            '# branch.ab +2 -1',
+            '1 .M N... 100644 100644 100644 16ac0068 16ac0068 b c',
+            '1 A. N... 000000 100644 100644 00000000 78981922 added',
+            '2 RM N... 100644 100644 100644 78981922 78981922 R100 new name',
+            'old name',
+            'u UU N... 100644 100644 100644 100644 16ac0068 0cfbf088 d00491fd conflicted',
+            '? untracked file',
+            '',
+        ])
+        snapshot = StatusSnapshot.from_porcelain(output)
+
+        self.assertEqual(snapshot.branch, 'main')
+        self.assertEqual(snapshot.oid, '4e66dbbe33624bf33e52b79d8396972fc6e6ebe4')
+        self.assertEqual(snapshot.upstream, 'origin/main')
+        self.assertEqual((snapshot.ahead, snapshot.behind), (2, 1))
+        self.assertEqual(snapshot.staged, {'added', 'new name'})
+        self.assertEqual(snapshot.modified, {'b c', 'new name'})
+        self.assertEqual(snapshot.renamed, {'new name': 'old name'})
+        self.assertEqual(snapshot.unmerged, {'conflicted'})
+        self.assertEqual(snapshot.untracked, {'untracked file'})
+        self.assertTrue(snapshot.dirty)
+
+    def test_initial_and_detached(self):
+        snapshot = StatusSnapshot.from_porcelain('# branch.oid (initial)\0# branch.head (detached)\0')
+        self.assertIsNone(snapshot.oid)
+        self.assertIsNone(snapshot.branch)
+        self.assertTrue(snapshot.clean)
+
+
+class TestReadStatus(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir, self.repo = make_temp_repo(self)
+        self.write('tracked.txt', 'one\n')
+        self.repo.index.add(['tracked.txt'])
+        self.repo.index.commit('Initial commit')
+
+        self.git_ops = GitOperations(FakeConfigManager())
+        self.git_ops.repo = self.repo
+
+    def write(self, name, content):
+        with open(os.path.join(self.temp_dir, name), 'w') as f:
+            f.write(content)
+
+    def test_matches_gitpython(self):
+        self.write('tracked.txt', 'two\n')
+        self.write('new file.txt', 'new\n')
+        snapshot = read_status(self.repo)
+
+        self.assertEqual(snapshot.dirty, self.repo.is_dirty())
+        self.assertEqual(snapshot.untracked, set(self.repo.untracked_files))
+        self.assertEqual(snapshot.modified, {'tracked.txt'})
+        self.assertEqual(snapshot.branch, self.repo.active_branch.name)
+
+    def test_commit_takes_one_snapshot(self):
+        self.write('new.txt', 'new\n')
+        calls = []
+        original = self.git_ops.status
+        self.git_ops.status = lambda: calls.append(1) or original()
+
+        self.assertTrue(self.git_ops.commit_changes('Add new.txt'))
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(read_status(self.repo).clean)
+        self.assertFalse(self.git_ops.commit_changes('Nothing'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import yaml
+
+from ai_feature_branch_toolbox.config_template import DEFAULT_CONFIG
+from ai_feature_branch_toolbox.git_operations import GitOperations
+from ai_feature_branch_toolbox.session import get_session, close_sessions
+
+
+class TestSession(unittest.TestCase):
+    def setUp(self):
+        # Persistent state lives relative to the working directory
+        self.cwd = os.getcwd()
+        self.temp_dir = tempfile.mkdtemp()
+        os.chdir(self.temp_dir)
+        self.repo_path = os.path.join(self.temp_dir, 'repo')
+        os.makedirs(self.repo_path)
+        self.config_path = os.path.join(self.temp_dir, 'config.yaml')
+        config = {section: dict(values) for section, values in DEFAULT_CONFIG.items()}
+        config['repository']['path'] = self.repo_path
+        self.write_config(config)
+
+    def tearDown(self):
+        close_sessions()
+        os.chdir(self.cwd)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def write_config(self, config):
+        with open(self.config_path, 'w') as f:
+            yaml.dump(config, f)
+
+    def test_session_is_shared(self):
+        session = get_session(self.config_path)
+        self.assertIs(get_session(self.config_path), session)
+        self.assertIs(session.config_manager, session.config_manager)
+        self.assertIs(session.persistent_config, session.config_manager.persistent_config)
+
+    def test_own_writes_do_not_reload(self):
+        config_manager = get_session(self.config_path).config_manager
+        config_manager.set_value('current_branch', 'feature/x')
+        self.assertFalse(config_manager.is_stale())
+        self.assertIs(get_session(self.config_path).config_manager, config_manager)
+
+    def test_external_change_reloads_in_place(self):
+        session = get_session(self.config_path)
+        config_manager = session.config_manager
+        self.assertEqual(session.config['branches']['prefix'], 'feature/')
+
+        config = yaml.safe_load(open(self.config_path))
+        config['branches']['prefix'] = 'agent/'
+        time.sleep(0.01)
+        self.write_config(config)
+
+        self.assertTrue(config_manager.is_stale())
+        self.assertEqual(session.config['branches']['prefix'], 'agent/')
+        self.assertIs(session.config_manager, config_manager)
+
+    def test_repo_handle_is_reused(self):
+        session = get_session(self.config_path)
+        git_ops = session.git_operations
+        self.assertIs(session.git_operations, git_ops)
+        self.assertIs(git_ops.config_manager, session.config_manager)
+        self.assertEqual(os.path.realpath(session.repo.working_tree_dir), os.path.realpath(self.repo_path))
+
+        session.close()
+        self.assertFalse(git_ops.is_connected())
+        self.assertIsNotNone(session.repo)
+
+    def test_missing_repository_path(self):
+        config = {section: dict(values) for section, values in DEFAULT_CONFIG.items()}
+        config['repository']['path'] = ''
+        self.write_config(config)
+        with self.assertRaises(ValueError):
+            get_session(self.config_path).git_operations
+
+    def test_git_operations_defaults_to_session(self):
+        git_ops = GitOperations()
+        self.assertIs(git_ops.config_manager, get_session('config.yaml').config_manager)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import asyncio
+import io
+import json
+import os
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+
+from ai_feature_branch_toolbox import tracing
+from ai_feature_branch_toolbox.atomic_write import write_atomic
+from ai_feature_branch_toolbox.cli import main
+from ai_feature_branch_toolbox.git_operations import GitOperations
+
+from test_helpers import FakeConfigManager, init_repo, make_temp_dir
+
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = make_temp_dir(self)
+        tracing.METRICS.reset()
+        tracing.enable()
+
+    def tearDown(self):
+        tracing.disable()
+        tracing.METRICS.reset()
+
+    def test_spans_nest(self):
+        finished = []
+        tracing.add_listener(finished.append)
+        try:
+            with tracing.span('outer') as outer:
+                with tracing.span('inner', detail='x'):
+                    pass
+                with self.assertRaises(KeyError):
+                    with tracing.span('failing'):
+                        raise KeyError('boom')
+        finally:
+            tracing.remove_listener(finished.append)
+
+        self.assertEqual([child.name for child in outer.children], ['inner', 'failing'])
+        self.assertEqual(outer.children[0].attributes, {'detail': 'x'})
+        self.assertEqual(outer.children[1].error, 'KeyError')
+        self.assertEqual([span.name for span in finished], ['inner', 'failing', 'outer'])
+        self.assertIsNone(tracing.current_span())
+        self.assertIn('  inner', outer.format_tree())
+
+    def test_disabled_tracing_records_nothing(self):
+        tracing.disable()
+        with tracing.span('ignored') as span:
+            self.assertIsNone(span)
+        self.assertEqual(tracing.METRICS.to_dict(), {'counters': [], 'timings': []})
+
+    def test_git_operations_count_subprocesses(self):
+        repo = init_repo(self.temp_dir)
+        git_ops = GitOperations(FakeConfigManager())
+        git_ops.repo = repo
+        tracing.METRICS.reset()
+        with tracing.span('test') as root:
+            git_ops.status()
+            git_ops.is_connected()
+        repo.close()
+
+        self.assertEqual([child.name for child in root.children], ['git_operations.status'])
+        self.assertEqual(root.children[0].subprocesses, 1)
+        counters = {(c['name'], c['labels'].get('program')): c['value'] for c in tracing.METRICS.to_dict()['counters']}
+        self.assertEqual(counters[('ai_feature_branch_toolbox_subprocesses_total', 'git')], 1)
+
+    def test_async_methods_are_traced(self):
+        @tracing.traced('work')
+        async def work():
+            return tracing.current_span().name
+
+        self.assertEqual(asyncio.run(work()), 'work')
+
+    def test_bytes_written(self):
+        with tracing.span('write') as span:
+            write_atomic(os.path.join(self.temp_dir, 'file.txt'), 'héllo')
+        self.assertEqual(span.attributes['bytes_written'], 6)
+
+    def test_prometheus_export(self):
+        tracing.METRICS.increment('things_total', 2, kind='a"b')
+        tracing.METRICS.observe('op_seconds', 0.5, span='x')
+        tracing.METRICS.observe('op_seconds', 1.5, span='x')
+        text = tracing.METRICS.to_prometheus()
+        self.assertIn('# TYPE ai_feature_branch_toolbox_things_total counter', text)
+        self.assertIn('ai_feature_branch_toolbox_things_total{kind="a\\"b"} 2', text)
+        self.assertIn('ai_feature_branch_toolbox_op_seconds_count{span="x"} 2', text)
+        self.assertIn('ai_feature_branch_toolbox_op_seconds_sum{span="x"} 2.0', text)
+        self.assertIn('ai_feature_branch_toolbox_op_seconds_max{span="x"} 1.5', text)
+        json.loads(tracing.METRICS.to_json())
+
+    def test_cli_trace_flag(self):
+        tracing.disable()
+        stderr = io.StringIO()
+        with redirect_stdout(io.StringIO()), redirect_stderr(stderr):
+            main(['--trace', '--metrics', 'prometheus', 'help'])
+        output = stderr.getvalue()
+        self.assertTrue(output.startswith('cli.help  '))
+        self.assertIn('ai_feature_branch_toolbox_span_duration_seconds_count{span="cli.help"} 1', output)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+import os
+import subprocess
+import sys
+import unittest
+
+from git import Repo
+
+from ai_feature_branch_toolbox.cli import build_parser, run_repo_command
+from ai_feature_branch_toolbox.git_operations import GitOperations
+from ai_feature_branch_toolbox.worktree_pool import WorktreePool
+
+from test_helpers import FakeConfigManager, make_temp_repo
+
+
+class TestWorktreePool(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir, self.repo = make_temp_repo(self)
+        with open(os.path.join(self.temp_dir, 'README.md'), 'w') as f:
+            f.write('base\n')
+        self.repo.index.add(['README.md'])
+        self.repo.index.commit('Initial commit')
+        for name in ('feature/a', 'feature/b', 'feature/c'):
+            self.repo.create_head(name)
+        self.pool = WorktreePool(self.repo, max_size=2)
+
+    def test_lease_checks_out_branch(self):
+        with self.pool.lease('feature/a') as lease:
+            self.assertEqual(Repo(lease.path).active_branch.name, 'feature/a')
+            self.assertEqual(self.repo.active_branch.name, 'main')
+            self.assertEqual(self.pool.path_for('feature/a'), lease.path)
+            with self.assertRaises(ValueError):
+                self.pool.lease('feature/a')
+        self.assertFalse(self.pool.worktrees()[0]['leased'])
+
+    def test_idle_worktree_is_reused_for_same_branch(self):
+        with self.pool.lease('feature/a') as lease:
+            path = lease.path
+            with open(os.path.join(path, 'scratch.txt'), 'w') as f:
+                f.write('left behind\n')
+        with self.pool.lease('feature/a') as lease:
+            self.assertEqual(lease.path, path)
+            # Uncommitted work on the branch is kept
+            self.assertTrue(os.path.exists(os.path.join(path, 'scratch.txt')))
+
+    def test_least_recently_used_worktree_is_evicted(self):
+        first = self.pool.lease('feature/a')
+        second = self.pool.lease('feature/b')
+        with self.assertRaises(RuntimeError):
+            self.pool.lease('feature/c')
+
+        first.release()
+        second.release()
+        third = self.pool.lease('feature/c')
+        self.assertEqual(third.path, first.path)
+        self.assertEqual(len(self.pool.worktrees()), 2)
+        self.assertIsNone(self.pool.path_for('feature/a'))
+        third.release()
+
+    def test_worktree_with_changes_is_not_given_to_another_branch(self):
+        first = self.pool.lease('feature/a')
+        second = self.pool.lease('feature/b')
+        with open(os.path.join(first.path, 'README.md'), 'w') as f:
+            f.write('unfinished\n')
+        first.release()
+        second.release()
+
+        # The clean worktree is reused even though it was used more recently
+        third = self.pool.lease('feature/c')
+        self.assertEqual(third.path, second.path)
+        with open(os.path.join(third.path, 'work.txt'), 'w') as f:
+            f.write('unfinished\n')
+        third.release()
+
+        with self.assertRaises(RuntimeError):
+            self.pool.lease('main')
+        with open(os.path.join(first.path, 'README.md')) as f:
+            self.assertEqual(f.read(), 'unfinished\n')
+        self.assertTrue(os.path.exists(os.path.join(third.path, 'work.txt')))
+
+    def test_lease_of_exited_process_is_reclaimed(self):
+        script = (
+            "import os, sys; from git import Repo;"
+            "from ai_feature_branch_toolbox.worktree_pool import WorktreePool;"
+            "lease = WorktreePool(Repo(sys.argv[1]), 2).lease('feature/a');"
+            "open(os.path.join(lease.path, 'partial.txt'), 'w').write('partial')"
+        )
+        env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+        subprocess.run([sys.executable, '-c', script, self.temp_dir], check=True, env=env)
+        with self.pool.lease('feature/a') as lease:
+            self.assertTrue(os.path.exists(os.path.join(lease.path, 'partial.txt')))
+
+    def test_held_leases_survive_their_process(self):
+        lease = self.pool.lease('feature/a', hold=True)
+        self.assertTrue(self.pool.worktrees()[0]['leased'])
+        self.assertTrue(self.pool.release('feature/a'))
+        self.assertFalse(self.pool.release(lease.branch))
+
+    def test_new_branch_from_start_point(self):
+        with self.pool.lease('feature/new', start_point='main') as lease:
+            self.assertEqual(Repo(lease.path).active_branch.name, 'feature/new')
+        with self.assertRaises(ValueError):
+            self.pool.lease('feature/missing')
+
+    def test_prune(self):
+        self.pool.lease('feature/a').release()
+        self.pool.lease('feature/b').release()
+        self.assertEqual(self.pool.prune(0), 2)
+        self.assertEqual(self.pool.worktrees(), [])
+
+    def test_prune_keeps_worktrees_with_changes(self):
+        with self.pool.lease('feature/a') as lease:
+            dirty = lease.path
+            with open(os.path.join(dirty, 'work.txt'), 'w') as f:
+                f.write('unfinished\n')
+        self.pool.lease('feature/b').release()
+
+        self.assertEqual(self.pool.prune(0), 1)
+        self.assertEqual([entry['path'] for entry in self.pool.worktrees()], [dirty])
+        with open(os.path.join(dirty, 'work.txt')) as f:
+            self.assertEqual(f.read(), 'unfinished\n')
+
+    def test_commands_target_leased_worktree(self):
+        config_manager = FakeConfigManager()
+        git_ops = GitOperations(config_manager)
+        git_ops.repo = self.repo
+        lease = git_ops.worktree_pool(2).lease('feature/a', hold=True)
+        with open(os.path.join(lease.path, 'agent.txt'), 'w') as f:
+            f.write('work\n')
+
+        run_repo_command(build_parser().parse_args(['commit', 'Agent work', '--worktree', 'feature/a']), git_ops)
+
+        self.assertEqual(self.repo.heads['feature/a'].commit.message, 'Agent work')
+        self.assertEqual(self.repo.heads.main.commit.message, 'Initial commit')
+        self.assertNotIn('current_branch', config_manager.values)
+        lease.release()
+
+
+if __name__ == '__main__':
+    unittest.main()